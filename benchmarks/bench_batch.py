@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+"""Benchmark: batch evaluation throughput versus worker count.
+
+Run with ``python -m benchmarks.bench_batch [expressions]``.
+"""
+
+import os
+import random
+import sys
+import time
+
+from calculator.parser import ExpressionParser
+
+
+def make_expressions(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    ops = "+-*/^"
+    return [
+        f"({rng.randint(1, 99)} {rng.choice(ops)} {rng.randint(1, 9)}) * {rng.random():.4f} - {rng.randint(0, 50)}"
+        for _ in range(count)
+    ]
+
+
+def main(count: int = 200_000) -> None:
+    expressions = make_expressions(count)
+    # Distinct strings: the compile cache cannot help, so parsing dominates.
+    parser = ExpressionParser(cache_size=0)
+
+    baseline = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        results = parser.evaluate_many(expressions, workers=workers, chunk_size=2000)
+        elapsed = time.perf_counter() - start
+        assert len(results) == count
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3} {elapsed:7.3f}s  {count / elapsed:10.0f} expr/s  x{baseline / elapsed:.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+"""Benchmark: RPN interpreter versus the generated Python backend.
+
+Run with ``python -m benchmarks.bench_codegen [iterations]``.
+"""
+
+import sys
+import timeit
+
+from calculator.parser import ExpressionParser
+
+EXPRESSION = "price * qty - discount / 2 + (price - 1) ^ 2"
+
+
+def hand_written(price: float, qty: float, discount: float) -> float:
+    return price * qty - discount / 2.0 + (price - 1.0) ** 2.0
+
+
+def main(iterations: int = 200_000) -> None:
+    rpn = ExpressionParser(backend="rpn").compile(EXPRESSION)
+    native = ExpressionParser(backend="python").compile(EXPRESSION)
+    env = {"price": 12.5, "qty": 3.0, "discount": 1.25}
+
+    function = native.native
+    values = [env[name] for name in native.names]
+    assert rpn.evaluate(env) == native.evaluate(env) == function(*values) == hand_written(**env)
+    timings = {
+        "rpn backend": timeit.timeit(lambda: rpn.evaluate(env), number=iterations),
+        "python backend": timeit.timeit(lambda: native.evaluate(env), number=iterations),
+        "python native": timeit.timeit(lambda: function(*values), number=iterations),
+        "hand-written": timeit.timeit(lambda: hand_written(*values), number=iterations),
+    }
+    for label, seconds in timings.items():
+        print(f"{label:<16}{seconds / iterations * 1e9:8.0f} ns/eval")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+"""Benchmark: evaluating a batch one expression at a time versus with CSE.
+
+The batch consists of formulas built from a small pool of shared
+sub-expressions, as is typical for generated reports. Both modes reuse
+compiled programs, so only evaluation is timed.
+
+Run with ``python -m benchmarks.bench_cse [formulas]``.
+"""
+
+import random
+import sys
+import time
+from typing import List
+
+from calculator.parser import ExpressionParser
+
+SHARED = ["(a + b) * c", "(a - d) / (b + 1)", "a ^ 2 + b ^ 2", "(c * d - a) * (c * d + a)"]
+
+
+def make_batch(formulas: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(SHARED)} {rng.choice('+-*')} ({rng.choice(SHARED)}) * {rng.randint(1, 9)}"
+        for _ in range(formulas)
+    ]
+
+
+def main(formulas: int = 1_000, repeat: int = 20) -> None:
+    parser = ExpressionParser()
+    batch = make_batch(formulas)
+    env = {"a": 1.5, "b": 2.0, "c": 3.0, "d": 4.0}
+    programs = [parser.compile(expression) for expression in batch]
+    shared = parser.compile_batch(batch)
+    assert [r.value for r in shared.evaluate(env)] == [program.evaluate(env) for program in programs]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for program in programs:
+            program.evaluate(env)
+    separate = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        shared.evaluate(env)
+    combined = (time.perf_counter() - start) / repeat
+
+    print(f"{formulas} formulas: {shared.operations} operations, "
+          f"{len(shared.instructions)} distinct ({shared.saved} saved)")
+    print(f"one by one:  {separate * 1e3:8.2f} ms/batch")
+    print(f"shared CSE:  {combined * 1e3:8.2f} ms/batch ({separate / combined:.1f}x)")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000)
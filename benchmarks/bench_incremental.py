@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+"""Benchmark: recompiling an edited long expression, full versus incremental.
+
+A long nested expression is edited one number at a time, as a REPL user
+would, and every revision is compiled with the compile cache disabled.
+
+Run with ``python -m benchmarks.bench_incremental [edits]``.
+"""
+
+import random
+import sys
+import time
+from typing import List
+
+from calculator.parser import ExpressionParser
+
+
+def make_expression(rng: random.Random, depth: int = 4, terms: int = 20) -> str:
+    def term(level: int) -> str:
+        if level == 0:
+            return rng.choice(["x", "2", "3.5", "y"])
+        return "(" + f" {rng.choice('+-*/')} ".join(term(level - 1) for _ in range(3)) + ")"
+
+    return " + ".join(term(depth) for _ in range(terms))
+
+
+def make_revisions(expression: str, edits: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    digits = [i for i, ch in enumerate(expression) if ch == "2"]
+    revisions = []
+    for _ in range(edits):
+        position = rng.choice(digits)
+        expression = expression[:position] + rng.choice("23456789") + expression[position + 1:]
+        revisions.append(expression)
+    return revisions
+
+
+def time_revisions(parser: ExpressionParser, revisions: List[str]) -> float:
+    start = time.perf_counter()
+    for revision in revisions:
+        parser.compile(revision)
+    return (time.perf_counter() - start) / len(revisions)
+
+
+def main(edits: int = 200) -> None:
+    expression = make_expression(random.Random(1))
+    revisions = make_revisions(expression, edits)
+    full = ExpressionParser(cache_size=0)
+    incremental = ExpressionParser(cache_size=0, incremental=True)
+    incremental.compile(expression)
+
+    full_time = time_revisions(full, revisions)
+    incremental_time = time_revisions(incremental, revisions)
+    print(f"expression length: {len(expression)} characters, {edits} edits")
+    print(f"full re-parse:        {full_time * 1e6:10.1f} us/edit")
+    print(f"incremental re-parse: {incremental_time * 1e6:10.1f} us/edit ({full_time / incremental_time:.1f}x)")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+"""Benchmark: cost and exactness of the numeric backends.
+
+Two workloads are evaluated with every backend: integer-only arithmetic
+and a sum of prices with two decimal places. Evaluation timings use a
+compiled program; the compile column times compiling the money sum from
+scratch. The last column reports whether the money total came out
+exact.
+
+Run with ``python -m benchmarks.bench_numeric [iterations]``.
+"""
+
+import random
+import sys
+import timeit
+from fractions import Fraction
+
+from calculator.parser import ExpressionParser
+from calculator.numeric import NUMERIC_BACKENDS
+
+
+def integer_expression(terms: int = 50, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " + ".join(f"{rng.randint(1, 999)} * {rng.randint(1, 99)}" for _ in range(terms))
+
+
+def money_expression(terms: int = 50, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    return " + ".join(f"{rng.randint(0, 9999) / 100:.2f}" for _ in range(terms))
+
+
+def main(iterations: int = 20_000) -> None:
+    integers = integer_expression()
+    money = money_expression()
+    exact_total = sum(Fraction(term) for term in money.split(" + "))
+
+    print(f"{'backend':<10} {'integers':>12} {'money':>12} {'compile':>12}  exact total")
+    for name in NUMERIC_BACKENDS:
+        # Without folding, the literals are actually added at run time.
+        parser = ExpressionParser(numeric=name, optimise=False)
+        integer_time = timeit.timeit(lambda: parser.evaluate(integers), number=iterations)
+        money_time = timeit.timeit(lambda: parser.evaluate(money), number=iterations)
+        uncached = ExpressionParser(numeric=name, optimise=False, cache_size=0)
+        compile_time = timeit.timeit(lambda: uncached.compile(money), number=iterations // 10) * 10
+        exact = Fraction(parser.evaluate(money)) == exact_total
+        print(f"{name:<10} {integer_time / iterations * 1e6:>10.1f}us {money_time / iterations * 1e6:>10.1f}us "
+              f"{compile_time / iterations * 1e6:>10.1f}us  {'yes' if exact else 'no'}")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+"""Micro-benchmark: per-operation dispatch overhead in the engine.
+
+Compares the former ``get()`` + :class:`Operation` wrapper path with
+:meth:`OperationEngine.apply`, the pre-resolved :attr:`dispatch` table
+and calling the operator function directly, and the Python-level safe
+divide with the C-level :func:`operator.truediv`.
+
+Run with ``python -m benchmarks.bench_operations [iterations]``.
+"""
+
+import sys
+import timeit
+
+from calculator.operations import OperationEngine
+
+
+def main(iterations: int = 1_000_000) -> None:
+    engine = OperationEngine()
+    native = OperationEngine(native_divide=True)
+    add = engine.dispatch["+"]
+    dispatch = engine.dispatch
+    cases = {
+        "get() + Operation": lambda: engine.get("+")(1.5, 2.5),
+        "apply()": lambda: engine.apply("+", 1.5, 2.5),
+        "dispatch table": lambda: dispatch["+"](1.5, 2.5),
+        "resolved function": lambda: add(1.5, 2.5),
+        "safe divide": lambda: engine.apply("/", 1.5, 2.5),
+        "native divide": lambda: native.apply("/", 1.5, 2.5),
+    }
+    baseline = timeit.timeit(lambda: None, number=iterations)
+    for label, case in cases.items():
+        seconds = timeit.timeit(case, number=iterations) - baseline
+        print(f"{label:<20}{seconds / iterations * 1e9:8.1f} ns/op")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+"""Benchmark: shunting-yard RPN conversion versus the Pratt parser.
+
+Each row compiles an expression from scratch (the compile cache is
+disabled), so the timings cover tokenising, parsing, optimising and
+assembling the program.
+
+Run with ``python -m benchmarks.bench_parse``.
+"""
+
+from benchmarks.bench_tokenise import best_of, make_expression
+from calculator.parser import ExpressionParser
+
+SIZES = (10, 100, 1_000, 10_000)
+
+
+def nested_expression(depth: int) -> str:
+    return "(" * depth + "x" + " + 1) * 2" * depth
+
+
+def main() -> None:
+    classic = ExpressionParser(cache_size=0)
+    pratt = ExpressionParser(cache_size=0, algorithm="pratt")
+    cases = [(f"flat, {size} tokens", make_expression(size)) for size in SIZES]
+    cases.append(("nested, depth 200", nested_expression(200)))
+
+    print(f"{'expression':<22} {'shunting-yard':>14} {'pratt':>12} {'ratio':>7}")
+    for label, expression in cases:
+        assert classic.compile(expression).code == pratt.compile(expression).code
+        repeat = max(3, 20_000 // len(expression))
+        rpn = best_of(lambda: classic.compile(expression), repeat)
+        tree = best_of(lambda: pratt.compile(expression), repeat)
+        print(f"{label:<22} {rpn * 1e6:>12.1f}us {tree * 1e6:>10.1f}us {rpn / tree:>6.2f}x")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main()
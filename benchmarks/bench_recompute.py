@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+"""Benchmark: full re-evaluation versus incremental recomputation.
+
+A large expression over 50 variables is re-evaluated after changing a
+single variable, as a spreadsheet would when one input cell is edited.
+
+Run with ``python -m benchmarks.bench_recompute [updates]``.
+"""
+
+import random
+import sys
+import time
+
+from calculator.parser import ExpressionParser
+
+NAMES = [f"v{i}" for i in range(50)]
+
+
+def make_expression(terms: int = 300, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " + ".join(
+        f"({rng.choice(NAMES)} * {rng.choice(NAMES)} - {rng.randint(1, 9)}) / ({rng.choice(NAMES)} + 100)"
+        for _ in range(terms)
+    )
+
+
+def main(updates: int = 1_000) -> None:
+    program = ExpressionParser().compile(make_expression())
+    evaluator = program.incremental()
+    env = {name: float(i) for i, name in enumerate(NAMES)}
+    evaluator.evaluate(env)
+
+    start = time.perf_counter()
+    for i in range(updates):
+        env["v3"] = float(i)
+        program.evaluate(env)
+    full = (time.perf_counter() - start) / updates
+
+    start = time.perf_counter()
+    for i in range(updates):
+        env["v3"] = float(i)
+        evaluator.evaluate(env)
+    incremental = (time.perf_counter() - start) / updates
+
+    recomputed = evaluator.recomputed
+    assert evaluator.evaluate(env) == program.evaluate(env)
+    operations = sum(1 for instr in program.code if instr < 0)
+    print(f"full evaluation: {full * 1e6:8.1f} us/update ({operations} operations)")
+    print(f"incremental:     {incremental * 1e6:8.1f} us/update "
+          f"({recomputed} recomputed, {full / incremental:.1f}x)")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000)
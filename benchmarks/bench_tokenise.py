@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+"""Benchmark: regex scanner versus the former character-by-character loop.
+
+``tokenise`` builds token objects; ``scan`` builds the compact
+:class:`calculator.tokens.TokenStream` used by the parser. The final
+section compares the memory retained by both representations.
+
+Run with ``python -m benchmarks.bench_tokenise``.
+"""
+
+import random
+import time
+import tracemalloc
+from typing import List
+
+from calculator.operations import OperationEngine
+from calculator.scanner import Scanner
+from calculator.tokens import LeftParenToken, NameToken, NumberToken, OperatorToken, RightParenToken, Token
+
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+
+
+def legacy_tokenise(engine: OperationEngine, expression: str) -> List[Token]:
+    """The character-by-character tokeniser the scanner replaced."""
+
+    tokens: List[Token] = []
+    i = 0
+    n = len(expression)
+    while i < n:
+        ch = expression[i]
+        if ch.isspace():
+            i += 1
+            continue
+        if ch.isdigit() or (ch == "." and i + 1 < n and expression[i + 1].isdigit()):
+            start = i
+            has_dot = ch == "."
+            i += 1
+            while i < n:
+                c = expression[i]
+                if c.isdigit():
+                    i += 1
+                    continue
+                if c == "." and not has_dot:
+                    has_dot = True
+                    i += 1
+                    continue
+                break
+            tokens.append(NumberToken(float(expression[start:i])))
+            continue
+        if ch == "(":
+            tokens.append(LeftParenToken())
+            i += 1
+            continue
+        if ch == ")":
+            tokens.append(RightParenToken())
+            i += 1
+            continue
+        if engine.has(ch):
+            tokens.append(OperatorToken(ch))
+            i += 1
+            continue
+        if ch.isalpha() or ch == "_":
+            start = i
+            i += 1
+            while i < n and (expression[i].isalnum() or expression[i] == "_"):
+                i += 1
+            tokens.append(NameToken(expression[start:i]))
+            continue
+        raise ValueError(f"Unexpected character at position {i}: '{ch}'")
+    return tokens
+
+
+def make_expression(tokens: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = [f"{rng.uniform(0, 1000):.3f}"]
+    while len(parts) < tokens:
+        parts.append(rng.choice("+-*/"))
+        parts.append(rng.choice([f"{rng.randint(0, 999)}", "x", "rate"]))
+    return " ".join(parts)
+
+
+def best_of(func, repeat: int) -> float:  # type: ignore[no-untyped-def]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained_memory(func) -> int:  # type: ignore[no-untyped-def]
+    tracemalloc.start()
+    result = func()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def main() -> None:
+    engine = OperationEngine()
+    scanner = Scanner(engine)
+    print(f"{'tokens':>8} {'legacy':>12} {'tokenise':>12} {'scan':>12} {'speed-up':>9}")
+    for size in SIZES:
+        expression = make_expression(size)
+        assert scanner.tokenise(expression) == legacy_tokenise(engine, expression)
+        repeat = max(3, 100_000 // size)
+        legacy = best_of(lambda: legacy_tokenise(engine, expression), repeat)
+        objects = best_of(lambda: scanner.tokenise(expression), repeat)
+        compact = best_of(lambda: scanner.scan(expression), repeat)
+        print(f"{size:>8} {legacy * 1e6:>10.1f}us {objects * 1e6:>10.1f}us {compact * 1e6:>10.1f}us "
+              f"{legacy / compact:>8.1f}x")
+
+    expression = make_expression(SIZES[-1])
+    print(f"memory retained for {SIZES[-1]} tokens:")
+    print(f"  token objects: {retained_memory(lambda: legacy_tokenise(engine, expression)) / 1024:8.0f} KiB")
+    print(f"  token stream:  {retained_memory(lambda: scanner.scan(expression)) / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+"""Benchmark: column-wise evaluation versus a per-row Python loop.
+
+Run with ``python -m benchmarks.bench_vectorised [rows]``.
+"""
+
+import random
+import sys
+import time
+
+from calculator import vectorised
+from calculator.parser import ExpressionParser
+
+EXPRESSION = "price * qty - discount / 2 + (price - 1) ^ 2"
+
+
+def main(rows: int = 200_000) -> None:
+    rng = random.Random(0)
+    columns = {
+        "price": [rng.uniform(1, 100) for _ in range(rows)],
+        "qty": [float(rng.randint(1, 10)) for _ in range(rows)],
+        "discount": [rng.uniform(0, 5) for _ in range(rows)],
+    }
+    program = ExpressionParser().compile(EXPRESSION)
+
+    start = time.perf_counter()
+    expected = [program(price=p, qty=q, discount=d) for p, q, d in zip(*columns.values())]
+    loop_time = time.perf_counter() - start
+
+    if vectorised.np is not None:
+        columns = {name: vectorised.np.asarray(values) for name, values in columns.items()}
+    start = time.perf_counter()
+    result = program.evaluate_columns(columns)
+    column_time = time.perf_counter() - start
+
+    assert len(result) == len(expected)
+    mode = "numpy" if vectorised.np is not None else "row fallback (numpy not installed)"
+    print(f"rows:              {rows}")
+    print(f"per-row loop:      {loop_time:.4f}s")
+    print(f"evaluate_columns:  {column_time:.4f}s [{mode}]")
+    print(f"speed-up:          {loop_time / column_time:.1f}x")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+"""Regression benchmark suite for the parser, engine, history and batch paths.
+
+Unlike the ``bench_*`` scripts, which compare alternative implementations,
+the suite times a fixed set of hot paths on a seeded corpus and records
+the results as JSON, so runs made before and after a change (or an
+upgrade) can be compared::
+
+    python -m benchmarks.suite run --output baseline.json
+    # ... change or upgrade something ...
+    python -m benchmarks.suite run --output current.json
+    python -m benchmarks.suite compare baseline.json current.json
+
+``compare`` exits with status 1 if any benchmark became slower than the
+``--threshold`` (10% by default). Each benchmark reports the best and
+median time per operation over ``--repeat`` runs; the comparison uses
+the best time, which is the least sensitive to background noise.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from calculator.history import DEFAULT_CAPACITY, HistoryManager
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+from calculator.workload import WorkloadGenerator, WorkloadSpec
+
+#: Version of the JSON layout written by ``run``.
+SCHEMA = 1
+
+#: Variables used by the corpus, with the values they are bound to.
+ENV = {"x": 1.5, "y": -2.25, "rate": 0.07}
+
+
+class Benchmark(NamedTuple):
+    """A named hot path: ``setup(corpus)`` returns the function to time
+    and the number of operations one call of it performs."""
+
+    name: str
+    setup: Callable[[List[str]], Tuple[Callable[[], object], int]]
+
+
+# ----------------------------------------------------------------------
+# Corpus
+# ----------------------------------------------------------------------
+def make_corpus(count: int = 1000, seed: int = 0, max_depth: int = 4) -> List[str]:
+    """Return ``count`` random, valid expressions, reproducible by ``seed``.
+
+    Expressions come from :class:`calculator.workload.WorkloadGenerator`
+    and mix every default operator, parentheses, unary minus, decimal
+    literals and the variables in :data:`ENV`; every expression
+    evaluates.
+    """
+
+    spec = WorkloadSpec(max_depth=max_depth, nesting_rate=0.35, variables=tuple(sorted(ENV)),
+                        variable_rate=0.25)
+    return list(WorkloadGenerator(spec=spec, seed=seed).generate(count))
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+def _tokenise(corpus: List[str]):  # type: ignore[no-untyped-def]
+    tokenise = ExpressionParser()._tokenise
+    return lambda: [tokenise(expression) for expression in corpus], len(corpus)
+
+
+def _to_rpn(corpus: List[str]):  # type: ignore[no-untyped-def]
+    parser = ExpressionParser()
+    streams = [parser._tokenise(expression) for expression in corpus]
+    to_rpn = parser._to_rpn
+    return lambda: [to_rpn(stream) for stream in streams], len(corpus)
+
+
+def _eval_rpn(corpus: List[str]):  # type: ignore[no-untyped-def]
+    parser = ExpressionParser()
+    programs = [parser._to_rpn(parser._tokenise(expression)) for expression in corpus]
+    eval_rpn = parser._eval_rpn
+    return lambda: [eval_rpn(program, ENV) for program in programs], len(corpus)
+
+
+def _engine_apply(corpus: List[str]):  # type: ignore[no-untyped-def]
+    apply = OperationEngine().apply
+    rng = random.Random(len(corpus))
+    calls = [(rng.choice("+-*/"), rng.uniform(1, 100), rng.uniform(1, 100)) for _ in range(10_000)]
+    return lambda: [apply(symbol, left, right) for symbol, left, right in calls], len(calls)
+
+
+def _history_add(corpus: List[str]):  # type: ignore[no-untyped-def]
+    # Twice the capacity, so both appending and evicting are exercised.
+    records = [(corpus[i % len(corpus)], float(i)) for i in range(2 * DEFAULT_CAPACITY)]
+
+    def run() -> None:
+        history = HistoryManager(capacity=DEFAULT_CAPACITY)
+        add = history.add
+        for expression, result in records:
+            add(expression, result)
+
+    return run, len(records)
+
+
+def _history_get_all(corpus: List[str]):  # type: ignore[no-untyped-def]
+    history = HistoryManager(capacity=DEFAULT_CAPACITY)
+    for i in range(DEFAULT_CAPACITY):
+        history.add(corpus[i % len(corpus)], float(i))
+    return history.get_all, DEFAULT_CAPACITY
+
+
+def _batch(corpus: List[str]):  # type: ignore[no-untyped-def]
+    # Without a compile cache every expression is tokenised, parsed,
+    # optimised, assembled and evaluated.
+    parser = ExpressionParser(cache_size=0)
+    return lambda: parser.evaluate_many(corpus), len(corpus)
+
+
+def _batch_cached(corpus: List[str]):  # type: ignore[no-untyped-def]
+    parser = ExpressionParser(cache_size=2 * len(corpus))
+    parser.evaluate_many(corpus)
+    return lambda: parser.evaluate_many(corpus), len(corpus)
+
+
+BENCHMARKS = (
+    Benchmark("parser.tokenise", _tokenise),
+    Benchmark("parser.to_rpn", _to_rpn),
+    Benchmark("parser.eval_rpn", _eval_rpn),
+    Benchmark("engine.apply", _engine_apply),
+    Benchmark("history.add", _history_add),
+    Benchmark("history.get_all", _history_get_all),
+    Benchmark("batch.evaluate", _batch),
+    Benchmark("batch.evaluate_cached", _batch_cached),
+)
+
+
+# ----------------------------------------------------------------------
+# Running and comparing
+# ----------------------------------------------------------------------
+def run(corpus_size: int = 1000, seed: int = 0, repeat: int = 5,
+        only: Optional[Sequence[str]] = None) -> Dict[str, object]:
+    """Run the benchmarks (those whose name contains one of ``only``).
+
+    Returns the JSON-serialisable report written by ``run``.
+    """
+
+    corpus = make_corpus(corpus_size, seed)
+    results: Dict[str, Dict[str, float]] = {}
+    for benchmark in BENCHMARKS:
+        if only and not any(pattern in benchmark.name for pattern in only):
+            continue
+        func, operations = benchmark.setup(corpus)
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        times = [seconds / number / operations * 1e9 for seconds in timer.repeat(repeat, number)]
+        results[benchmark.name] = {
+            "best_ns": round(min(times), 1),
+            "median_ns": round(statistics.median(times), 1),
+            "operations": operations,
+        }
+        print(f"{benchmark.name:<24}{min(times):12.1f} ns/op", file=sys.stderr)
+    return {
+        "schema": SCHEMA,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "corpus": {"size": corpus_size, "seed": seed},
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object],
+            threshold: float = 0.1) -> List[str]:
+    """Print a comparison table; return the names of regressed benchmarks.
+
+    A benchmark regresses when its best time grew by more than
+    ``threshold`` (a fraction, e.g. ``0.1`` for 10%).
+    """
+
+    old: Dict[str, Dict[str, float]] = baseline["results"]  # type: ignore[assignment]
+    new: Dict[str, Dict[str, float]] = current["results"]  # type: ignore[assignment]
+    if baseline.get("corpus") != current.get("corpus"):
+        print("warning: the reports were made with different corpora", file=sys.stderr)
+
+    regressions = []
+    print(f"{'benchmark':<24}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name in sorted(set(old) | set(new)):
+        if name not in old or name not in new:
+            print(f"{name:<24}{'only in ' + ('baseline' if name in old else 'current'):>33}")
+            continue
+        before, after = old[name]["best_ns"], new[name]["best_ns"]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<24}{before:>10.1f}ns{after:>10.1f}ns{change:>+9.1%}{flag}")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, object]:
+    with open(path, "r", encoding="utf-8") as handle:
+        report = json.load(handle)
+    if report.get("schema") != SCHEMA:
+        raise SystemExit(f"{path}: unsupported report schema {report.get('schema')!r}")
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Regression benchmark suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write a JSON report")
+    run_parser.add_argument("--output", "-o", help="write the report to this file instead of stdout")
+    run_parser.add_argument("--size", type=int, default=1000, help="number of corpus expressions")
+    run_parser.add_argument("--seed", type=int, default=0, help="corpus random seed")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    run_parser.add_argument("--only", action="append", metavar="NAME",
+                            help="run only benchmarks whose name contains NAME (repeatable)")
+
+    compare_parser = commands.add_parser("compare", help="compare two JSON reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="allowed slow-down as a fraction (default: 0.1)")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        regressions = compare(_load(args.baseline), _load(args.current), args.threshold)
+        return 1 if regressions else 0
+
+    report = json.dumps(run(args.size, args.seed, args.repeat, args.only), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    sys.exit(main())
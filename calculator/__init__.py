@@ -6,15 +6,18 @@ The package exposes a small public API for programmatic use:
 
 - :class:`calculator.operations.OperationEngine`
 - :class:`calculator.parser.ExpressionParser`
+- :class:`calculator.program.CompiledExpression`
 - :class:`calculator.history.HistoryManager`
 """
 
 from .operations import OperationEngine
 from .parser import ExpressionParser
+from .program import CompiledExpression
 from .history import HistoryManager
 
 __all__ = [
     "OperationEngine",
     "ExpressionParser",
+    "CompiledExpression",
     "HistoryManager",
 ]
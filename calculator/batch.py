@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+"""Batch evaluation of many independent expressions.
+
+:func:`iter_evaluate` streams expressions through an
+:class:`calculator.parser.ExpressionParser`, either in-process or
+chunked across a pool of worker processes. Results come back in input
+order, and a failing expression yields a :class:`BatchResult` carrying
+the error message rather than aborting the batch.
+
+Worker processes rebuild the parser from the parent's engine, which is
+therefore pickled once per worker. Engines holding unpicklable
+operators (such as lambdas) can be supplied through ``engine_factory``
+instead: a picklable, zero-argument callable returning the engine.
+"""
+
+import pickle
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from .operations import Number, OperationEngine
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .parser import ExpressionParser
+
+# Outcome of a single evaluation as shipped between processes: exactly
+# one of value / error message is set.
+_Outcome = Tuple[Optional[Number], Optional[str]]
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Outcome of evaluating one expression in a batch.
+
+    Attributes
+    ----------
+    expression:
+        The input expression.
+    value:
+        The result, or ``None`` if evaluation failed.
+    error:
+        The error message, or ``None`` if evaluation succeeded.
+    """
+
+    expression: str
+    value: Optional[Number] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """``True`` if the expression evaluated successfully."""
+
+        return self.error is None
+
+
+def iter_evaluate(parser: "ExpressionParser", expressions: Iterable[str], workers: int = 1,
+                  chunk_size: int = 1000,
+                  engine_factory: Optional[Callable[[], OperationEngine]] = None) -> Iterator[BatchResult]:
+    """Lazily evaluate ``expressions``, yielding results in input order.
+
+    Parameters
+    ----------
+    parser:
+        Parser whose engine and settings are used for evaluation.
+    expressions:
+        Any iterable of expression strings; it is consumed lazily, so
+        memory use stays bounded for arbitrarily long inputs.
+    workers:
+        Number of worker processes. ``1`` evaluates in-process.
+    chunk_size:
+        Number of expressions shipped to a worker at a time.
+    engine_factory:
+        Picklable callable creating the engine inside each worker. If
+        omitted, the parser's engine is pickled instead.
+    """
+
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    if workers == 1:
+        for expression in expressions:
+            value, error = _evaluate_one(parser, expression)
+            yield BatchResult(expression, value, error)
+        return
+
+    if engine_factory is None:
+        _check_picklable(parser.engine)
+    options = (parser.cache_info().maxsize, parser.backend, parser.optimise, parser.algorithm, parser.numeric)
+    initargs = (engine_factory or parser.engine, engine_factory is not None, options)
+
+    iterator = iter(expressions)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        # Keep a bounded window of chunks in flight so input is consumed
+        # lazily while every worker stays busy.
+        pending: Deque[Tuple[List[str], "Future[List[_Outcome]]"]] = deque()
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                pending.append((chunk, pool.submit(_evaluate_chunk, chunk)))
+            if not pending:
+                break
+            chunk, future = pending.popleft()
+            for expression, (value, error) in zip(chunk, future.result()):
+                yield BatchResult(expression, value, error)
+
+
+def evaluate_many(parser: "ExpressionParser", expressions: Iterable[str], workers: int = 1,
+                  chunk_size: int = 1000,
+                  engine_factory: Optional[Callable[[], OperationEngine]] = None) -> List[BatchResult]:
+    """Evaluate ``expressions`` and return all results as a list.
+
+    See :func:`iter_evaluate` for the parameters.
+    """
+
+    return list(iter_evaluate(parser, expressions, workers, chunk_size, engine_factory))
+
+
+def _evaluate_one(parser: "ExpressionParser", expression: str) -> _Outcome:
+    try:
+        return parser.evaluate(expression), None
+    except Exception as exc:  # noqa: BLE001 - reported per item
+        return None, str(exc)
+
+
+def _check_picklable(engine: OperationEngine) -> None:
+    try:
+        pickle.dumps(engine)
+    except Exception as exc:  # noqa: BLE001 - pickling can fail in many ways
+        raise TypeError(
+            "Engine cannot be sent to worker processes (custom operators must be "
+            "module-level functions); pass engine_factory instead"
+        ) from exc
+
+
+# ----------------------------------------------------------------------
+# Worker process side
+# ----------------------------------------------------------------------
+_worker_parser: Optional["ExpressionParser"] = None
+
+
+def _init_worker(engine_or_factory: Any, is_factory: bool, options: Tuple[Any, ...]) -> None:
+    from .parser import ExpressionParser
+
+    global _worker_parser
+    engine = engine_or_factory() if is_factory else engine_or_factory
+    cache_size, backend, optimise, algorithm, numeric = options
+    _worker_parser = ExpressionParser(engine, cache_size=cache_size, backend=backend, optimise=optimise,
+                                      algorithm=algorithm, numeric=numeric)
+
+
+def _evaluate_chunk(chunk: List[str]) -> List[_Outcome]:
+    assert _worker_parser is not None, "worker not initialised"
+    parser = _worker_parser
+    return [_evaluate_one(parser, expression) for expression in chunk]
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+"""Small bounded caches used by PyCalc.
+
+The parser keeps recently compiled expressions in an :class:`LRUCache`
+so that repeatedly evaluated expression strings skip tokenisation and
+RPN conversion entirely. Entries can optionally expire after a
+time-to-live, which :mod:`calculator.memo` uses for evaluation results.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    """Snapshot of cache statistics.
+
+    Attributes
+    ----------
+    hits:
+        Number of successful lookups.
+    misses:
+        Number of lookups that found no entry.
+    evictions:
+        Number of entries dropped to respect ``maxsize``.
+    size:
+        Number of entries currently stored.
+    maxsize:
+        Maximum number of entries the cache will hold.
+    expirations:
+        Number of entries dropped because their time-to-live elapsed
+        (these lookups also count as misses).
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were hits (``0.0`` if none yet)."""
+
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe least-recently-used cache with hit/miss counters.
+
+    A ``maxsize`` of ``0`` disables the cache: lookups always miss and
+    nothing is stored.
+
+    Parameters
+    ----------
+    maxsize:
+        Maximum number of entries.
+    ttl:
+        Seconds after which an entry expires, or ``None`` to keep entries
+        until they are evicted.
+    clock:
+        Time source for ``ttl``, in seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if maxsize < 0:
+            raise ValueError("Cache size must be non-negative.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache ttl must be positive.")
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._expiry: Dict[K, float] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of entries held by the cache."""
+
+        return self._maxsize
+
+    def get(self, key: K, accept: Optional[Callable[[V], bool]] = None) -> Optional[V]:
+        """Return the value stored for ``key`` or ``None`` on a miss.
+
+        If ``accept`` is given, a stored value it rejects is treated (and
+        counted) as a miss.
+        """
+
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            if self._ttl is not None and self._expiry[key] <= self._clock():
+                del self._data[key]
+                del self._expiry[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            if accept is not None and not accept(value):
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """Store ``value`` under ``key``, evicting the oldest entry if full."""
+
+        if not self._maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self._ttl is not None:
+                self._expiry[key] = self._clock() + self._ttl
+            while len(self._data) > self._maxsize:
+                oldest, _ = self._data.popitem(last=False)
+                self._expiry.pop(oldest, None)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries; statistics are preserved."""
+
+        with self._lock:
+            self._data.clear()
+            self._expiry.clear()
+
+    def info(self) -> CacheInfo:
+        """Return a :class:`CacheInfo` snapshot of the cache statistics."""
+
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._data),
+                maxsize=self._maxsize,
+                expirations=self._expirations,
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
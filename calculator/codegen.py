@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+"""Python code generation backend for compiled expressions.
+
+:func:`generate` lowers the RPN program of a
+:class:`calculator.program.CompiledExpression` into the source of an
+ordinary Python function and compiles it with :func:`compile`. The
+default ``+ - * / ^`` operators and unary minus are inlined as native
+Python operators; any other operator function is bound as a closure
+constant and called directly. Division keeps the engine's check for a
+zero divisor (and its ``"division by zero"`` message) unless the divisor
+is a non-zero literal. The resulting function takes one positional
+argument per program variable and runs at the speed of hand-written
+Python; call it directly through
+:attr:`calculator.program.CompiledExpression.native` to skip the
+binding done by :meth:`~calculator.program.CompiledExpression.evaluate`.
+"""
+
+import math
+import operator
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+from .operations import Number, OperationEngine
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .program import CompiledExpression
+
+#: Operator functions that can be replaced by a native Python operator.
+INLINE_OPERATORS: Dict[Callable[..., Number], str] = {
+    operator.add: "+",
+    operator.sub: "-",
+    operator.mul: "*",
+    operator.truediv: "/",
+    operator.pow: "**",
+    operator.neg: "-",
+    OperationEngine._safe_divide: "/",
+}
+
+# Python's parser rejects very deeply nested expressions, so sub-results
+# nested deeper than this are spilled into local variables.
+_MAX_NESTING = 32
+
+
+def generate(program: "CompiledExpression") -> Callable[..., Number]:
+    """Return a native Python function equivalent to ``program``.
+
+    The function accepts the values for ``program.names`` positionally.
+    """
+
+    source, bindings = generate_source(program)
+    namespace: Dict[str, object] = {}
+    exec(compile(source, f"<pycalc: {program.source}>", "exec"), namespace)
+    return namespace["_build"](**bindings)  # type: ignore[operator]
+
+
+def generate_source(program: "CompiledExpression") -> Tuple[str, Dict[str, object]]:
+    """Return the generated module source and its closure bindings."""
+
+    bindings: Dict[str, object] = {}
+    slots: List[str] = []
+    # Inlined literals that are safe divisors
+    nonzero = set()
+
+    for index, value in enumerate(program.constants):
+        # Ints are always finite (and may be too large for isfinite())
+        if type(value) is int or (type(value) is float and math.isfinite(value)):
+            slots.append(f"({value!r})")
+            if value:
+                nonzero.add(slots[-1])
+        else:
+            slots.append(f"_c{index}")
+            bindings[f"_c{index}"] = value
+    slots.extend(f"_v{index}" for index in range(len(program.names)))
+
+    calls: List[str] = []
+    for index, func in enumerate(program.functions):
+        symbol = INLINE_OPERATORS.get(func)
+        if symbol is None:
+            bindings[f"_f{index}"] = func
+        calls.append(symbol or f"_f{index}")
+
+    body: List[str] = []
+    stack: List[Tuple[str, int]] = []
+    for instr in program.code:
+        if instr >= 0:
+            stack.append((slots[instr], 0))
+            continue
+
+        call = calls[~instr]
+        if program.arities[~instr] == 1:
+            operand, depth = stack.pop()
+            text = f"{call}({operand})" if call.startswith("_f") else f"({call}{operand})"
+        else:
+            right, right_depth = stack.pop()
+            left, left_depth = stack.pop()
+            if program.functions[~instr] is OperationEngine._safe_divide and right not in nonzero:
+                # Check the divisor like the engine does. Everything
+                # computed before it is spilled first, so operators still
+                # run (and fail) in the interpreter's order.
+                stack += [(left, left_depth), (right, right_depth)]
+                for position, (pending, pending_depth) in enumerate(stack):
+                    if pending_depth:
+                        body.append(f"        _t{len(body)} = {pending}")
+                        stack[position] = (f"_t{len(body) - 1}", 0)
+                (left, left_depth), (right, right_depth) = stack.pop(-2), stack.pop()
+                body.append(f"        if {right} == 0:")
+                body.append('            raise ZeroDivisionError("division by zero")')
+            if call.startswith("_f"):
+                text = f"{call}({left}, {right})"
+            else:
+                text = f"({left} {call} {right})"
+            depth = max(left_depth, right_depth)
+        depth += 1
+        if depth > _MAX_NESTING:
+            temp = f"_t{len(body)}"
+            body.append(f"        {temp} = {text}")
+            text, depth = temp, 0
+        stack.append((text, depth))
+
+    params = ", ".join(f"_v{index}" for index in range(len(program.names)))
+    lines = [f"def _build({', '.join(bindings)}):", f"    def _program({params}):"]
+    lines.extend(body)
+    lines.append(f"        return {stack[0][0]}")
+    lines.append("    return _program")
+    return "\n".join(lines) + "\n", bindings
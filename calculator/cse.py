@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+"""Common sub-expression elimination across a batch of expressions.
+
+:func:`compile_batch` parses every expression of a batch into a shared
+graph: sub-trees are hash-consed, so a sub-expression such as
+``(a + b) * c`` that occurs in many formulas (or several times in one)
+becomes a single node. The graph is lowered into a
+:class:`BatchProgram`, a straight-line register program that evaluates
+each distinct sub-expression once per set of bindings and shares the
+result between all expressions using it.
+
+Only operations declared ``pure`` are shared; every occurrence of a
+side-effecting operator is still evaluated separately.
+"""
+
+import operator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+from .batch import BatchResult
+from .nodes import BinaryOp, Constant, Negate, Node, NodeBuilder, Variable
+from .numeric import FLOAT, NumericBackend
+from .operations import Number, OperationEngine
+from .tokens import NEGATE_SYMBOL
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .parser import ExpressionParser
+
+# Instruction: (function index, left slot, right slot or -1 if unary)
+_Instruction = Tuple[int, int, int]
+
+
+class HashConsingBuilder(NodeBuilder):
+    """:class:`NodeBuilder` returning one shared node per distinct sub-tree.
+
+    Nodes are keyed by their type, payload and the identities of their
+    (already shared) children, so structurally equal sub-trees built
+    through the same builder are the same object. Nodes applying an
+    impure operation are never shared.
+
+    Parameters
+    ----------
+    engine:
+        Engine used to look up operation purity.
+    inner:
+        Builder creating the nodes, e.g. a
+        :class:`calculator.optimiser.FoldingBuilder`.
+    """
+
+    def __init__(self, engine: OperationEngine, inner: Optional[NodeBuilder] = None) -> None:
+        self.engine = engine
+        self.inner = inner or NodeBuilder()
+        self._nodes: Dict[Hashable, Node] = {}
+
+    def constant(self, value: Number) -> Node:
+        return self._intern(self.inner.constant(value))
+
+    def variable(self, name: str) -> Node:
+        return self._intern(self.inner.variable(name))
+
+    def negate(self, operand: Node) -> Node:
+        return self._intern(self.inner.negate(operand))
+
+    def binary(self, symbol: str, left: Node, right: Node) -> Node:
+        return self._intern(self.inner.binary(symbol, left, right))
+
+    def _intern(self, node: Node) -> Node:
+        if isinstance(node, Constant):
+            # repr() tells apart 1 and 1.0, 0.0 and -0.0, and matches NaNs
+            key: Hashable = (Constant, type(node.value), repr(node.value))
+        elif isinstance(node, Variable):
+            key = (Variable, node.name)
+        elif isinstance(node, Negate):
+            key = (Negate, id(node.operand))
+        elif self.engine.get(node.symbol).pure:
+            key = (BinaryOp, node.symbol, id(node.left), id(node.right))
+        else:
+            return node
+        # The stored nodes keep their children alive, so ids stay unique.
+        return self._nodes.setdefault(key, node)
+
+
+@dataclass(frozen=True)
+class BatchProgram:
+    """Register program evaluating a batch of expressions with sharing.
+
+    Evaluation works on a frame of *slots*: the constants, then the
+    values bound to ``names``, then one slot per instruction holding its
+    result. An instruction ``(f, a, b)`` appends
+    ``functions[f](slots[a], slots[b])``, or ``functions[f](slots[a])``
+    when ``b`` is ``-1``.
+
+    Attributes
+    ----------
+    expressions:
+        The source expressions, in batch order.
+    constants:
+        Literal values, shared by all expressions.
+    names:
+        Variable names, in slot order.
+    functions:
+        Operator callables referenced by the instructions.
+    instructions:
+        One entry per distinct operation in the batch.
+    outputs:
+        Slot holding each expression's result, or ``-1`` if it failed to
+        compile.
+    errors:
+        Compile error message per expression, or ``None``.
+    operations:
+        Number of operations evaluating the expressions one by one would
+        perform.
+    numeric:
+        Numeric backend the batch was compiled with; its decimal
+        context, if any, is active on every evaluation.
+    """
+
+    expressions: Tuple[str, ...]
+    constants: Tuple[Number, ...]
+    names: Tuple[str, ...]
+    functions: Tuple[Callable[..., Number], ...]
+    instructions: Tuple[_Instruction, ...]
+    outputs: Tuple[int, ...]
+    errors: Tuple[Optional[str], ...]
+    operations: int
+    numeric: NumericBackend = FLOAT
+
+    @property
+    def saved(self) -> int:
+        """Operations per evaluation avoided by sharing sub-expressions."""
+
+        return self.operations - len(self.instructions)
+
+    def evaluate(self, env: Optional[Mapping[str, Number]] = None) -> List[BatchResult]:
+        """Evaluate every expression with variables looked up in ``env``.
+
+        As with :meth:`calculator.parser.ExpressionParser.evaluate_many`,
+        an expression that fails yields a result with ``error`` set; the
+        failure affects only the expressions depending on it.
+        """
+
+        with self.numeric.scope():
+            slots = self._slots(env or {})
+
+        results = []
+        for expression, output, error in zip(self.expressions, self.outputs, self.errors):
+            if output < 0:
+                results.append(BatchResult(expression, error=error))
+                continue
+            value = slots[output]
+            if isinstance(value, _Failure):
+                results.append(BatchResult(expression, error=value.message))
+            else:
+                results.append(BatchResult(expression, value))
+        return results
+
+    def _slots(self, env: Mapping[str, Number]) -> List[object]:
+        slots: List[object] = list(self.constants)
+        if all(name in env for name in self.names):
+            slots.extend(env[name] for name in self.names)
+            try:
+                self._run(slots)  # type: ignore[arg-type]
+            except Exception as exc:  # noqa: BLE001 - isolated below
+                # Keep the slots computed before the failure: running
+                # their operators again would repeat any side effects.
+                slots.append(_Failure(str(exc)))
+                self._run_isolated(slots)
+        else:
+            slots.extend(env[name] if name in env else _Failure(f"Unbound variable '{name}'")
+                         for name in self.names)
+            self._run_isolated(slots)
+        return slots
+
+    def _run(self, slots: List[Number]) -> None:
+        functions = self.functions
+        push = slots.append
+        for func, left, right in self.instructions:
+            if right >= 0:
+                push(functions[func](slots[left], slots[right]))
+            else:
+                push(functions[func](slots[left]))
+
+    def _run_isolated(self, slots: List[object]) -> None:
+        # Slow path, resuming after the instructions already in ``slots``:
+        # failures are recorded per slot and propagate only to the
+        # instructions that consume them.
+        done = len(slots) - len(self.constants) - len(self.names)
+        for func, left, right in self.instructions[done:]:
+            operands = (slots[left],) if right < 0 else (slots[left], slots[right])
+            failed = [operand for operand in operands if isinstance(operand, _Failure)]
+            if failed:
+                slots.append(failed[0])
+                continue
+            try:
+                slots.append(self.functions[func](*operands))
+            except Exception as exc:  # noqa: BLE001 - reported per expression
+                slots.append(_Failure(str(exc)))
+
+
+class _Failure:
+    """Marker stored in a slot whose value could not be computed."""
+
+    __slots__ = ("message",)
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def compile_batch(parser: "ExpressionParser", expressions: Iterable[str]) -> BatchProgram:
+    """Compile ``expressions`` into one :class:`BatchProgram`.
+
+    Expressions are parsed with ``parser``'s algorithm and, if enabled,
+    its optimiser. An expression that fails to parse is recorded as an
+    error rather than raising.
+    """
+
+    engine = parser.engine
+    inner = parser._builder()
+    builder = HashConsingBuilder(engine, inner)
+    sources: List[str] = []
+    roots: List[Optional[Node]] = []
+    errors: List[Optional[str]] = []
+    # Constants are folded under the backend's decimal context, if any.
+    with parser.numeric.scope():
+        for expression in expressions:
+            sources.append(expression)
+            try:
+                roots.append(parser._parse_tokens(parser._tokenise(expression), builder))
+                errors.append(None)
+            except Exception as exc:  # noqa: BLE001 - reported per expression
+                roots.append(None)
+                errors.append(str(exc))
+
+    table = engine.table()
+    constants: List[Number] = []
+    names: List[str] = []
+    leaves: List[Node] = []
+    functions: List[Callable[..., Number]] = []
+    function_slots: Dict[str, int] = {}
+    operations: List[Node] = []
+    visited: Dict[Node, None] = {}
+
+    # Order the distinct nodes so that children come before parents.
+    for root in roots:
+        if root is None or root in visited:
+            continue
+        pending: List[Tuple[Node, bool]] = [(root, False)]
+        while pending:
+            node, expanded = pending.pop()
+            if node in visited:
+                continue
+            if isinstance(node, (Constant, Variable)):
+                visited[node] = None
+                leaves.append(node)
+            elif expanded:
+                visited[node] = None
+                operations.append(node)
+            elif isinstance(node, Negate):
+                pending.append((node, True))
+                pending.append((node.operand, False))
+            else:
+                pending.append((node, True))
+                pending.append((node.right, False))
+                pending.append((node.left, False))
+
+    slots: Dict[Node, int] = {}
+    for leaf in leaves:
+        if isinstance(leaf, Constant):
+            slots[leaf] = len(constants)
+            constants.append(leaf.value)
+    for leaf in leaves:
+        if isinstance(leaf, Variable):
+            slots[leaf] = len(constants) + len(names)
+            names.append(leaf.name)
+
+    instructions: List[_Instruction] = []
+    first = len(constants) + len(names)
+    for node in operations:
+        symbol = node.symbol if isinstance(node, BinaryOp) else NEGATE_SYMBOL
+        index = function_slots.get(symbol)
+        if index is None:
+            index = function_slots[symbol] = len(functions)
+            functions.append(operator.neg if isinstance(node, Negate)
+                             else table.functions[table.codes[node.symbol]])
+        if isinstance(node, Negate):
+            instructions.append((index, slots[node.operand], -1))
+        else:
+            instructions.append((index, slots[node.left], slots[node.right]))
+        slots[node] = first + len(instructions) - 1
+
+    return BatchProgram(
+        expressions=tuple(sources),
+        constants=tuple(constants),
+        names=tuple(names),
+        functions=tuple(functions),
+        instructions=tuple(instructions),
+        outputs=tuple(-1 if root is None else slots[root] for root in roots),
+        errors=tuple(errors),
+        operations=_count_operations(root for root in roots if root is not None),
+        numeric=parser.numeric,
+    )
+
+
+def _count_operations(roots: Iterable[Node]) -> int:
+    """Number of operations in ``roots`` if no sub-tree were shared."""
+
+    counts: Dict[Node, int] = {}
+    total = 0
+    for root in roots:
+        pending: List[Tuple[Node, bool]] = [(root, False)]
+        while pending:
+            node, expanded = pending.pop()
+            if node in counts:
+                continue
+            if isinstance(node, (Constant, Variable)):
+                counts[node] = 0
+            elif isinstance(node, Negate):
+                if expanded:
+                    counts[node] = 1 + counts[node.operand]
+                else:
+                    pending.append((node, True))
+                    pending.append((node.operand, False))
+            elif expanded:
+                counts[node] = 1 + counts[node.left] + counts[node.right]
+            else:
+                pending.append((node, True))
+                pending.append((node.right, False))
+                pending.append((node.left, False))
+        total += counts[root]
+    return total
@@ -1,36 +1,175 @@
 from __future__ import annotations
 
-"""Lightweight in-memory calculation history for PyCalc."""
+"""Lightweight in-memory calculation history for PyCalc.
 
+History is stored compactly: expression strings are interned and float
+results live in an ``array('d')`` rather than in per-record objects.
+With a ``capacity`` the storage becomes a ring buffer, so appending and
+evicting the oldest record are both O(1) and memory stays bounded for
+long-running sessions.
+"""
+
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, overload
+
+#: Capacity used by the interactive REPL.
+DEFAULT_CAPACITY = 10_000
 
 
 @dataclass(frozen=True)
 class HistoryRecord:
     """Represents a single evaluated expression."""
 
+    __slots__ = ("expression", "result")
+
     expression: str
     result: float
 
+    # Frozen dataclasses with hand-written __slots__ cannot be restored
+    # by the default pickle/copy protocol, which assigns the fields.
+    def __getstate__(self) -> Tuple[str, float]:
+        return (self.expression, self.result)
+
+    def __setstate__(self, state: Tuple[str, float]) -> None:
+        object.__setattr__(self, "expression", state[0])
+        object.__setattr__(self, "result", state[1])
+
+
+class HistoryView(Sequence[HistoryRecord]):
+    """Live, read-only sequence view over a :class:`HistoryManager`.
+
+    Any history exposing ``record(index)`` and ``__len__`` can be viewed,
+    including :class:`calculator.history_log.PersistentHistory`.
+
+    The view does not copy the stored history; records are materialised
+    on access and the view reflects later additions and evictions.
+    """
+
+    __slots__ = ("_history",)
+
+    def __init__(self, history: "HistoryManager") -> None:
+        self._history = history
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    @overload
+    def __getitem__(self, index: int) -> HistoryRecord: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[HistoryRecord]: ...
+
+    def __getitem__(self, index):  # type: ignore[no-untyped-def]
+        if isinstance(index, slice):
+            return [self._history.record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._history.record(index)
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        return iter(self._history)
+
 
 class HistoryManager:
-    """Stores a simple ordered list of calculation records."""
+    """Stores an ordered, optionally bounded, list of calculation records.
+
+    Parameters
+    ----------
+    capacity:
+        Maximum number of records to keep. When full, adding a record
+        evicts the oldest one. ``None`` keeps everything.
+    """
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        if capacity is not None and capacity < 1:
+            raise ValueError("History capacity must be at least 1.")
+        self._capacity = capacity
+        self._evicted = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        size = self._capacity or 0
+        self._expressions: List[Optional[str]] = [None] * size
+        self._results = array("d", bytes(8 * size))
+        # Results that are not floats (e.g. complex) cannot live in the
+        # array and are kept here, keyed by storage slot.
+        self._other_results: Dict[int, object] = {}
+        self._start = 0
+        self._size = 0
 
-    def __init__(self) -> None:
-        self._records: List[HistoryRecord] = []
+    @property
+    def capacity(self) -> Optional[int]:
+        """Maximum number of stored records, or ``None`` if unbounded."""
+
+        return self._capacity
+
+    @property
+    def evicted(self) -> int:
+        """Number of records dropped because the history was full."""
+
+        return self._evicted
 
     def add(self, expression: str, result: float) -> None:
         """Append a new history entry."""
 
-        self._records.append(HistoryRecord(expression=expression, result=result))
+        expression = sys.intern(expression)
+        capacity = self._capacity
+
+        if capacity is None:
+            slot = self._size
+            self._expressions.append(expression)
+            self._results.append(0.0)
+            self._size += 1
+        elif self._size < capacity:
+            slot = (self._start + self._size) % capacity
+            self._expressions[slot] = expression
+            self._size += 1
+        else:
+            slot = self._start
+            self._expressions[slot] = expression
+            self._start = (slot + 1) % capacity
+            self._evicted += 1
+
+        if type(result) is float:
+            self._results[slot] = result
+            if self._other_results:
+                self._other_results.pop(slot, None)
+        else:
+            self._other_results[slot] = result
+
+    def record(self, index: int) -> HistoryRecord:
+        """Return the ``index``-th oldest stored record."""
+
+        if not 0 <= index < self._size:
+            raise IndexError("history index out of range")
+        slot = self._start + index
+        if self._capacity is not None and slot >= self._capacity:
+            slot -= self._capacity
+        expression = self._expressions[slot]
+        assert expression is not None
+        result = self._other_results.get(slot, self._results[slot]) if self._other_results else self._results[slot]
+        return HistoryRecord(expression=expression, result=result)  # type: ignore[arg-type]
+
+    def view(self) -> HistoryView:
+        """Return a live, non-copying sequence view of the history."""
+
+        return HistoryView(self)
 
     def get_all(self) -> List[HistoryRecord]:
         """Return a copy of all stored history records."""
 
-        return list(self._records)
+        return list(self)
 
     def clear(self) -> None:
         """Remove all stored history records."""
 
-        self._records.clear()
+        self._reset()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        for index in range(self._size):
+            yield self.record(index)
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+"""Persistent, append-only calculation history for PyCalc.
+
+:class:`PersistentHistory` offers the same interface as
+:class:`calculator.history.HistoryManager` but keeps its records in a
+compact binary log file, so history survives restarts and can be shared
+by several sessions.
+
+File format
+-----------
+The log starts with an 8-byte magic string followed by records of::
+
+    <u32 expression length> <u32 value length> <u8 value tag>
+    <expression, UTF-8> <value bytes>
+
+A sidecar ``<log>.idx`` file holds the little-endian ``u64`` start
+offset of every record. Opening a history loads that index in one read
+and maps the log with :mod:`mmap`, so even logs with millions of
+entries open instantly and records are decoded only when accessed. The
+index is only a cache: records missing from it (e.g. after a crash) are
+recovered by scanning the log tail, and a damaged index is rebuilt.
+
+Writes are batched: records are buffered in memory and appended with a
+single write every ``flush_every`` records (or on :meth:`flush` and
+:meth:`close`), optionally followed by ``fsync``. On POSIX systems an
+advisory ``flock`` serialises writers sharing the same file.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from decimal import Decimal
+from fractions import Fraction
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .history import HistoryRecord, HistoryView
+
+try:  # pragma: no cover - platform dependent
+    import fcntl
+except ImportError:  # pragma: no cover - platform dependent
+    fcntl = None  # type: ignore[assignment]
+
+MAGIC = b"PYCHIST1"
+
+_HEADER = struct.Struct("<IIB")
+_FLOAT = struct.Struct("<d")
+_COMPLEX = struct.Struct("<dd")
+_OFFSET_SIZE = 8
+
+TAG_FLOAT = 0
+TAG_INT = 1
+TAG_COMPLEX = 2
+TAG_FRACTION = 3
+TAG_DECIMAL = 4
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def encode_record(expression: str, result: object) -> bytes:
+    """Serialise one history record into its on-disk form."""
+
+    if type(result) is float:
+        tag, value = TAG_FLOAT, _FLOAT.pack(result)
+    elif isinstance(result, int) and not isinstance(result, bool):
+        tag, value = TAG_INT, str(result).encode("ascii")
+    elif isinstance(result, complex):
+        tag, value = TAG_COMPLEX, _COMPLEX.pack(result.real, result.imag)
+    elif isinstance(result, Fraction):
+        tag, value = TAG_FRACTION, str(result).encode("ascii")
+    elif isinstance(result, Decimal):
+        tag, value = TAG_DECIMAL, str(result).encode("ascii")
+    elif isinstance(result, float):
+        tag, value = TAG_FLOAT, _FLOAT.pack(result)
+    else:
+        raise TypeError(f"Cannot store result of type {type(result).__name__} in history log")
+
+    text = expression.encode("utf-8")
+    return _HEADER.pack(len(text), len(value), tag) + text + value
+
+
+def _decode_value(tag: int, data: bytes) -> object:
+    if tag == TAG_FLOAT:
+        return _FLOAT.unpack(data)[0]
+    if tag == TAG_INT:
+        return int(data)
+    if tag == TAG_COMPLEX:
+        return complex(*_COMPLEX.unpack(data))
+    if tag == TAG_FRACTION:
+        return Fraction(data.decode("ascii"))
+    if tag == TAG_DECIMAL:
+        return Decimal(data.decode("ascii"))
+    raise ValueError(f"Unknown history value tag {tag}")
+
+
+def _pread(fd: int, size: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)  # pragma: no cover - platform dependent
+    return os.read(fd, size)  # pragma: no cover - platform dependent
+
+
+def _offsets_from_bytes(data: bytes) -> "array[int]":
+    offsets = array("Q")
+    offsets.frombytes(data)
+    if sys.byteorder == "big":  # pragma: no cover - platform dependent
+        offsets.byteswap()
+    return offsets
+
+
+def _offsets_to_bytes(offsets: "array[int]") -> bytes:
+    if sys.byteorder == "big":  # pragma: no cover - platform dependent
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+class PersistentHistory:
+    """File-backed calculation history with batched appends.
+
+    Parameters
+    ----------
+    path:
+        Log file location; created if missing.
+    flush_every:
+        Number of buffered records that triggers a write.
+    fsync:
+        Whether to ``fsync`` the log and index after every write.
+    """
+
+    def __init__(self, path: PathLike, flush_every: int = 64, fsync: bool = False) -> None:
+        if flush_every < 1:
+            raise ValueError("flush_every must be at least 1")
+        self._path = os.fspath(path)
+        self._index_path = self._path + ".idx"
+        self._flush_every = flush_every
+        self._fsync = fsync
+        self._pending: List[Tuple[str, object]] = []
+        self._pending_data: List[bytes] = []
+        self._map: Optional[mmap.mmap] = None
+
+        flags = os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(self._path, flags, 0o644)
+        self._index_fd = os.open(self._index_path, flags, 0o644)
+        try:
+            with self._locked():
+                if os.fstat(self._fd).st_size == 0:
+                    os.write(self._fd, MAGIC)
+                elif _pread(self._fd, len(MAGIC), 0) != MAGIC:
+                    raise ValueError(f"{self._path} is not a PyCalc history log")
+                self._load_index()
+                self._sync()
+        except BaseException:
+            os.close(self._fd)
+            os.close(self._index_fd)
+            raise
+
+    # ------------------------------------------------------------------
+    # HistoryManager-compatible API
+    # ------------------------------------------------------------------
+    def add(self, expression: str, result: float) -> None:
+        """Append a new history entry (buffered until the next flush)."""
+
+        self._pending_data.append(encode_record(expression, result))
+        self._pending.append((expression, result))
+        if len(self._pending) >= self._flush_every:
+            self.flush()
+
+    def record(self, index: int) -> HistoryRecord:
+        """Return the ``index``-th oldest record."""
+
+        stored = len(self._offsets)
+        if 0 <= index < stored:
+            return self._read(index)
+        if stored <= index < stored + len(self._pending):
+            expression, result = self._pending[index - stored]
+            return HistoryRecord(expression=expression, result=result)  # type: ignore[arg-type]
+        raise IndexError("history index out of range")
+
+    def view(self) -> HistoryView:
+        """Return a live sequence view that decodes records on access."""
+
+        return HistoryView(self)  # type: ignore[arg-type]
+
+    def get_all(self) -> List[HistoryRecord]:
+        """Return all records as a list (loads the whole history)."""
+
+        return list(self)
+
+    def clear(self) -> None:
+        """Erase the history, including records written by other sessions."""
+
+        self._pending.clear()
+        self._pending_data.clear()
+        with self._locked():
+            self._unmap()
+            os.ftruncate(self._fd, len(MAGIC))
+            os.ftruncate(self._index_fd, 0)
+            self._offsets = array("Q")
+            self._end = len(MAGIC)
+
+    def __len__(self) -> int:
+        return len(self._offsets) + len(self._pending)
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        for index in range(len(self)):
+            yield self.record(index)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def flush(self) -> None:
+        """Write buffered records to the log and index."""
+
+        if not self._pending_data:
+            return
+        with self._locked():
+            self._sync()
+            data = b"".join(self._pending_data)
+            offsets = array("Q")
+            offset = self._end
+            for chunk in self._pending_data:
+                offsets.append(offset)
+                offset += len(chunk)
+            os.write(self._fd, data)
+            os.write(self._index_fd, _offsets_to_bytes(offsets))
+            if self._fsync:
+                os.fsync(self._fd)
+                os.fsync(self._index_fd)
+            self._offsets.extend(offsets)
+            self._end = offset
+        self._pending.clear()
+        self._pending_data.clear()
+
+    def refresh(self) -> None:
+        """Pick up records appended by other sessions since opening."""
+
+        with self._locked():
+            self._sync()
+
+    def close(self) -> None:
+        """Flush buffered records and release the files."""
+
+        if self._fd < 0:
+            return
+        self.flush()
+        self._unmap()
+        os.close(self._fd)
+        os.close(self._index_fd)
+        self._fd = self._index_fd = -1
+
+    def __enter__(self) -> "PersistentHistory":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:  # pragma: no cover - platform dependent
+            yield
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _load_index(self) -> None:
+        """Load the sidecar index, rebuilding it if it looks damaged."""
+
+        size = os.fstat(self._index_fd).st_size
+        offsets = _offsets_from_bytes(_pread(self._index_fd, size - size % _OFFSET_SIZE, 0))
+
+        log_size = os.fstat(self._fd).st_size
+        end = self._record_end(offsets[-1], log_size) if offsets else len(MAGIC)
+        if size % _OFFSET_SIZE or end is None or (offsets and offsets[0] != len(MAGIC)):
+            offsets = array("Q")
+            end = len(MAGIC)
+            os.ftruncate(self._index_fd, 0)
+        self._offsets = offsets
+        self._end = end
+
+    def _sync(self) -> None:
+        """Catch up with records other sessions wrote since the last sync.
+
+        Must be called with the lock held. Offsets another session
+        already indexed are read from the index; only records missing
+        from it are scanned and appended, so the index never holds an
+        offset twice. If another session cleared the log, the index is
+        reloaded. A truncated record left by a crashed writer is cut off
+        so later appends stay reachable.
+        """
+
+        log_size = os.fstat(self._fd).st_size
+        index_size = os.fstat(self._index_fd).st_size
+        known = len(self._offsets)
+        if (log_size < self._end or index_size < known * _OFFSET_SIZE
+                or (known and self._indexed_offset(known - 1) != self._offsets[-1])):
+            # The log was cleared (and possibly refilled) by another session
+            self._unmap()
+            self._load_index()
+        elif index_size > known * _OFFSET_SIZE:
+            count = index_size // _OFFSET_SIZE - known
+            offsets = _offsets_from_bytes(_pread(self._index_fd, count * _OFFSET_SIZE, known * _OFFSET_SIZE))
+            end = self._record_end(offsets[-1], log_size) if offsets else None
+            if index_size % _OFFSET_SIZE or end is None:
+                self._load_index()
+            else:
+                self._offsets.extend(offsets)
+                self._end = end
+
+        if log_size == self._end:
+            return
+        found = array("Q")
+        offset = self._end
+        while offset < log_size:
+            end = self._record_end(offset, log_size)
+            if end is None:
+                os.ftruncate(self._fd, offset)
+                break
+            found.append(offset)
+            offset = end
+        if found:
+            os.write(self._index_fd, _offsets_to_bytes(found))
+            self._offsets.extend(found)
+        self._end = offset
+
+    def _indexed_offset(self, position: int) -> int:
+        return int(_offsets_from_bytes(_pread(self._index_fd, _OFFSET_SIZE, position * _OFFSET_SIZE))[0])
+
+    def _record_end(self, offset: int, log_size: int) -> Optional[int]:
+        if offset + _HEADER.size > log_size:
+            return None
+        text_len, value_len, _ = _HEADER.unpack(_pread(self._fd, _HEADER.size, offset))
+        end = offset + _HEADER.size + text_len + value_len
+        return end if end <= log_size else None
+
+    def _read(self, index: int) -> HistoryRecord:
+        data = self._mapping()
+        # _mapping() may have picked up a clear() by another session
+        if index >= len(self._offsets):
+            raise IndexError("history index out of range")
+        offset = self._offsets[index]
+        text_len, value_len, tag = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        expression = data[start:start + text_len].decode("utf-8")
+        value = _decode_value(tag, data[start + text_len:start + text_len + value_len])
+        return HistoryRecord(expression=expression, result=value)  # type: ignore[arg-type]
+
+    def _mapping(self) -> mmap.mmap:
+        if os.fstat(self._fd).st_size < self._end:
+            # Cleared by another session: reading the old mapping past the
+            # end of the file would crash, so catch up first
+            self._unmap()
+            self.refresh()
+        if self._map is None or len(self._map) < self._end:
+            self._unmap()
+            self._map = mmap.mmap(self._fd, self._end, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _unmap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+"""Incremental re-parsing of edited expressions.
+
+Interactive users often resubmit a long expression with a small edit.
+:class:`IncrementalParser` keeps the trees of parenthesised groups from
+earlier parses in a bounded cache keyed by the group's text. When an
+expression is parsed, it is compared with the previous one: groups lying
+entirely in the unchanged prefix or suffix are looked up in the cache,
+and only the groups enclosing the edit are tokenised and parsed again,
+with cached sub-trees spliced in as single operands. The flattened RPN
+of each group is cached alongside its tree, so unchanged groups are not
+traversed again either.
+
+A parenthesised group always parses to the same tree regardless of its
+surroundings, which is what makes reusing it by text safe.
+"""
+
+import re
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .cache import CacheInfo, LRUCache
+from .nodes import Node, NodeBuilder, to_rpn
+from .operations import Number
+from .tokens import KIND_NAME, TokenStream
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .parser import ExpressionParser
+
+_PARENS = re.compile(r"[()]")
+
+# (open, close) positions of a parenthesised group
+_Group = Tuple[int, int]
+
+
+class IncrementalParser:
+    """Parse expressions into trees, reusing unchanged groups.
+
+    Parameters
+    ----------
+    parser:
+        Parser providing tokenisation and tree construction.
+    cache_size:
+        Maximum number of group trees to keep.
+    min_group:
+        Groups shorter than this many characters (parentheses included)
+        are parsed inline rather than cached.
+    """
+
+    def __init__(self, parser: "ExpressionParser", cache_size: int = 4096, min_group: int = 16) -> None:
+        self.parser = parser
+        self.min_group = min_group
+        self._groups: LRUCache[Tuple[str, bool], Tuple[Node, TokenStream]] = LRUCache(cache_size)
+        self._previous = ""
+        #: Nanoseconds spent tokenising and number of tokens scanned by
+        #: the last :meth:`to_rpn` call with ``timed=True``.
+        self.last_scan: Tuple[int, int] = (0, 0)
+
+    def to_rpn(self, expression: str, builder: NodeBuilder, timed: bool = False) -> TokenStream:
+        """Parse ``expression`` into RPN, building tree nodes with ``builder``.
+
+        With ``timed=True``, the time spent tokenising and the number of
+        tokens scanned (those of the re-parsed groups only) are stored
+        in :attr:`last_scan`.
+
+        Raises
+        ------
+        ValueError
+            If ``expression`` is malformed. Errors are reported from a
+            plain, non-incremental parse so that positions are exact.
+        """
+
+        session: Optional[_Session] = None
+        try:
+            groups = _match_groups(expression, self.min_group)
+            if groups is None:
+                raise ValueError("Mismatched parentheses")
+            start, end = _changed_range(self._previous, expression)
+            session = _Session(self, expression, groups, start, end, builder, timed)
+            tree = session.build(0, len(expression), groups.get(-1, []))
+        except (ValueError, RecursionError):
+            self._previous = ""
+            if session is None:
+                session = _Session(self, expression, {}, 0, 0, builder, timed)
+            tokens = session.scan(expression)
+            if timed:
+                self.last_scan = (session.scan_time, session.tokens)
+            return to_rpn(self.parser._parse_tokens(tokens, builder))
+        self._previous = expression
+        if timed:
+            self.last_scan = (session.scan_time, session.tokens)
+        return to_rpn(tree, session.flattened)
+
+    def cache_info(self) -> CacheInfo:
+        """Return statistics for the group cache; hits are reused groups."""
+
+        return self._groups.info()
+
+    def clear(self) -> None:
+        """Forget all cached groups and the previous expression."""
+
+        self._groups.clear()
+        self._previous = ""
+
+
+class _Session:
+    """State for parsing one expression."""
+
+    def __init__(self, owner: IncrementalParser, expression: str, groups: Dict[int, List[_Group]],
+                 start: int, end: int, builder: NodeBuilder, timed: bool = False) -> None:
+        self.owner = owner
+        self.expression = expression
+        self.groups = groups
+        self.start = start
+        self.end = end
+        self.builder = _SplicingBuilder(builder)
+        self.optimised = owner.parser.optimise
+        # RPN of every group tree used in this expression
+        self.flattened: Dict[Node, TokenStream] = {}
+        self.timed = timed
+        self.scan_time = 0
+        self.tokens = 0
+
+    def scan(self, text: str) -> TokenStream:
+        """Tokenise ``text``, accounting for it if timed."""
+
+        if not self.timed:
+            return self.owner.parser._scanner.scan(text)
+        start = time.perf_counter_ns()
+        tokens = self.owner.parser._scanner.scan(text)
+        self.scan_time += time.perf_counter_ns() - start
+        self.tokens += len(tokens.kinds)
+        return tokens
+
+    def build(self, low: int, high: int, children: List[_Group]) -> Node:
+        """Parse ``expression[low:high]``, splicing in the child groups."""
+
+        scan = self.scan
+        kinds = bytearray()
+        values: List[Number] = []
+        names: List[str] = []
+        symbols: List[str] = []
+        position = low
+        for opening, closing in children:
+            segment = scan(self.expression[position:opening])
+            kinds += segment.kinds
+            values.extend(segment.values)
+            names.extend(segment.names)
+            symbols.extend(segment.symbols)
+            # Placeholder names contain parentheses, so they can never
+            # clash with a real identifier.
+            placeholder = f"({opening})"
+            self.builder.spliced[placeholder] = self.group(opening, closing)
+            kinds.append(KIND_NAME)
+            names.append(placeholder)
+            position = closing + 1
+        segment = scan(self.expression[position:high])
+        kinds += segment.kinds
+        values.extend(segment.values)
+        names.extend(segment.names)
+        symbols.extend(segment.symbols)
+
+        stream = TokenStream(bytes(kinds), values, tuple(names), tuple(symbols))
+        return self.owner.parser._parse_tokens(stream, self.builder)
+
+    def group(self, opening: int, closing: int) -> Node:
+        unchanged = closing < self.start or opening >= self.end
+        key = (self.expression[opening:closing + 1], self.optimised)
+        entry = self.owner._groups.get(key) if unchanged else None
+        if entry is None:
+            node = self.build(opening + 1, closing, self.groups.get(opening, []))
+            entry = (node, to_rpn(node, self.flattened))
+            self.owner._groups.put(key, entry)
+        node, rpn = entry
+        self.flattened[node] = rpn
+        return node
+
+
+class _SplicingBuilder(NodeBuilder):
+    """Delegating builder that resolves placeholder names to sub-trees."""
+
+    def __init__(self, inner: NodeBuilder) -> None:
+        self.inner = inner
+        self.spliced: Dict[str, Node] = {}
+
+    def constant(self, value: Number) -> Node:
+        return self.inner.constant(value)
+
+    def variable(self, name: str) -> Node:
+        node = self.spliced.get(name)
+        return node if node is not None else self.inner.variable(name)
+
+    def negate(self, operand: Node) -> Node:
+        return self.inner.negate(operand)
+
+    def binary(self, symbol: str, left: Node, right: Node) -> Node:
+        return self.inner.binary(symbol, left, right)
+
+
+def _match_groups(expression: str, min_group: int) -> Optional[Dict[int, List[_Group]]]:
+    """Find the groups of at least ``min_group`` characters.
+
+    Returns a mapping from each group's opening position (``-1`` for the
+    whole expression) to the outermost groups it encloses, in order, or
+    ``None`` if the parentheses are unbalanced.
+    """
+
+    children: Dict[int, List[_Group]] = {}
+    stack: List[int] = []
+    for match in _PARENS.finditer(expression):
+        position = match.start()
+        if match.group() == "(":
+            stack.append(position)
+            continue
+        if not stack:
+            return None
+        opening = stack.pop()
+        if position - opening + 1 >= min_group:
+            children.setdefault(stack[-1] if stack else -1, []).append((opening, position))
+    if stack:
+        return None
+    return children
+
+
+def _changed_range(old: str, new: str) -> Tuple[int, int]:
+    """Return the ``[start, end)`` range of ``new`` that differs from ``old``."""
+
+    limit = min(len(old), len(new))
+    # Binary searches with slice comparisons, which run in C.
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[:middle] == new[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    prefix = low
+
+    low, high = 0, limit - prefix
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[len(old) - middle:] == new[len(new) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return prefix, len(new) - low
@@ -2,11 +2,16 @@ from __future__ import annotations
 
 """Input/output helpers for PyCalc.
 
-Currently this exposes a console-based IO abstraction which is simple
-but keeps user interaction decoupled from the rest of the logic.
+This exposes a console-based IO abstraction for the interactive REPL,
+which is simple but keeps user interaction decoupled from the rest of
+the logic, and a buffered stream IO for non-interactive batch use.
 """
 
-from typing import Optional
+import sys
+from typing import IO, Iterable, Iterator, List, Optional
+
+#: Buffer size used for batch reads and writes.
+BUFFER_SIZE = 1 << 20
 
 
 class ConsoleIO:
@@ -31,3 +36,57 @@ class ConsoleIO:
         """Write a line to standard output."""
 
         print(text)
+
+
+class StreamIO:
+    """Buffered line IO for non-interactive batch processing.
+
+    Lines are read lazily with large buffered reads and output is
+    accumulated and written in blocks, so piping large files through
+    PyCalc uses constant memory and few system calls.
+
+    Parameters
+    ----------
+    paths:
+        Files to read, in order. ``"-"`` or an empty list means
+        standard input.
+    output:
+        Text stream to write to; defaults to standard output.
+    flush_every:
+        Number of buffered lines after which output is written out.
+    """
+
+    def __init__(self, paths: Iterable[str] = (), output: Optional[IO[str]] = None,
+                 flush_every: int = 4096) -> None:
+        self._paths = list(paths) or ["-"]
+        self._output = output if output is not None else sys.stdout
+        self._flush_every = flush_every
+        self._pending: List[str] = []
+
+    def read_lines(self) -> Iterator[str]:
+        """Yield input lines (without trailing newline) from all inputs."""
+
+        for path in self._paths:
+            if path == "-":
+                stream = open(sys.stdin.fileno(), buffering=BUFFER_SIZE, closefd=False)
+            else:
+                stream = open(path, buffering=BUFFER_SIZE)
+            with stream:
+                for line in stream:
+                    yield line.rstrip("\n")
+
+    def write_line(self, text: str) -> None:
+        """Buffer a line of output, writing the buffer out when full."""
+
+        self._pending.append(text)
+        if len(self._pending) >= self._flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered output to the underlying stream."""
+
+        if self._pending:
+            self._pending.append("")
+            self._output.write("\n".join(self._pending))
+            self._pending.clear()
+        self._output.flush()
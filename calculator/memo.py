@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+"""Memoisation of evaluation results.
+
+:class:`ResultMemo` remembers the result of evaluating a
+:class:`calculator.program.CompiledExpression` with a given set of
+variable values, so repeating an evaluation becomes a single cache
+lookup. Entries are bounded in number, can expire after a time-to-live
+and are tracked with hit/miss statistics.
+
+Only *pure* programs, whose operators are all declared ``pure`` in the
+:class:`calculator.operations.OperationEngine`, are memoised; programs
+using a side-effecting operator are always evaluated. As with
+:func:`functools.lru_cache`, bindings that compare equal (such as ``1``
+and ``1.0``) share an entry.
+"""
+
+import time
+from typing import TYPE_CHECKING, Callable, Mapping, Optional, Tuple
+
+from .cache import CacheInfo, LRUCache
+from .operations import Number
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .program import CompiledExpression
+
+
+class ResultMemo:
+    """Bounded, optionally expiring memo of program results.
+
+    Parameters
+    ----------
+    maxsize:
+        Maximum number of remembered results.
+    ttl:
+        Seconds after which a result is recomputed, or ``None`` to keep
+        results until they are evicted.
+    clock:
+        Time source for ``ttl``, in seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        # Keyed by source text; entries record their program so that a
+        # different program compiled from the same text is not confused
+        # with it.
+        self._cache: LRUCache[Tuple[str, Tuple[Number, ...]], Tuple["CompiledExpression", Number]] = \
+            LRUCache(maxsize, ttl=ttl, clock=clock)
+
+    def evaluate(self, program: "CompiledExpression", env: Optional[Mapping[str, Number]] = None) -> Number:
+        """Evaluate ``program`` with ``env``, reusing a remembered result.
+
+        Raises
+        ------
+        NameError
+            If a variable referenced by the program is not bound.
+        """
+
+        if not program.pure:
+            return program.evaluate(env)
+        values = program._bind(env or {}) if program.names else ()
+        key = (program.source, values)
+        try:
+            entry = self._cache.get(key, lambda entry: entry[0] is program or entry[0] == program)
+        except TypeError:
+            # Unhashable bindings (e.g. arrays) cannot be memoised.
+            return program.evaluate(env)
+        if entry is not None:
+            return entry[1]
+        result = program.evaluate(env)
+        self._cache.put(key, (program, result))
+        return result
+
+    def info(self) -> CacheInfo:
+        """Return hit/miss/eviction/expiry statistics."""
+
+        return self._cache.info()
+
+    def clear(self) -> None:
+        """Forget all remembered results."""
+
+        self._cache.clear()
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+"""Prometheus-style metrics for PyCalc embedded in a long-running service.
+
+A :class:`MetricsRegistry` gathers metrics from *collectors*: callables
+that are only invoked when the metrics are read. The parser, engine and
+history are tracked this way (:func:`track_parser`, :func:`track_engine`,
+:func:`track_history`), by reading statistics they keep anyway, so
+exporting metrics adds no work to the evaluation loop::
+
+    registry = MetricsRegistry()
+    parser = ExpressionParser(instrument=True)
+    track_parser(registry, parser)
+    track_engine(registry, parser.engine)
+    track_history(registry, history)
+    server = start_http_server(registry, port=9464)   # GET /metrics
+
+Evaluation throughput, error counts and latency quantiles come from the
+parser's instrumentation (see :mod:`calculator.instrumentation`), so
+create the parser with ``instrument=True`` to export them; cache
+statistics are always exported.
+
+:meth:`MetricsRegistry.exposition` renders the Prometheus text format
+(version 0.0.4). Application code can add its own :class:`Counter`
+objects, whose increments are never lost between threads.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .cache import CacheInfo
+from .instrumentation import AtomicCounter
+from .operations import OperationEngine
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .history import HistoryManager
+    from .history_log import PersistentHistory
+    from .instrumentation import HistogramSnapshot
+    from .parser import ExpressionParser
+
+#: Content type of :meth:`MetricsRegistry.exposition`.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+#: Quantiles exported for summaries.
+QUANTILES = (0.5, 0.9, 0.99)
+
+_NAME = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*\Z")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class Sample:
+    """One value of a metric, e.g. ``pycalc_evaluations_total{parser="a"} 3``."""
+
+    name: str
+    labels: Labels
+    value: float
+
+
+@dataclass(frozen=True)
+class MetricFamily:
+    """A named metric with its type, help text and samples.
+
+    Attributes
+    ----------
+    name:
+        Metric name.
+    type:
+        ``"counter"``, ``"gauge"`` or ``"summary"``.
+    help:
+        One-line description.
+    samples:
+        The metric's values.
+    """
+
+    name: str
+    type: str
+    help: str
+    samples: Tuple[Sample, ...]
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class Counter:
+    """Monotonic counter, safe to increment from several threads."""
+
+    def __init__(self, name: str, help: str, labels: Optional[Mapping[str, str]] = None) -> None:
+        _check_name(name)
+        self.name = name
+        self.help = help
+        self.labels = _labels(labels)
+        self._count = AtomicCounter()
+
+    def inc(self) -> None:
+        """Add one to the counter."""
+
+        self._count.increment()
+
+    @property
+    def value(self) -> int:
+        """Current value."""
+
+        return self._count.value
+
+    def collect(self) -> Iterable[MetricFamily]:
+        yield MetricFamily(self.name, "counter", self.help, (Sample(self.name, self.labels, self.value),))
+
+
+class MetricsRegistry:
+    """Set of collectors exported together."""
+
+    def __init__(self) -> None:
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def register(self, collector: Collector) -> None:
+        """Add a collector, called on every :meth:`collect`."""
+
+        with self._lock:
+            self._collectors.append(collector)
+
+    def counter(self, name: str, help: str, labels: Optional[Mapping[str, str]] = None) -> Counter:
+        """Create, register and return a :class:`Counter`."""
+
+        counter = Counter(name, help, labels)
+        self.register(counter.collect)
+        return counter
+
+    def collect(self) -> List[MetricFamily]:
+        """Run every collector, merging families that share a name.
+
+        Raises
+        ------
+        ValueError
+            If two collectors report the same name with different types.
+        """
+
+        with self._lock:
+            collectors = list(self._collectors)
+        families: Dict[str, MetricFamily] = {}
+        for collector in collectors:
+            for family in collector():
+                known = families.get(family.name)
+                if known is None:
+                    families[family.name] = family
+                elif known.type != family.type:
+                    raise ValueError(f"Metric '{family.name}' reported as both {known.type} and {family.type}")
+                else:
+                    families[family.name] = MetricFamily(known.name, known.type, known.help,
+                                                         known.samples + family.samples)
+        return list(families.values())
+
+    def exposition(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+
+        lines: List[str] = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for sample in family.samples:
+                if sample.labels:
+                    labels = ",".join(f'{key}="{_escape_label(value)}"' for key, value in sample.labels)
+                    lines.append(f"{sample.name}{{{labels}}} {_format_value(sample.value)}")
+                else:
+                    lines.append(f"{sample.name} {_format_value(sample.value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+# ----------------------------------------------------------------------
+# Collectors for PyCalc components
+# ----------------------------------------------------------------------
+def track_parser(registry: MetricsRegistry, parser: "ExpressionParser",
+                 labels: Optional[Mapping[str, str]] = None) -> None:
+    """Export ``parser``'s cache statistics and, if instrumented, its
+    evaluation counts, error counts, per-phase latency and operator use.
+
+    Use ``labels`` (e.g. ``{"parser": "pricing"}``) to tell several
+    tracked parsers apart.
+    """
+
+    base = _labels(labels)
+
+    def collect() -> Iterable[MetricFamily]:
+        yield from _cache_families(base + (("cache", "compile"),), parser.cache_info())
+        result_info = parser.result_cache_info()
+        if result_info is not None:
+            yield from _cache_families(base + (("cache", "result"),), result_info)
+
+        stats = parser.stats()
+        if stats is None:
+            return
+        yield _family("pycalc_evaluations_total", "counter", "Expressions evaluated successfully.",
+                      base, stats.evaluations)
+        yield _family("pycalc_evaluation_errors_total", "counter", "Evaluations that raised an error.",
+                      base, stats.errors)
+        yield _family("pycalc_compilations_total", "counter", "Expressions compiled (compile cache misses).",
+                      base, stats.compilations)
+        phase_samples: List[Sample] = []
+        for phase, summary in stats.phases.items():
+            phase_samples.extend(_summary_samples("pycalc_phase_seconds", base + (("phase", phase),),
+                                                  summary, scale=1e-9))
+        yield MetricFamily("pycalc_phase_seconds", "summary",
+                           "Time spent per pipeline phase (tokenise, to_rpn, assemble, eval).",
+                           tuple(phase_samples))
+        yield MetricFamily("pycalc_expression_tokens", "summary", "Tokens per compiled expression.",
+                           tuple(_summary_samples("pycalc_expression_tokens", base, stats.tokens)))
+        yield MetricFamily("pycalc_operator_applications_total", "counter",
+                           "Operator applications by evaluated expressions.",
+                           tuple(Sample("pycalc_operator_applications_total", base + (("operator", symbol),), count)
+                                 for symbol, count in stats.operators.items()))
+
+    registry.register(collect)
+
+
+def track_engine(registry: MetricsRegistry, engine: OperationEngine,
+                 labels: Optional[Mapping[str, str]] = None) -> None:
+    """Export the number of registered operators and the engine version."""
+
+    base = _labels(labels)
+
+    def collect() -> Iterable[MetricFamily]:
+        yield _family("pycalc_engine_operators", "gauge", "Registered binary operators.",
+                      base, len(engine.table().symbols))
+        yield _family("pycalc_engine_version", "gauge", "Times the operator set changed.", base, engine.version)
+
+    registry.register(collect)
+
+
+def track_history(registry: MetricsRegistry, history: "Union[HistoryManager, PersistentHistory]",
+                  labels: Optional[Mapping[str, str]] = None) -> None:
+    """Export the size of ``history`` and, if bounded, its evictions."""
+
+    base = _labels(labels)
+
+    def collect() -> Iterable[MetricFamily]:
+        yield _family("pycalc_history_records", "gauge", "Records currently in the history.", base, len(history))
+        capacity = getattr(history, "capacity", None)
+        if capacity is not None:
+            yield _family("pycalc_history_capacity", "gauge", "Maximum number of history records.",
+                          base, capacity)
+            yield _family("pycalc_history_evicted_total", "counter",
+                          "Records dropped because the history was full.", base, history.evicted)  # type: ignore[union-attr]
+
+    registry.register(collect)
+
+
+# ----------------------------------------------------------------------
+# HTTP endpoint
+# ----------------------------------------------------------------------
+def start_http_server(registry: MetricsRegistry, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``registry`` at ``http://host:port/metrics`` from a daemon thread.
+
+    The server listens on the loopback interface unless ``host`` says
+    otherwise; ``port=0`` picks a free port (see
+    ``server.server_address``). Call ``server.shutdown()`` to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.exposition().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass  # scrapes are frequent; keep the service's output clean
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="pycalc-metrics", daemon=True).start()
+    return server
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+def _cache_families(labels: Labels, info: CacheInfo) -> Iterable[MetricFamily]:
+    yield _family("pycalc_cache_hits_total", "counter", "Cache lookups that found an entry.", labels, info.hits)
+    yield _family("pycalc_cache_misses_total", "counter", "Cache lookups that found no entry.", labels, info.misses)
+    yield _family("pycalc_cache_evictions_total", "counter", "Entries dropped to respect the cache size.",
+                  labels, info.evictions)
+    yield _family("pycalc_cache_entries", "gauge", "Entries currently cached.", labels, info.size)
+    yield _family("pycalc_cache_hit_ratio", "gauge", "Fraction of cache lookups that were hits.",
+                  labels, info.hit_rate)
+
+
+def _summary_samples(name: str, labels: Labels, summary: "HistogramSnapshot", scale: float = 1.0) -> List[Sample]:
+    samples = [
+        Sample(name, labels + (("quantile", str(q)),), value * scale)
+        for q, value in zip(QUANTILES, (summary.p50, summary.p90, summary.p99))
+    ]
+    samples.append(Sample(f"{name}_sum", labels, summary.total * scale))
+    samples.append(Sample(f"{name}_count", labels, summary.count))
+    return samples
+
+
+def _family(name: str, kind: str, description: str, labels: Labels, value: float) -> MetricFamily:
+    return MetricFamily(name, kind, description, (Sample(name, labels, value),))
+
+
+def _labels(labels: Optional[Mapping[str, str]]) -> Labels:
+    if not labels:
+        return ()
+    for key in labels:
+        _check_name(key)
+    return tuple((key, str(value)) for key, value in labels.items())
+
+
+def _check_name(name: str) -> None:
+    if not _NAME.match(name):
+        raise ValueError(f"Invalid metric or label name '{name}'")
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
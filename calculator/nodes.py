@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+"""Expression tree nodes for PyCalc.
+
+Tree-level passes such as :mod:`calculator.optimiser` convert the flat
+RPN token stream into these nodes with :func:`from_rpn` and back with
+:func:`to_rpn`. Both conversions are iterative, so arbitrarily deep
+expressions never hit Python's recursion limit.
+
+Nodes compare by identity; structural sharing is left to the passes
+that need it.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Mapping, Optional, Tuple, Union
+
+from .operations import Number
+from .tokens import (
+    KIND_NAME,
+    KIND_NEGATE,
+    KIND_NUMBER,
+    KIND_OPERATOR,
+    Token,
+    TokenStream,
+    as_stream,
+)
+
+
+@dataclass(frozen=True, eq=False)
+class Constant:
+    value: Number
+
+
+@dataclass(frozen=True, eq=False)
+class Variable:
+    name: str
+
+
+@dataclass(frozen=True, eq=False)
+class Negate:
+    operand: "Node"
+
+
+@dataclass(frozen=True, eq=False)
+class BinaryOp:
+    symbol: str
+    left: "Node"
+    right: "Node"
+
+
+Node = Union[Constant, Variable, Negate, BinaryOp]
+
+
+class NodeBuilder:
+    """Factory used by :func:`from_rpn` to create nodes.
+
+    Subclasses override the factory methods to rewrite the tree while it
+    is being built bottom-up, e.g. to fold constants.
+    """
+
+    def constant(self, value: Number) -> Node:
+        return Constant(value)
+
+    def variable(self, name: str) -> Node:
+        return Variable(name)
+
+    def negate(self, operand: Node) -> Node:
+        return Negate(operand)
+
+    def binary(self, symbol: str, left: Node, right: Node) -> Node:
+        return BinaryOp(symbol, left, right)
+
+
+def from_rpn(tokens: TokenStream | Iterable[Token], builder: NodeBuilder | None = None) -> Node:
+    """Build a tree from an RPN token stream."""
+
+    builder = builder or NodeBuilder()
+    stream = as_stream(tokens)
+    values = iter(stream.values)
+    names = iter(stream.names)
+    symbols = iter(stream.symbols)
+    stack: List[Node] = []
+
+    for kind in stream.kinds:
+        if kind == KIND_NUMBER:
+            stack.append(builder.constant(next(values)))
+        elif kind == KIND_NAME:
+            stack.append(builder.variable(next(names)))
+        elif kind == KIND_OPERATOR:
+            if len(stack) < 2:
+                raise ValueError("Insufficient values in expression")
+            right = stack.pop()
+            stack.append(builder.binary(next(symbols), stack.pop(), right))
+        elif kind == KIND_NEGATE:
+            if not stack:
+                raise ValueError("Insufficient values in expression")
+            stack.append(builder.negate(stack.pop()))
+        else:
+            raise ValueError("Invalid token in RPN expression")
+
+    if len(stack) != 1:
+        raise ValueError("Invalid expression")
+    return stack[0]
+
+
+def to_rpn(node: Node, known: Optional[Mapping[Node, TokenStream]] = None) -> TokenStream:
+    """Flatten a tree back into an RPN token stream (post-order).
+
+    ``known`` maps sub-trees to their already flattened RPN, which is
+    copied instead of traversing the sub-tree again.
+    """
+
+    kinds = bytearray()
+    # Folded constants need not be floats (e.g. complex), so no array('d')
+    values: List[Number] = []
+    names: List[str] = []
+    symbols: List[str] = []
+    # (node, children_done) pairs emulate the recursive traversal
+    pending: List[Tuple[Node, bool]] = [(node, False)]
+
+    while pending:
+        current, expanded = pending.pop()
+        if known and not expanded and current in known:
+            stream = known[current]
+            kinds += stream.kinds
+            values.extend(stream.values)
+            names.extend(stream.names)
+            symbols.extend(stream.symbols)
+        elif isinstance(current, Constant):
+            kinds.append(KIND_NUMBER)
+            values.append(current.value)
+        elif isinstance(current, Variable):
+            kinds.append(KIND_NAME)
+            names.append(current.name)
+        elif expanded:
+            if isinstance(current, Negate):
+                kinds.append(KIND_NEGATE)
+            else:
+                kinds.append(KIND_OPERATOR)
+                symbols.append(current.symbol)
+        elif isinstance(current, Negate):
+            pending.append((current, True))
+            pending.append((current.operand, False))
+        else:
+            pending.append((current, True))
+            pending.append((current.right, False))
+            pending.append((current.left, False))
+
+    return TokenStream(bytes(kinds), values, tuple(names), tuple(symbols))
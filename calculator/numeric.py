@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+"""Numeric backends for PyCalc.
+
+A :class:`NumericBackend` decides how number literals are represented,
+and therefore which arithmetic the (type-generic) default operators
+perform:
+
+- ``"float"``: binary floating point, the default;
+- ``"int"``: integer literals stay Python ``int`` (exact, arbitrary
+  precision) and only ``/``, fractional powers and literals with a
+  decimal point produce floats;
+- ``"fraction"``: exact rational arithmetic with
+  :class:`fractions.Fraction`;
+- ``"decimal"``: :class:`decimal.Decimal` arithmetic under a
+  configurable :class:`decimal.Context` (see :func:`decimal_backend`).
+
+Backends are selected per parser with
+``ExpressionParser(numeric=...)``. Variable values are used as given, so
+bind values of the backend's type (e.g. ``Decimal`` rather than
+``float``) to keep results exact.
+"""
+
+import decimal
+from contextlib import nullcontext
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Callable, ContextManager, Dict, Optional, Union
+
+from .operations import Number
+
+
+@dataclass(frozen=True)
+class NumericBackend:
+    """How literals are parsed and in which context arithmetic runs.
+
+    Attributes
+    ----------
+    name:
+        Short name of the backend.
+    literal:
+        Converts the text of a number literal into a value.
+    context:
+        Decimal context installed while the parser compiles and
+        evaluates expressions, or ``None``.
+    """
+
+    name: str
+    literal: Callable[[str], Number]
+    context: Optional[decimal.Context] = None
+
+    def scope(self) -> ContextManager[object]:
+        """Return a context manager installing :attr:`context`, if any."""
+
+        if self.context is None:
+            return nullcontext()
+        return decimal.localcontext(self.context)
+
+
+def _int_literal(text: str) -> Number:
+    return float(text) if "." in text else int(text)  # type: ignore[return-value]
+
+
+FLOAT = NumericBackend("float", float)
+INTEGER = NumericBackend("int", _int_literal)
+FRACTION = NumericBackend("fraction", Fraction)  # type: ignore[arg-type]
+
+
+def decimal_backend(context: Optional[decimal.Context] = None) -> NumericBackend:
+    """Return a :class:`decimal.Decimal` backend using ``context``.
+
+    Literals are converted exactly; precision and rounding of the
+    results follow ``context`` (a copy of the default context if
+    omitted).
+    """
+
+    return NumericBackend("decimal", decimal.Decimal, context or decimal.Context())  # type: ignore[arg-type]
+
+
+_BACKENDS: Dict[str, Callable[[], NumericBackend]] = {
+    "float": lambda: FLOAT,
+    "int": lambda: INTEGER,
+    "fraction": lambda: FRACTION,
+    "decimal": decimal_backend,
+}
+
+#: Names accepted by :func:`get_backend`.
+NUMERIC_BACKENDS = tuple(_BACKENDS)
+
+
+def get_backend(numeric: Union[str, NumericBackend]) -> NumericBackend:
+    """Resolve a backend name (one of :data:`NUMERIC_BACKENDS`) or instance."""
+
+    if isinstance(numeric, NumericBackend):
+        return numeric
+    try:
+        return _BACKENDS[numeric]()
+    except KeyError:
+        raise ValueError(f"Unknown numeric backend '{numeric}'") from None
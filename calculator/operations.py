@@ -7,8 +7,10 @@ minimal yet easily extensible. It is used by :mod:`calculator.parser`
 when evaluating parsed expressions.
 """
 
+import operator
 from dataclasses import dataclass
-from typing import Callable, Dict
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional, Tuple
 
 Number = float
 
@@ -27,13 +29,27 @@ class Operation:
         Operator precedence used by the expression parser.
         Higher values bind more tightly.
     associative:
-        Whether the operator is left-associative (currently all are).
+        Whether the operator is left-associative; ``False`` makes it
+        group right-to-left.
+    pure:
+        Whether ``func`` is free of side effects and always returns the
+        same result for the same operands. Only pure operations are
+        evaluated at compile time by :mod:`calculator.optimiser`.
+    identity:
+        Right identity element, i.e. ``x op identity == x`` (``0`` for
+        ``+``, ``1`` for ``*``), or ``None`` if there is none.
+    commutative:
+        Whether ``a op b == b op a``; for operations with an identity
+        this also makes the identity valid on the left.
     """
 
     symbol: str
     func: Callable[[Number, Number], Number]
     precedence: int
     associative: bool = True
+    pure: bool = False
+    identity: Optional[Number] = None
+    commutative: bool = False
 
     def __call__(self, left: Number, right: Number) -> Number:
         """Execute the arithmetic operation."""
@@ -41,28 +57,80 @@ class Operation:
         return self.func(left, right)
 
 
+@dataclass(frozen=True)
+class OperatorTable:
+    """Immutable snapshot of an engine's operators, indexed by integer code.
+
+    Hot loops resolve a symbol to its code once and then use plain tuple
+    indexing instead of repeated :meth:`OperationEngine.get` calls.
+
+    Attributes
+    ----------
+    version:
+        The :attr:`OperationEngine.version` the table was built from.
+    symbols:
+        Operator symbol for each code.
+    codes:
+        Mapping of operator symbol to code.
+    precedence:
+        Precedence for each code.
+    right_associative:
+        For each code, whether the operator groups right-to-left.
+    functions:
+        Implementation for each code.
+    pure:
+        For each code, whether the operation is declared pure.
+    """
+
+    version: int
+    symbols: Tuple[str, ...]
+    codes: Dict[str, int]
+    precedence: Tuple[float, ...]
+    right_associative: Tuple[bool, ...]
+    functions: Tuple[Callable[[Number, Number], Number], ...]
+    pure: Tuple[bool, ...]
+
+
 class OperationEngine:
     """Engine that houses the supported arithmetic operations.
 
     The interface is intentionally small: operations are looked up by
     their symbolic representation.
+
+    Parameters
+    ----------
+    native_divide:
+        Implement ``/`` with :func:`operator.truediv` instead of the
+        Python-level zero check. Division is then a single C call;
+        division by zero still raises :class:`ZeroDivisionError`, but
+        with Python's own message (``"float division by zero"`` for
+        floats).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, native_divide: bool = False) -> None:
         self._operations: Dict[str, Operation] = {}
+        self._dispatch: Dict[str, Callable[[Number, Number], Number]] = {}
+        self._version = 0
+        self._table: Optional[OperatorTable] = None
+        self._native_divide = native_divide
         self._register_default_operations()
 
     # ------------------------------------------------------------------
     # Registration
     # ------------------------------------------------------------------
     def _register_default_operations(self) -> None:
-        """Register the standard arithmetic operations."""
+        """Register the standard arithmetic operations.
+
+        Module-level functions are used rather than lambdas so that the
+        engine and programs compiled from it can be pickled.
+        """
 
-        self.register("+", lambda a, b: a + b, precedence=1)
-        self.register("-", lambda a, b: a - b, precedence=1)
-        self.register("*", lambda a, b: a * b, precedence=2)
-        self.register("/", self._safe_divide, precedence=2)
-        self.register("^", lambda a, b: a ** b, precedence=3)
+        self.register("+", operator.add, precedence=1, pure=True, identity=0, commutative=True)
+        self.register("-", operator.sub, precedence=1, pure=True, identity=0)
+        self.register("*", operator.mul, precedence=2, pure=True, identity=1, commutative=True)
+        divide = operator.truediv if self._native_divide else self._safe_divide
+        self.register("/", divide, precedence=2, pure=True, identity=1)
+        self.register("^", operator.pow, precedence=3, associative=False, pure=True, identity=1)
 
     @staticmethod
     def _safe_divide(a: Number, b: Number) -> Number:
@@ -71,7 +139,8 @@ class OperationEngine:
         return a / b
 
     def register(self, symbol: str, func: Callable[[Number, Number], Number], precedence: int,
-                 associative: bool = True) -> None:
+                 associative: bool = True, pure: bool = False, identity: Optional[Number] = None,
+                 commutative: bool = False) -> None:
         """Register a new binary operation.
 
         Parameters
@@ -84,12 +153,22 @@ class OperationEngine:
             Operator precedence used by the parser.
         associative:
             Whether the operator is left-associative.
+        pure:
+            Declare ``func`` side-effect free so it may be evaluated
+            ahead of time. Defaults to ``False`` for custom operations.
+        identity:
+            Right identity element of the operation, if any.
+        commutative:
+            Whether the operands may be swapped.
         """
 
         if not symbol or len(symbol) != 1:
             raise ValueError("Operation symbol must be a single character.")
-        op = Operation(symbol=symbol, func=func, precedence=precedence, associative=associative)
+        op = Operation(symbol=symbol, func=func, precedence=precedence, associative=associative,
+                       pure=pure, identity=identity, commutative=commutative)
         self._operations[symbol] = op
+        self._dispatch[symbol] = func
+        self._version += 1
 
     # ------------------------------------------------------------------
     # Query
@@ -110,17 +189,59 @@ class OperationEngine:
     def apply(self, symbol: str, left: Number, right: Number) -> Number:
         """Apply the operation ``symbol`` to ``left`` and ``right``.
 
-        This is mostly a small convenience wrapper around :meth:`get`.
+        The function is looked up in the :attr:`dispatch` table and
+        called directly, bypassing the :class:`Operation` wrapper.
         """
 
-        op = self.get(symbol)
-        return op(left, right)
+        return self._dispatch[symbol](left, right)
 
     # ------------------------------------------------------------------
     # Introspection
     # ------------------------------------------------------------------
+    @property
+    def version(self) -> int:
+        """Counter bumped every time the operator set changes.
+
+        Consumers that derive data from the registered operations (such
+        as the parser's compile cache) compare against this value to
+        detect when their derived data has gone stale.
+        """
+
+        return self._version
+
+    @property
+    def dispatch(self) -> Mapping[str, Callable[[Number, Number], Number]]:
+        """Read-only, live mapping of operator symbol to its function.
+
+        Evaluators can look functions up here once and call them
+        directly, which is cheaper than :meth:`apply` or :meth:`get`.
+        """
+
+        return MappingProxyType(self._dispatch)
+
     @property
     def operations(self) -> Dict[str, Operation]:
         """Read-only mapping of operator symbol to :class:`Operation`."""
 
         return dict(self._operations)
+
+    def table(self) -> OperatorTable:
+        """Return an :class:`OperatorTable` snapshot of the operators.
+
+        The snapshot is cached and rebuilt only after :meth:`register`
+        changes the operator set.
+        """
+
+        table = self._table
+        if table is None or table.version != self._version:
+            ops = list(self._operations.values())
+            table = self._table = OperatorTable(
+                version=self._version,
+                symbols=tuple(op.symbol for op in ops),
+                codes={op.symbol: code for code, op in enumerate(ops)},
+                precedence=tuple(op.precedence for op in ops),
+                right_associative=tuple(not op.associative for op in ops),
+                functions=tuple(op.func for op in ops),
+                pure=tuple(op.pure for op in ops),
+            )
+        return table
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+"""Optimisation pass over RPN programs.
+
+:func:`optimise` runs between the shunting-yard conversion and program
+assembly. It rebuilds the RPN as a tree and, using the metadata declared
+on each :class:`calculator.operations.Operation`:
+
+- folds sub-expressions whose operands are all constants, provided the
+  operation is declared ``pure``;
+- removes identity operations such as ``x * 1``, ``x + 0`` and
+  ``0 + x`` (the latter only for ``commutative`` operations);
+- folds negated constants and cancels double negation.
+
+Folding that raises an :class:`ArithmeticError` (e.g. ``1 / 0``) is
+skipped, so the error still surfaces when the program is evaluated.
+
+Identity removal assumes float arithmetic: with exact or decimal numeric
+backends ``x / 1`` promotes to float and ``x * 1`` rounds to the decimal
+context, so parsers using those backends disable it.
+"""
+
+from .nodes import BinaryOp, Constant, Negate, Node, NodeBuilder, from_rpn, to_rpn
+from .operations import Number, OperationEngine
+from .tokens import TokenStream
+
+
+class FoldingBuilder(NodeBuilder):
+    """:class:`NodeBuilder` that simplifies nodes as they are created.
+
+    Parameters
+    ----------
+    engine:
+        Engine providing the operation metadata.
+    identities:
+        Whether to remove identity operations such as ``x * 1``.
+    """
+
+    def __init__(self, engine: OperationEngine, identities: bool = True) -> None:
+        self.engine = engine
+        self.identities = identities
+
+    def negate(self, operand: Node) -> Node:
+        if isinstance(operand, Constant):
+            return Constant(-operand.value)
+        if isinstance(operand, Negate):
+            return operand.operand
+        return Negate(operand)
+
+    def binary(self, symbol: str, left: Node, right: Node) -> Node:
+        op = self.engine.get(symbol)
+        if not op.pure:
+            return BinaryOp(symbol, left, right)
+
+        if isinstance(left, Constant) and isinstance(right, Constant):
+            try:
+                return Constant(op(left.value, right.value))
+            except ArithmeticError:
+                return BinaryOp(symbol, left, right)
+
+        if self.identities and op.identity is not None:
+            if _is_constant(right, op.identity):
+                return left
+            if op.commutative and _is_constant(left, op.identity):
+                return right
+
+        return BinaryOp(symbol, left, right)
+
+
+def _is_constant(node: Node, value: Number) -> bool:
+    return isinstance(node, Constant) and node.value == value
+
+
+def optimise(tokens: TokenStream, engine: OperationEngine, identities: bool = True) -> TokenStream:
+    """Return a simplified equivalent of the RPN program ``tokens``."""
+
+    return to_rpn(from_rpn(tokens, FoldingBuilder(engine, identities)))
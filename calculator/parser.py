@@ -7,53 +7,240 @@ The parser implements a small expression grammar supporting:
 - binary operations: ``+``, ``-``, ``*``, ``/``, ``^``
 - unary minus (e.g. ``-2`` or ``-(1 + 2)``)
 - parentheses
-- floating point numbers.
-
-It uses a variant of Dijkstra's *shunting-yard* algorithm to convert
-infix expressions into Reverse Polish Notation (RPN), which is then
-evaluated using the :class:`calculator.operations.OperationEngine`.
+- floating point numbers
+- variables (identifiers bound at evaluation time).
+
+Expressions are split into tokens by :class:`calculator.scanner.Scanner`.
+By default the parser uses a variant of Dijkstra's *shunting-yard*
+algorithm to convert infix expressions into Reverse Polish Notation
+(RPN); alternatively :class:`calculator.pratt.PrattParser` builds an
+expression tree directly. Either way the program is simplified by
+:mod:`calculator.optimiser` and then assembled into a
+:class:`calculator.program.CompiledExpression` whose operators are
+resolved from the :class:`calculator.operations.OperationEngine`.
 """
 
-from dataclasses import dataclass
-from typing import List, Union
-
+import operator
+import time
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .batch import BatchResult, evaluate_many
+from .cache import CacheInfo, LRUCache
+from .cse import BatchProgram, compile_batch
+from .incremental import IncrementalParser
+from .instrumentation import Instrumentation, InstrumentationSnapshot
+from .memo import ResultMemo
+from .numeric import NumericBackend, get_backend
 from .operations import OperationEngine, Number
+from .nodes import Node, NodeBuilder, from_rpn, to_rpn
+from .optimiser import FoldingBuilder, optimise
+from .pratt import PrattParser
+from .program import BACKENDS, CompiledExpression
+from .scanner import Scanner
+from .tokens import (
+    KIND_LEFT_PAREN,
+    KIND_NAME,
+    KIND_NEGATE,
+    KIND_NUMBER,
+    KIND_OPERATOR,
+    KIND_RIGHT_PAREN,
+    NEGATE_PRECEDENCE,
+    NEGATE_SYMBOL,
+    Token,
+    TokenStream,
+    as_stream,
+)
+# Token classes used to live in this module; keep them importable from here.
+from .tokens import (  # noqa: F401
+    LeftParenToken,
+    NameToken,
+    NegateToken,
+    NumberToken,
+    OperatorToken,
+    RightParenToken,
+)
+
+# Token kinds after which "-" is a unary minus (-1: start of input)
+_PREFIX_CONTEXT = frozenset((-1, KIND_OPERATOR, KIND_NEGATE, KIND_LEFT_PAREN))
+
+# Token kinds that end an operand, so an operand or "(" may not follow
+_OPERAND_END = frozenset((KIND_NUMBER, KIND_NAME, KIND_RIGHT_PAREN))
+
+#: Available parsing algorithms; both group expressions identically.
+ALGORITHMS = ("shunting-yard", "pratt")
 
 
-@dataclass(frozen=True)
-class NumberToken:
-    value: Number
+class ExpressionParser:
+    """Parse and evaluate simple arithmetic expressions.
+
+    Compiled programs are kept in a bounded LRU cache keyed by the
+    expression text, so re-evaluating the same string skips
+    tokenisation and the shunting-yard conversion. The cache is dropped
+    automatically whenever the engine's operator set changes.
+
+    Parameters
+    ----------
+    engine:
+        Operation engine to use; a default engine is created if omitted.
+    cache_size:
+        Maximum number of compiled expressions to keep. ``0`` disables
+        caching.
+    backend:
+        How compiled programs are evaluated: ``"rpn"`` interprets the
+        instruction stream, ``"python"`` generates a native Python
+        function per expression (slower to compile, faster to run).
+    optimise:
+        Whether to fold constant sub-expressions and remove identity
+        operations before assembling programs.
+    algorithm:
+        How infix tokens are parsed: ``"shunting-yard"`` converts them to
+        RPN, ``"pratt"`` builds an expression tree with
+        :class:`calculator.pratt.PrattParser`.
+    incremental:
+        Re-parse only the parenthesised groups that changed since the
+        previously compiled expression, reusing the trees of unchanged
+        groups (see :mod:`calculator.incremental`). Useful when long
+        expressions are resubmitted with small edits.
+    result_cache_size:
+        Maximum number of evaluation results remembered by
+        :meth:`evaluate`, keyed by expression and variable values.
+        ``0`` (the default) disables result memoisation. Only programs
+        whose operators are all declared pure are memoised.
+    result_ttl:
+        Seconds after which a remembered result expires, or ``None``.
+    numeric:
+        Numeric backend: ``"float"`` (default), ``"int"``, ``"fraction"``,
+        ``"decimal"`` or a :class:`calculator.numeric.NumericBackend`
+        (e.g. from :func:`calculator.numeric.decimal_backend` to choose
+        a decimal context). It determines the type of number literals;
+        a decimal context is active while compiling and evaluating.
+    instrument:
+        Record per-phase timings, token counts and operator counts (see
+        :mod:`calculator.instrumentation`), readable with :meth:`stats`.
+        Expressions evaluated by worker processes are not recorded.
+    """
+
+    def __init__(self, engine: OperationEngine | None = None, cache_size: int = 1024,
+                 backend: str = "rpn", optimise: bool = True, algorithm: str = "shunting-yard",
+                 incremental: bool = False, result_cache_size: int = 0,
+                 result_ttl: Optional[float] = None,
+                 numeric: "str | NumericBackend" = "float", instrument: bool = False) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'")
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown parsing algorithm '{algorithm}'")
+        self.engine = engine or OperationEngine()
+        self.backend = backend
+        self.optimise = optimise
+        self.algorithm = algorithm
+        self.numeric = get_backend(numeric)
+        # x * 1 -> x is only exact with float arithmetic
+        self._identities = self.numeric.name == "float"
+        self._scanner = Scanner(self.engine, self.numeric.literal)
+        self._pratt = PrattParser(self.engine)
+        self._incremental = IncrementalParser(self) if incremental else None
+        self._memo = ResultMemo(result_cache_size, ttl=result_ttl) if result_cache_size else None
+        self._instrumentation = Instrumentation() if instrument else None
+        self._cache: LRUCache[str, CompiledExpression] = LRUCache(cache_size)
+        self._cache_version = self.engine.version
 
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def evaluate(self, expression: str, env: Optional[Mapping[str, Number]] = None) -> Number:
+        """Parse and evaluate ``expression``.
 
-@dataclass(frozen=True)
-class OperatorToken:
-    symbol: str
+        Parameters
+        ----------
+        expression:
+            Infix arithmetic expression.
+        env:
+            Values for the variables referenced by ``expression``.
+        """
 
+        if self._instrumentation is not None:
+            return self._evaluate_instrumented(expression, env, self._instrumentation)
+        program = self.compile(expression)
+        if self._memo is not None:
+            return self._memo.evaluate(program, env)
+        return program.evaluate(env)
+
+    def _evaluate_instrumented(self, expression: str, env: Optional[Mapping[str, Number]],
+                               stats: Instrumentation) -> Number:
+        try:
+            program = self.compile(expression)
+            start = time.perf_counter_ns()
+            result = self._memo.evaluate(program, env) if self._memo is not None else program.evaluate(env)
+            elapsed = time.perf_counter_ns() - start
+        except Exception:
+            stats.record_error()
+            raise
+        stats.record_evaluation(program, elapsed)
+        return result
+
+    def evaluate_columns(self, expression: str, columns: Mapping[str, Sequence[Number]]) -> Sequence[Number]:
+        """Evaluate ``expression`` once per row of ``columns``.
+
+        Uses NumPy ufuncs over whole arrays when possible; see
+        :func:`calculator.vectorised.evaluate_columns`.
 
-@dataclass(frozen=True)
-class LeftParenToken:
-    pass
+        Parameters
+        ----------
+        expression:
+            Infix arithmetic expression.
+        columns:
+            One equally sized sequence of values per variable.
+        """
 
+        return self.compile(expression).evaluate_columns(columns)
 
-@dataclass(frozen=True)
-class RightParenToken:
-    pass
+    def evaluate_many(self, expressions: Iterable[str], workers: int = 1, chunk_size: int = 1000,
+                      engine_factory: Optional[Callable[[], OperationEngine]] = None) -> List[BatchResult]:
+        """Evaluate many independent expressions, optionally in parallel.
 
+        Results are returned in input order; an expression that fails to
+        parse or evaluate produces a :class:`calculator.batch.BatchResult`
+        with ``error`` set instead of raising.
 
-Token = Union[NumberToken, OperatorToken, LeftParenToken, RightParenToken]
+        Parameters
+        ----------
+        expressions:
+            Iterable of infix expressions.
+        workers:
+            Number of worker processes; ``1`` evaluates in-process.
+        chunk_size:
+            Number of expressions sent to a worker at a time.
+        engine_factory:
+            Picklable callable that recreates the engine in each worker,
+            for engines whose operators cannot be pickled.
+        """
 
+        return evaluate_many(self, expressions, workers, chunk_size, engine_factory)
 
-class ExpressionParser:
-    """Parse and evaluate simple arithmetic expressions."""
+    def compile_batch(self, expressions: Iterable[str]) -> BatchProgram:
+        """Compile ``expressions`` into one program sharing common sub-expressions.
 
-    def __init__(self, engine: OperationEngine | None = None) -> None:
-        self.engine = engine or OperationEngine()
+        Each distinct (pure) sub-expression of the batch is evaluated
+        once per :meth:`calculator.cse.BatchProgram.evaluate` call; the
+        program's ``saved`` attribute reports how many operations that
+        avoids. Expressions that fail to parse are reported as errors.
 
-    # ------------------------------------------------------------------
-    # Public API
-    # ------------------------------------------------------------------
-    def evaluate(self, expression: str) -> Number:
-        """Parse and evaluate ``expression``.
+        Parameters
+        ----------
+        expressions:
+            Iterable of infix expressions.
+        """
+
+        return compile_batch(self, expressions)
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """Compile ``expression`` into a reusable :class:`CompiledExpression`.
+
+        The returned program can be called any number of times, with
+        variable values passed as keyword arguments, shared across
+        threads and pickled. Operator functions are resolved from
+        the engine at compile time, so later :meth:`OperationEngine.register`
+        calls do not affect an existing program.
 
         Parameters
         ----------
@@ -61,147 +248,258 @@ class ExpressionParser:
             Infix arithmetic expression.
         """
 
-        tokens = self._tokenise(expression)
-        rpn = self._to_rpn(tokens)
-        return self._eval_rpn(rpn)
+        if self._cache_version != self.engine.version:
+            # Operator set changed: cached programs may be stale.
+            self._cache.clear()
+            if self._incremental is not None:
+                self._incremental.clear()
+            if self._memo is not None:
+                self._memo.clear()
+            self._cache_version = self.engine.version
 
-    # ------------------------------------------------------------------
-    # Tokenisation
-    # ------------------------------------------------------------------
-    def _tokenise(self, expression: str) -> List[Token]:
-        tokens: List[Token] = []
-        i = 0
-        n = len(expression)
-        last_token: Token | None = None
+        program = self._cache.get(expression)
+        if program is None:
+            with self.numeric.scope():
+                program = self._compile(expression)
+            self._cache.put(expression, program)
+        return program
 
-        while i < n:
-            ch = expression[i]
+    def parse(self, expression: str) -> Node:
+        """Parse ``expression`` into a :mod:`calculator.nodes` tree.
 
-            if ch.isspace():
-                i += 1
-                continue
+        The tree is not optimised and is built with the configured
+        ``algorithm``.
 
-            # Number literal (supports simple floats)
-            if ch.isdigit() or (ch == "." and i + 1 < n and expression[i + 1].isdigit()):
-                start = i
-                has_dot = ch == "."
-                i += 1
-                while i < n:
-                    c = expression[i]
-                    if c.isdigit():
-                        i += 1
-                        continue
-                    if c == "." and not has_dot:
-                        has_dot = True
-                        i += 1
-                        continue
-                    break
-                tokens.append(NumberToken(float(expression[start:i])))
-                last_token = tokens[-1]
-                continue
+        Parameters
+        ----------
+        expression:
+            Infix arithmetic expression.
+        """
 
-            # Parentheses
-            if ch == "(":
-                tokens.append(LeftParenToken())
-                last_token = tokens[-1]
-                i += 1
-                continue
-            if ch == ")":
-                tokens.append(RightParenToken())
-                last_token = tokens[-1]
-                i += 1
-                continue
+        return self._parse_tokens(self._tokenise(expression), NodeBuilder())
 
-            # Operators, including unary minus handled during RPN conversion
-            if self.engine.has(ch):
-                tokens.append(OperatorToken(ch))
-                last_token = tokens[-1]
-                i += 1
-                continue
+    def cache_info(self) -> CacheInfo:
+        """Return hit/miss/eviction statistics for the compile cache."""
+
+        return self._cache.info()
+
+    def clear_cache(self) -> None:
+        """Discard all cached compiled expressions and results."""
+
+        self._cache.clear()
+        if self._memo is not None:
+            self._memo.clear()
+
+    def result_cache_info(self) -> Optional[CacheInfo]:
+        """Return statistics for the result memo, or ``None`` if disabled."""
+
+        return self._memo.info() if self._memo is not None else None
+
+    def stats(self) -> Optional[InstrumentationSnapshot]:
+        """Return what instrumentation recorded, or ``None`` if disabled."""
+
+        return self._instrumentation.snapshot() if self._instrumentation is not None else None
+
+    def reset_stats(self) -> None:
+        """Discard what instrumentation recorded so far."""
+
+        if self._instrumentation is not None:
+            self._instrumentation.reset()
 
-            raise ValueError(f"Unexpected character at position {i}: '{ch}'")
+    # ------------------------------------------------------------------
+    # Tokenisation and parsing
+    # ------------------------------------------------------------------
+    def _tokenise(self, expression: str) -> TokenStream:
+        return self._scanner.scan(expression)
+
+    def _parse_tokens(self, tokens: TokenStream, builder: NodeBuilder) -> Node:
+        """Build a tree from infix ``tokens`` with the configured algorithm."""
+
+        if self.algorithm == "pratt":
+            return self._pratt.parse(tokens, builder)
+        return from_rpn(self._to_rpn(tokens), builder)
+
+    def _compile(self, expression: str) -> CompiledExpression:
+        if self._instrumentation is not None:
+            return self._compile_instrumented(expression, self._instrumentation)
+        if self._incremental is not None:
+            rpn = self._incremental.to_rpn(expression, self._builder())
+        else:
+            rpn = self._parse_rpn(self._tokenise(expression))
+        return self._assemble(expression, rpn)
+
+    def _compile_instrumented(self, expression: str, stats: Instrumentation) -> CompiledExpression:
+        clock = time.perf_counter_ns
+        start = clock()
+        if self._incremental is not None:
+            rpn = self._incremental.to_rpn(expression, self._builder(), timed=True)
+            parsed = clock()
+            scanned, tokens = self._incremental.last_scan
+            stats.record_phase("tokenise", scanned)
+            stats.record_tokens(tokens)
+            start += scanned
+        else:
+            tokens = self._tokenise(expression)
+            tokenised = clock()
+            rpn = self._parse_rpn(tokens)
+            parsed = clock()
+            stats.record_phase("tokenise", tokenised - start)
+            stats.record_tokens(len(tokens.kinds))
+            start = tokenised
+        stats.record_phase("to_rpn", parsed - start)
+        program = self._assemble(expression, rpn)
+        stats.record_phase("assemble", clock() - parsed)
+        return program
+
+    def _parse_rpn(self, tokens: TokenStream) -> TokenStream:
+        """Convert infix ``tokens`` to (optimised) RPN with the configured algorithm."""
+
+        if self.algorithm == "pratt":
+            return to_rpn(self._pratt.parse(tokens, self._builder()))
+        rpn = self._to_rpn(tokens)
+        return optimise(rpn, self.engine, self._identities) if self.optimise else rpn
 
-        return tokens
+    def _builder(self) -> NodeBuilder:
+        return FoldingBuilder(self.engine, self._identities) if self.optimise else NodeBuilder()
 
     # ------------------------------------------------------------------
     # Shunting-yard to RPN
     # ------------------------------------------------------------------
-    def _to_rpn(self, tokens: List[Token]) -> List[Token]:
-        output: List[Token] = []
-        ops: List[OperatorToken | LeftParenToken] = []
-        prev: Token | None = None
-
-        for token in tokens:
-            if isinstance(token, NumberToken):
-                output.append(token)
-                prev = token
+    def _to_rpn(self, tokens: TokenStream | Sequence[Token]) -> TokenStream:
+        stream = as_stream(tokens)
+        table = self.engine.table()
+        codes = table.codes
+        table_symbols = table.symbols
+        right_associative = table.right_associative
+        # Unary minus gets the code after the last binary operator and
+        # left parentheses are marked with -1, so the pending-operator
+        # stack holds plain ints.
+        negate = len(table_symbols)
+        precedence = table.precedence + (NEGATE_PRECEDENCE,)
+        output = bytearray()
+        output_codes: List[int] = []
+        ops: List[int] = []
+        symbols = iter(stream.symbols)
+        prev = -1
+
+        for kind in stream.kinds:
+            if kind == KIND_NUMBER or kind == KIND_NAME:
+                if prev in _OPERAND_END:
+                    raise ValueError("Invalid expression")
+                output.append(kind)
+                prev = kind
                 continue
 
-            if isinstance(token, OperatorToken):
-                # Detect unary minus and convert "-x" to "0 - x" pattern
-                if token.symbol == "-" and (
-                    prev is None
-                    or isinstance(prev, OperatorToken)
-                    or isinstance(prev, LeftParenToken)
-                ):
-                    # Insert an implicit zero before unary minus
-                    output.append(NumberToken(0.0))
-
-                # Pop operators from stack based on precedence
-                while ops and isinstance(ops[-1], OperatorToken):
+            if kind == KIND_OPERATOR:
+                symbol = next(symbols)
+                # Unary minus is a prefix operator: it pops nothing and
+                # binds tighter than everything below NEGATE_PRECEDENCE.
+                if symbol == "-" and prev in _PREFIX_CONTEXT:
+                    ops.append(negate)
+                    prev = KIND_NEGATE
+                    continue
+
+                # Pop operators that bind at least as tightly (strictly
+                # more tightly for a right-associative operator).
+                code = codes[symbol]
+                cur_precedence = precedence[code]
+                right = right_associative[code]
+                while ops:
                     top = ops[-1]
-                    top_op = self.engine.get(top.symbol)
-                    cur_op = self.engine.get(token.symbol)
-                    if top_op.precedence >= cur_op.precedence:
-                        output.append(ops.pop())
-                    else:
+                    if top < 0:
+                        break
+                    top_precedence = precedence[top]
+                    if top_precedence < cur_precedence or (right and top_precedence == cur_precedence):
                         break
-                ops.append(token)
-                prev = token
+                    ops.pop()
+                    if top == negate:
+                        output.append(KIND_NEGATE)
+                    else:
+                        output.append(KIND_OPERATOR)
+                        output_codes.append(top)
+                ops.append(code)
+                prev = kind
                 continue
 
-            if isinstance(token, LeftParenToken):
-                ops.append(token)
-                prev = token
+            if kind == KIND_LEFT_PAREN:
+                if prev in _OPERAND_END:
+                    raise ValueError("Invalid expression")
+                ops.append(-1)
+                prev = kind
                 continue
 
-            if isinstance(token, RightParenToken):
+            if kind == KIND_RIGHT_PAREN:
                 # Pop until matching left parenthesis found
-                while ops and not isinstance(ops[-1], LeftParenToken):
-                    output.append(ops.pop())
-                if not ops or not isinstance(ops[-1], LeftParenToken):
+                while ops and ops[-1] >= 0:
+                    top = ops.pop()
+                    if top == negate:
+                        output.append(KIND_NEGATE)
+                    else:
+                        output.append(KIND_OPERATOR)
+                        output_codes.append(top)
+                if not ops:
                     raise ValueError("Mismatched parentheses")
                 ops.pop()  # discard left paren
-                prev = token
+                prev = kind
                 continue
 
+            raise ValueError("Invalid token in expression")
+
         # Drain remaining operators
         while ops:
-            op = ops.pop()
-            if isinstance(op, LeftParenToken):
+            top = ops.pop()
+            if top < 0:
                 raise ValueError("Mismatched parentheses")
-            output.append(op)
+            if top == negate:
+                output.append(KIND_NEGATE)
+            else:
+                output.append(KIND_OPERATOR)
+                output_codes.append(top)
 
-        return output
+        return TokenStream(bytes(output), stream.values, stream.names,
+                           tuple(table_symbols[code] for code in output_codes),
+                           tuple(output_codes), table)
 
     # ------------------------------------------------------------------
     # RPN evaluation
     # ------------------------------------------------------------------
-    def _eval_rpn(self, tokens: List[Token]) -> Number:
+    def _eval_rpn(self, tokens: TokenStream | Sequence[Token],
+                  env: Optional[Mapping[str, Number]] = None) -> Number:
+        stream = as_stream(tokens)
+        table = self.engine.table()
+        functions = table.functions
         stack: List[Number] = []
+        values = iter(stream.values)
+        names = iter(stream.names)
+        if stream.table is table:
+            codes = iter(stream.codes)
+        else:
+            codes = map(table.codes.__getitem__, stream.symbols)
+
+        for kind in stream.kinds:
+            if kind == KIND_NUMBER:
+                stack.append(next(values))
+                continue
 
-        for token in tokens:
-            if isinstance(token, NumberToken):
-                stack.append(token.value)
+            if kind == KIND_NAME:
+                name = next(names)
+                if env is None or name not in env:
+                    raise NameError(f"Unbound variable '{name}'")
+                stack.append(env[name])
                 continue
 
-            if isinstance(token, OperatorToken):
+            if kind == KIND_OPERATOR:
                 if len(stack) < 2:
                     raise ValueError("Insufficient values in expression")
                 b = stack.pop()
                 a = stack.pop()
-                res = self.engine.apply(token.symbol, a, b)
-                stack.append(res)
+                stack.append(functions[next(codes)](a, b))
+                continue
+
+            if kind == KIND_NEGATE:
+                if not stack:
+                    raise ValueError("Insufficient values in expression")
+                stack.append(-stack.pop())
                 continue
 
             raise ValueError("Invalid token in RPN expression")
@@ -209,4 +507,99 @@ class ExpressionParser:
         if len(stack) != 1:
             raise ValueError("Invalid expression")
 
-        return stack
+        return stack[0]
+
+    # ------------------------------------------------------------------
+    # Program assembly
+    # ------------------------------------------------------------------
+    def _assemble(self, expression: str, tokens: TokenStream) -> CompiledExpression:
+        """Lower an RPN token stream into a slot-based :class:`CompiledExpression`.
+
+        Operator functions are resolved once here and the stack depth is
+        checked, so the resulting program never needs to validate at run
+        time. Variables occupy the slots following the constants.
+        """
+
+        table = self.engine.table()
+        code: List[int] = []
+        constants: List[Number] = list(tokens.values)
+        functions: List[Callable[..., Number]] = []
+        arities: List[int] = []
+        symbols: List[str] = []
+        names: List[str] = []
+        function_slots: Dict[str, int] = {}
+        name_slots: Dict[str, int] = {}
+        name_positions: List[int] = []
+        token_names = iter(tokens.names)
+        token_symbols = iter(tokens.symbols)
+        constant_slot = 0
+        depth = 0
+        pure = True
+
+        for kind in tokens.kinds:
+            if kind == KIND_NUMBER:
+                code.append(constant_slot)
+                constant_slot += 1
+                depth += 1
+                continue
+
+            if kind == KIND_NAME:
+                name = next(token_names)
+                slot = name_slots.get(name)
+                if slot is None:
+                    slot = name_slots[name] = len(names)
+                    names.append(name)
+                # Final slot is only known once all constants are collected
+                name_positions.append(len(code))
+                code.append(slot)
+                depth += 1
+                continue
+
+            if kind == KIND_OPERATOR:
+                if depth < 2:
+                    raise ValueError("Insufficient values in expression")
+                symbol = next(token_symbols)
+                slot = function_slots.get(symbol)
+                if slot is None:
+                    slot = function_slots[symbol] = len(functions)
+                    index = table.codes[symbol]
+                    functions.append(table.functions[index])
+                    pure = pure and table.pure[index]
+                    arities.append(2)
+                    symbols.append(symbol)
+                code.append(~slot)
+                depth -= 1
+                continue
+
+            if kind == KIND_NEGATE:
+                if depth < 1:
+                    raise ValueError("Insufficient values in expression")
+                slot = function_slots.get(NEGATE_SYMBOL)
+                if slot is None:
+                    slot = function_slots[NEGATE_SYMBOL] = len(functions)
+                    functions.append(operator.neg)
+                    arities.append(1)
+                    symbols.append(NEGATE_SYMBOL)
+                code.append(~slot)
+                continue
+
+            raise ValueError("Invalid token in RPN expression")
+
+        if depth != 1:
+            raise ValueError("Invalid expression")
+
+        for position in name_positions:
+            code[position] += len(constants)
+
+        return CompiledExpression(
+            source=expression,
+            code=tuple(code),
+            constants=tuple(constants),
+            functions=tuple(functions),
+            arities=tuple(arities),
+            symbols=tuple(symbols),
+            names=tuple(names),
+            backend=self.backend,
+            pure=pure,
+            numeric=self.numeric,
+        )
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+"""Pratt (top-down operator precedence) parser for PyCalc.
+
+:class:`PrattParser` is an alternative to the parser's shunting-yard
+conversion. Instead of flat RPN it builds an expression tree of
+:mod:`calculator.nodes` directly from the token stream, honouring the
+precedence and associativity of every registered operator as well as
+unary minus. Trees are created through a
+:class:`calculator.nodes.NodeBuilder`, so passing
+:class:`calculator.optimiser.FoldingBuilder` simplifies the tree while
+it is being parsed.
+
+Both parsers group expressions identically. The Pratt parser recurses
+once per nesting level (parentheses, unary minus and chains of
+right-associative operators), so pathologically deep expressions are
+rejected with a :class:`ValueError` rather than exhausting the stack.
+"""
+
+from typing import Sequence
+
+from .nodes import Node, NodeBuilder
+from .operations import OperationEngine
+from .tokens import (
+    KIND_LEFT_PAREN,
+    KIND_NAME,
+    KIND_NUMBER,
+    KIND_OPERATOR,
+    KIND_RIGHT_PAREN,
+    NEGATE_PRECEDENCE,
+    Token,
+    TokenStream,
+    as_stream,
+)
+
+_LOWEST = float("-inf")
+
+
+class PrattParser:
+    """Build expression trees from tokens using operator precedence.
+
+    Parameters
+    ----------
+    engine:
+        Operation engine providing operator precedence and associativity.
+    """
+
+    def __init__(self, engine: OperationEngine) -> None:
+        self.engine = engine
+
+    def parse(self, tokens: TokenStream | Sequence[Token], builder: NodeBuilder | None = None) -> Node:
+        """Parse infix ``tokens`` into a tree.
+
+        Parameters
+        ----------
+        tokens:
+            Infix tokens as produced by :class:`calculator.scanner.Scanner`.
+        builder:
+            Factory for the tree nodes; a plain :class:`NodeBuilder` if
+            omitted.
+
+        Raises
+        ------
+        ValueError
+            If the tokens do not form a valid expression.
+        """
+
+        stream = as_stream(tokens)
+        builder = builder or NodeBuilder()
+        table = self.engine.table()
+        codes = table.codes
+        precedence = table.precedence
+        right_associative = table.right_associative
+        kinds = stream.kinds
+        symbols = stream.symbols
+        values = iter(stream.values)
+        names = iter(stream.names)
+        end = len(kinds)
+        index = 0  # next position in ``kinds``
+        symbol_index = 0  # next position in ``symbols``
+
+        def expression(limit: float) -> Node:
+            # Parse an operand followed by every operator binding more
+            # tightly than ``limit`` (or as tightly, if right-associative).
+            nonlocal index, symbol_index
+            left = operand()
+            while index < end:
+                kind = kinds[index]
+                if kind == KIND_RIGHT_PAREN:
+                    break
+                if kind != KIND_OPERATOR:
+                    raise ValueError("Invalid expression")
+                symbol = symbols[symbol_index]
+                code = codes[symbol]
+                current = precedence[code]
+                if current < limit or (current == limit and not right_associative[code]):
+                    break
+                index += 1
+                symbol_index += 1
+                left = builder.binary(symbol, left, expression(current))
+            return left
+
+        def operand() -> Node:
+            nonlocal index, symbol_index
+            if index >= end:
+                raise ValueError("Insufficient values in expression")
+            kind = kinds[index]
+            index += 1
+            if kind == KIND_NUMBER:
+                return builder.constant(next(values))
+            if kind == KIND_NAME:
+                return builder.variable(next(names))
+            if kind == KIND_LEFT_PAREN:
+                node = expression(_LOWEST)
+                if index >= end:
+                    raise ValueError("Mismatched parentheses")
+                index += 1  # closing parenthesis
+                return node
+            if kind == KIND_OPERATOR and symbols[symbol_index] == "-":
+                symbol_index += 1
+                return builder.negate(expression(NEGATE_PRECEDENCE))
+            if kind == KIND_RIGHT_PAREN:
+                raise ValueError("Invalid expression")
+            raise ValueError("Insufficient values in expression")
+
+        try:
+            tree = expression(_LOWEST)
+        except RecursionError:
+            raise ValueError("Expression is nested too deeply") from None
+        if index != end:
+            # ``expression`` only stops early at an unmatched ")"
+            raise ValueError("Mismatched parentheses")
+        return tree
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+"""Profiling helpers for the REPL ``profile`` command and ``--profile``.
+
+:func:`profile` runs a callable under :mod:`cProfile` and returns its
+statistics. :func:`hot_functions` ranks the functions that ran by the
+time spent in their own code. Because the profiled region only covers
+parsing and evaluation, the ranking shows the parser and engine
+internals next to the operator functions registered through
+:meth:`calculator.operations.OperationEngine.register`, which makes a
+slow custom operator easy to spot.
+
+Statistics can be saved with :func:`dump`, either as a :mod:`pstats`
+file (for ``python -m pstats``, snakeviz and similar viewers) or as
+collapsed stacks, the input format of ``flamegraph.pl`` and speedscope.
+"""
+
+import cProfile
+import os
+import pstats
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Dict, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# pstats key: (file name, line number, function name)
+_Function = Tuple[str, int, str]
+
+#: File suffixes for which :func:`dump` writes collapsed stacks.
+COLLAPSED_SUFFIXES = (".folded", ".collapsed")
+
+# Calls made by the profiler itself rather than by the profiled code.
+_PROFILER_ENTRIES = ("<method 'disable' of '_lsprof.Profiler' objects>",)
+
+
+@dataclass(frozen=True)
+class HotFunction:
+    """One line of a :func:`hot_functions` ranking.
+
+    Attributes
+    ----------
+    name:
+        Function name with its file and line, e.g.
+        ``"_eval_rpn (parser.py:412)"``.
+    calls:
+        Number of calls.
+    own_time:
+        Seconds spent in the function itself, excluding callees.
+    total_time:
+        Seconds spent in the function including its callees.
+    """
+
+    name: str
+    calls: int
+    own_time: float
+    total_time: float
+
+
+def profile(func: Callable[..., T], *args: Any, **kwargs: Any) -> Tuple[T, pstats.Stats]:
+    """Call ``func(*args, **kwargs)`` under :mod:`cProfile`.
+
+    Returns the call's result and the collected statistics. If ``func``
+    raises, the exception propagates and the statistics are discarded.
+    """
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    return result, pstats.Stats(profiler)
+
+
+def hot_functions(stats: pstats.Stats, limit: int = 10) -> List[HotFunction]:
+    """Return the ``limit`` functions with the highest own time."""
+
+    rows = [
+        HotFunction(_label(function), calls, own, total)
+        for function, (_, calls, own, total, _) in _entries(stats).items()
+        if function[2] not in _PROFILER_ENTRIES
+    ]
+    rows.sort(key=lambda row: (-row.own_time, -row.total_time, row.name))
+    return rows[:limit]
+
+
+def format_hot_functions(stats: pstats.Stats, limit: int = 10) -> List[str]:
+    """Render :func:`hot_functions` as an aligned text table."""
+
+    lines = [f"{'calls':>9} {'own ms':>9} {'total ms':>9}  function"]
+    for row in hot_functions(stats, limit):
+        lines.append(f"{row.calls:>9} {row.own_time * 1e3:>9.3f} {row.total_time * 1e3:>9.3f}  {row.name}")
+    return lines
+
+
+def dump(stats: pstats.Stats, path: str) -> None:
+    """Save ``stats`` to ``path``.
+
+    Paths ending in one of :data:`COLLAPSED_SUFFIXES` get collapsed
+    stacks (see :func:`write_collapsed`); any other path gets a binary
+    :mod:`pstats` file.
+    """
+
+    if path.endswith(COLLAPSED_SUFFIXES):
+        with open(path, "w", encoding="utf-8") as handle:
+            write_collapsed(stats, handle)
+    else:
+        stats.dump_stats(path)
+
+
+def write_collapsed(stats: pstats.Stats, output: IO[str]) -> None:
+    """Write ``stats`` as collapsed stacks, one ``a;b;c <microseconds>`` per line.
+
+    cProfile records caller/callee pairs rather than whole stacks, so
+    stacks are reconstructed from those pairs: a function's own time is
+    split between its callers in proportion to the time each caller
+    spent calling it. Stacks through functions reached from several
+    places are therefore approximate.
+    """
+
+    entries = _entries(stats)
+    samples: Dict[str, int] = {}
+    for function, (_, _, own, _, _) in entries.items():
+        if own <= 0 or function[2] in _PROFILER_ENTRIES:
+            continue
+        for stack, share in _stacks(entries, function, 1.0, ()):
+            key = ";".join(_label(frame) for frame in stack)
+            samples[key] = samples.get(key, 0) + round(own * share * 1e6)
+    for key in sorted(samples):
+        if samples[key]:
+            output.write(f"{key} {samples[key]}\n")
+
+
+def _stacks(entries: Dict[_Function, Any], function: _Function, share: float,
+            callees: Tuple[_Function, ...]) -> Iterator[Tuple[Tuple[_Function, ...], float]]:
+    """Yield ``(stack, share)`` pairs, outermost frame first."""
+
+    stack = (function,) + callees
+    callers = {caller: edge for caller, edge in entries[function][4].items()
+               if caller in entries and caller not in stack}
+    if not callers or share < 1e-6:
+        yield stack, share
+        return
+    # Edge: (primitive calls, calls, own time, total time) of the calls
+    # from that caller; weigh by time, or by calls if no time was measured.
+    weights = {caller: edge[3] for caller, edge in callers.items()}
+    if not sum(weights.values()):
+        weights = {caller: edge[1] for caller, edge in callers.items()}
+    total = sum(weights.values())
+    for caller, weight in weights.items():
+        yield from _stacks(entries, caller, share * weight / total, stack)
+
+
+def _entries(stats: pstats.Stats) -> Dict[_Function, Any]:
+    return stats.stats  # type: ignore[attr-defined, no-any-return]
+
+
+def _label(function: _Function) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
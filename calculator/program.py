@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+"""Compiled expression programs for PyCalc.
+
+:meth:`calculator.parser.ExpressionParser.compile` lowers an expression
+to a :class:`CompiledExpression`: a flat, slot-based RPN program whose
+operator functions have already been resolved from the
+:class:`calculator.operations.OperationEngine`. Evaluating a compiled
+program involves no string handling, dictionary lookups or ``isinstance``
+checks, which makes it suitable for parse-once / evaluate-many use.
+"""
+
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .codegen import generate
+from .numeric import FLOAT, NumericBackend
+from .operations import Number
+from .vectorised import evaluate_columns
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .recompute import IncrementalEvaluator
+
+#: Evaluation backends understood by :class:`CompiledExpression`.
+BACKENDS = ("rpn", "python")
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """Immutable, callable RPN program.
+
+    Evaluation works on a frame of *slots*: the constants followed by
+    the values bound to ``names``. Instructions are plain integers: a
+    non-negative value ``i`` pushes ``slots[i]``, while a negative value
+    ``~j`` pops ``arities[j]`` operands and pushes the result of
+    ``functions[j]`` applied to them (``functions[j](left, right)`` for
+    binary operators).
+    The stack discipline is validated at compile time, so evaluation
+    performs no checks.
+
+    With the ``"python"`` backend the program is additionally lowered to
+    a native Python function (see :mod:`calculator.codegen`) when it is
+    created, and :meth:`evaluate` calls that function instead of
+    interpreting the instruction stream. Hot loops can call it directly
+    through :attr:`native`.
+
+    Instances hold no mutable state and can therefore be shared between
+    threads. They can be pickled as long as the resolved operator
+    functions are picklable (true for the default operations); generated
+    code is rebuilt on unpickling.
+
+    Attributes
+    ----------
+    source:
+        The expression text the program was compiled from.
+    code:
+        Flat instruction stream.
+    constants:
+        Literal values referenced by the instruction stream.
+    functions:
+        Operator callables referenced by the instruction stream.
+    arities:
+        Number of operands taken by each entry of ``functions``.
+    symbols:
+        Operator symbols, parallel to ``functions``.
+    names:
+        Variable names, in slot order.
+    backend:
+        Evaluation backend, one of :data:`BACKENDS`.
+    pure:
+        Whether every operator in the program is declared pure, so equal
+        bindings always produce equal results (see :mod:`calculator.memo`).
+    numeric:
+        Numeric backend the program was compiled with; its decimal
+        context, if any, is active on every evaluation.
+    """
+
+    source: str
+    code: Tuple[int, ...]
+    constants: Tuple[Number, ...]
+    functions: Tuple[Callable[..., Number], ...]
+    arities: Tuple[int, ...]
+    symbols: Tuple[str, ...]
+    names: Tuple[str, ...] = ()
+    backend: str = "rpn"
+    pure: bool = False
+    numeric: NumericBackend = FLOAT
+
+    def __post_init__(self) -> None:
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{self.backend}'")
+        native = generate(self) if self.backend == "python" else None
+        object.__setattr__(self, "_native", native)
+        # evaluate() calls the native function directly unless a decimal
+        # context must be installed around it
+        object.__setattr__(self, "_fast", native if self.numeric.context is None else None)
+        # Fetches the variable values from an environment in one call
+        getter = itemgetter(*self.names) if len(self.names) > 1 else None
+        object.__setattr__(self, "_values", getter)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_native"], state["_fast"], state["_values"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__post_init__()
+
+    def __call__(self, **bindings: Number) -> Number:
+        """Evaluate the program with variables given as keyword arguments."""
+
+        return self.evaluate(bindings)
+
+    def evaluate(self, env: Optional[Mapping[str, Number]] = None) -> Number:
+        """Evaluate the program with variables looked up in ``env``.
+
+        Raises
+        ------
+        NameError
+            If a variable referenced by the program is not bound.
+        """
+
+        fast = self._fast  # type: ignore[attr-defined]
+        if fast is not None:
+            if not self.names:
+                return fast()
+            getter = self._values  # type: ignore[attr-defined]
+            try:
+                values = getter(env) if getter is not None else (env[self.names[0]],)  # type: ignore[index]
+            except (KeyError, TypeError):
+                # Unbound variable or no env: let _bind() report it
+                values = self._bind(env or {})
+            return fast(*values)
+        if self.numeric.context is not None:
+            with self.numeric.scope():
+                return self._evaluate(env)
+        return self._evaluate(env)
+
+    @property
+    def native(self) -> Optional[Callable[..., Number]]:
+        """The generated function of the ``"python"`` backend, or ``None``.
+
+        It takes one positional argument per entry in ``names``. Calling
+        it skips the variable lookup of :meth:`evaluate` and does not
+        install the numeric backend's decimal context.
+        """
+
+        return self._native  # type: ignore[attr-defined, no-any-return]
+
+    def _evaluate(self, env: Optional[Mapping[str, Number]]) -> Number:
+        native = self._native  # type: ignore[attr-defined]
+        if native is not None:
+            return native(*self._bind(env or {})) if self.names else native()
+
+        slots = self.constants
+        if self.names:
+            slots = slots + self._bind(env or {})
+        return self.execute(slots)
+
+    def execute(self, slots: Tuple[Number, ...]) -> Number:
+        """Run the instruction stream over a fully populated slot frame.
+
+        ``slots`` must hold the constants followed by one value per
+        entry in ``names``. This is the low-level entry point used by
+        evaluators that bind variables themselves.
+        """
+
+        stack: List[Number] = []
+        push = stack.append
+        pop = stack.pop
+        functions = self.functions
+        arities = self.arities
+
+        for instr in self.code:
+            if instr >= 0:
+                push(slots[instr])
+            elif arities[~instr] == 2:
+                right = pop()
+                push(functions[~instr](pop(), right))
+            else:
+                push(functions[~instr](pop()))
+
+        return stack[0]
+
+    def evaluate_columns(self, columns: Mapping[str, Sequence[Number]]) -> Sequence[Number]:
+        """Evaluate the program once per row of ``columns``.
+
+        See :func:`calculator.vectorised.evaluate_columns`.
+        """
+
+        return evaluate_columns(self, columns)
+
+    def incremental(self) -> "IncrementalEvaluator":
+        """Return an evaluator that only recomputes what changed.
+
+        The evaluator caches every sub-expression's value and, on later
+        evaluations, recomputes only the sub-expressions depending on
+        variables whose values changed. See
+        :class:`calculator.recompute.IncrementalEvaluator`.
+        """
+
+        from .recompute import IncrementalEvaluator
+
+        return IncrementalEvaluator(self)
+
+    def _bind(self, env: Mapping[str, Number]) -> Tuple[Number, ...]:
+        try:
+            return tuple([env[name] for name in self.names])
+        except KeyError as exc:
+            raise NameError(f"Unbound variable '{exc.args[0]}'") from None
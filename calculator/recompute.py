@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+"""Spreadsheet-style incremental recomputation of compiled expressions.
+
+An :class:`IncrementalEvaluator` converts the stack-based code of a
+:class:`calculator.program.CompiledExpression` into register form, where
+every operation stores its result in a slot of its own, and records
+which variables each operation depends on. It keeps the slot values of
+the previous evaluation, so evaluating again after some variables
+changed recomputes only the operations that depend on them; every other
+sub-expression keeps its cached value.
+
+Evaluators hold mutable state and must not be shared between threads;
+create one per thread from the (shareable) compiled program.
+"""
+
+from typing import TYPE_CHECKING, Callable, List, Mapping, Optional, Tuple
+
+from .operations import Number
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .program import CompiledExpression
+
+# Instruction: (function index, left slot, right slot or -1 if unary)
+_Instruction = Tuple[int, int, int]
+
+
+class IncrementalEvaluator:
+    """Evaluate a program repeatedly, recomputing only what changed.
+
+    Programs using an operator that is not declared ``pure`` cannot be
+    recomputed selectively and are evaluated in full every time.
+
+    Parameters
+    ----------
+    program:
+        The compiled expression to evaluate.
+    """
+
+    def __init__(self, program: "CompiledExpression") -> None:
+        self.program = program
+        self._functions: Tuple[Callable[..., Number], ...] = program.functions
+        self._instructions: List[_Instruction] = []
+        self._first_variable = len(program.constants)
+        first = self._first_variable + len(program.names)
+
+        # Bit k of a mask is set if the slot depends on variable k.
+        masks: List[int] = [0] * self._first_variable + [1 << k for k in range(len(program.names))]
+        stack: List[int] = []
+        for instr in program.code:
+            if instr >= 0:
+                stack.append(instr)
+                continue
+            right = stack.pop() if program.arities[~instr] == 2 else -1
+            left = stack.pop()
+            self._instructions.append((~instr, left, right))
+            masks.append(masks[left] | (masks[right] if right >= 0 else 0))
+            stack.append(first + len(self._instructions) - 1)
+        self._output = stack[0]
+
+        # Operations (by index) to recompute when each variable changes
+        dependents: List[List[int]] = [[] for _ in program.names]
+        for index, mask in enumerate(masks[first:]):
+            while mask:
+                lowest = mask & -mask
+                dependents[lowest.bit_length() - 1].append(index)
+                mask ^= lowest
+        self._dependents = [tuple(indices) for indices in dependents]
+        self._slots: Optional[List[Number]] = None
+        self._recomputed = 0
+
+    @property
+    def recomputed(self) -> int:
+        """Number of operations computed by the last :meth:`evaluate`."""
+
+        return self._recomputed
+
+    def __call__(self, **bindings: Number) -> Number:
+        """Evaluate with variables given as keyword arguments."""
+
+        return self.evaluate(bindings)
+
+    def evaluate(self, env: Optional[Mapping[str, Number]] = None) -> Number:
+        """Evaluate the program with variables looked up in ``env``.
+
+        Raises
+        ------
+        NameError
+            If a variable referenced by the program is not bound.
+        """
+
+        numeric = self.program.numeric
+        if numeric.context is not None:
+            with numeric.scope():
+                return self._evaluate(env)
+        return self._evaluate(env)
+
+    def _evaluate(self, env: Optional[Mapping[str, Number]]) -> Number:
+        values = self.program._bind(env or {}) if self.program.names else ()
+        slots = self._slots
+        if slots is None or not self.program.pure:
+            return self._evaluate_all(values)
+
+        offset = self._first_variable
+        changed = [
+            k for k, value in enumerate(values)
+            if type(value) is not type(slots[offset + k]) or value != slots[offset + k]
+        ]
+        if not changed:
+            self._recomputed = 0
+            return slots[self._output]
+        if len(changed) == 1:
+            pending = self._dependents[changed[0]]
+        else:
+            pending = tuple(sorted(set().union(*(self._dependents[k] for k in changed))))
+
+        for k in changed:
+            slots[offset + k] = values[k]
+        first = offset + len(values)
+        functions = self._functions
+        instructions = self._instructions
+        try:
+            for index in pending:
+                func, left, right = instructions[index]
+                if right >= 0:
+                    slots[first + index] = functions[func](slots[left], slots[right])
+                else:
+                    slots[first + index] = functions[func](slots[left])
+        except Exception:
+            # Cached values are now inconsistent; start afresh next time.
+            self._slots = None
+            raise
+        self._recomputed = len(pending)
+        return slots[self._output]
+
+    def reset(self) -> None:
+        """Discard the cached values, forcing a full evaluation next time."""
+
+        self._slots = None
+
+    def _evaluate_all(self, values: Tuple[Number, ...]) -> Number:
+        self._slots = None
+        slots: List[Number] = list(self.program.constants)
+        slots.extend(values)
+        functions = self._functions
+        push = slots.append
+        for func, left, right in self._instructions:
+            if right >= 0:
+                push(functions[func](slots[left], slots[right]))
+            else:
+                push(functions[func](slots[left]))
+        self._slots = slots
+        self._recomputed = len(self._instructions)
+        return slots[self._output]
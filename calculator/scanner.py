@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+"""Regular-expression based tokeniser for PyCalc.
+
+:class:`Scanner` splits an expression into tokens with a single
+precompiled *master* regular expression, so the character-level work
+happens in one pass inside the C regex engine rather than in a Python
+loop. The operator alternative is generated from the symbols registered
+in the :class:`calculator.operations.OperationEngine` and regenerated
+whenever the engine's operator set changes.
+
+:meth:`Scanner.scan` packs the matches straight into a compact
+:class:`calculator.tokens.TokenStream` without creating token objects.
+Number literals become floats unless another ``literal`` conversion is
+given (see :mod:`calculator.numeric`).
+"""
+
+import re
+from array import array
+from typing import Callable, Dict, List, MutableSequence, Pattern
+
+from .operations import Number, OperationEngine
+from .tokens import (
+    KIND_LEFT_PAREN,
+    KIND_NAME,
+    KIND_NUMBER,
+    KIND_OPERATOR,
+    KIND_RIGHT_PAREN,
+    Token,
+    TokenStream,
+)
+
+# Alternatives are tried in the same order as the original hand-written
+# tokeniser: numbers, parentheses and operators, identifiers. The final
+# catch-all group captures any other non-space character as an error.
+_TEMPLATE = (
+    r"\s*(?:"
+    r"(\d+(?:\.\d*)?|\.\d+)"  # number
+    r"|([()]{operators})"  # parenthesis or operator
+    r"|([^\W\d]\w*)"  # identifier
+    r"|(\S)"  # anything else is an error
+    r")"
+)
+_ERROR_GROUP = 4
+
+
+class Scanner:
+    """Tokenise expressions using a master regex built from ``engine``.
+
+    Parameters
+    ----------
+    engine:
+        Engine whose operator symbols are recognised.
+    literal:
+        Converts the text of a number literal into a value.
+    """
+
+    def __init__(self, engine: OperationEngine, literal: Callable[[str], Number] = float) -> None:
+        self.engine = engine
+        self.literal = literal
+        self._version = -1
+        self._pattern: Pattern[str] = re.compile("")
+        self._kinds: Dict[str, int] = {}
+
+    @property
+    def pattern(self) -> Pattern[str]:
+        """The master pattern for the engine's current operator set."""
+
+        if self._version != self.engine.version:
+            self._rebuild()
+        return self._pattern
+
+    def _rebuild(self) -> None:
+        symbols = sorted(self.engine.operations)
+        operators = "".join(f"|{re.escape(symbol)}" for symbol in symbols)
+        self._pattern = re.compile(_TEMPLATE.format(operators=operators), re.DOTALL)
+        kinds = dict.fromkeys(symbols, KIND_OPERATOR)
+        kinds["("] = KIND_LEFT_PAREN
+        kinds[")"] = KIND_RIGHT_PAREN
+        self._kinds = kinds
+        self._version = self.engine.version
+
+    def scan(self, expression: str) -> TokenStream:
+        """Split ``expression`` into a compact :class:`TokenStream`.
+
+        Raises
+        ------
+        ValueError
+            If ``expression`` contains a character that starts no token.
+        """
+
+        pattern = self.pattern
+        symbol_kinds = self._kinds
+        literal = self.literal
+        kinds = bytearray()
+        # Floats are stored unboxed; other number types need a list.
+        values: MutableSequence[Number] = array("d") if literal is float else []
+        names: List[str] = []
+        symbols: List[str] = []
+
+        for number, symbol, name, bad in pattern.findall(expression):
+            if number:
+                kinds.append(KIND_NUMBER)
+                values.append(literal(number))
+            elif symbol:
+                kind = symbol_kinds[symbol]
+                kinds.append(kind)
+                if kind == KIND_OPERATOR:
+                    symbols.append(symbol)
+            elif name:
+                kinds.append(KIND_NAME)
+                names.append(name)
+            elif bad:
+                self._raise_unexpected(pattern, expression)
+
+        return TokenStream(bytes(kinds), values, tuple(names), tuple(symbols))
+
+    def tokenise(self, expression: str) -> List[Token]:
+        """Split ``expression`` into a list of token objects."""
+
+        return list(self.scan(expression))
+
+    @staticmethod
+    def _raise_unexpected(pattern: Pattern[str], expression: str) -> None:
+        # Error path only: re-scan with positions to report the culprit.
+        for match in pattern.finditer(expression):
+            if match.lastindex == _ERROR_GROUP:
+                ch = match.group(_ERROR_GROUP)
+                raise ValueError(f"Unexpected character at position {match.start(_ERROR_GROUP)}: '{ch}'")
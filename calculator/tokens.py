@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+"""Token types shared by the PyCalc parser and its compilation passes.
+
+Tokens exist in two forms:
+
+- individual token objects (:class:`NumberToken`, :class:`OperatorToken`,
+  ...), convenient for inspection and tests. Stateless tokens are
+  interned: use :data:`LEFT_PAREN`, :data:`RIGHT_PAREN`, :data:`NEGATE`
+  and :func:`operator_token` rather than creating new instances;
+- the compact :class:`TokenStream`, a parallel-array representation that
+  the scanner produces and the compilation passes consume directly,
+  without allocating an object per token.
+
+The shunting-yard conversion rearranges infix tokens into Reverse Polish
+Notation (RPN), which additionally uses :class:`NegateToken` for unary
+minus.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .operations import Number, OperatorTable
+
+#: Symbol under which unary minus appears in compiled programs. It is
+#: longer than one character, so it can never clash with a registered
+#: binary operator.
+NEGATE_SYMBOL = "neg"
+
+#: Binding strength of unary minus: tighter than ``*`` and ``/`` but
+#: looser than ``^``, so ``-2^2 == -4`` and ``2*-3 == -6``.
+NEGATE_PRECEDENCE = 2.5
+
+
+@dataclass(frozen=True)
+class NumberToken:
+    value: Number
+
+
+@dataclass(frozen=True)
+class NameToken:
+    name: str
+
+
+@dataclass(frozen=True)
+class OperatorToken:
+    symbol: str
+
+
+@dataclass(frozen=True)
+class NegateToken:
+    pass
+
+
+@dataclass(frozen=True)
+class LeftParenToken:
+    pass
+
+
+@dataclass(frozen=True)
+class RightParenToken:
+    pass
+
+
+Token = Union[NumberToken, NameToken, OperatorToken, NegateToken, LeftParenToken, RightParenToken]
+
+
+LEFT_PAREN = LeftParenToken()
+RIGHT_PAREN = RightParenToken()
+NEGATE = NegateToken()
+
+_OPERATOR_TOKENS: Dict[str, OperatorToken] = {}
+
+
+def operator_token(symbol: str) -> OperatorToken:
+    """Return the shared :class:`OperatorToken` for ``symbol``."""
+
+    token = _OPERATOR_TOKENS.get(symbol)
+    if token is None:
+        token = _OPERATOR_TOKENS[symbol] = OperatorToken(symbol)
+    return token
+
+
+# Token kinds used in TokenStream.kinds
+KIND_NUMBER = 0
+KIND_NAME = 1
+KIND_OPERATOR = 2
+KIND_NEGATE = 3
+KIND_LEFT_PAREN = 4
+KIND_RIGHT_PAREN = 5
+
+
+@dataclass(frozen=True)
+class TokenStream:
+    """Compact, parallel-array token sequence.
+
+    ``kinds`` holds one byte per token. Payloads are stored separately,
+    in token order, only for the kinds that carry one: ``values`` for
+    numbers (an ``array('d')`` when produced by the scanner), ``names`` for identifiers and ``symbols`` for binary
+    operators. Because the shunting-yard algorithm never reorders
+    operands, infix and RPN streams of the same expression share their
+    ``values`` and ``names``.
+
+    The shunting-yard conversion also records the integer ``codes`` of
+    the binary operators, parallel to ``symbols``, together with the
+    operator ``table`` they index, so evaluation skips the symbol lookup.
+    Streams without codes, or whose table is out of date, are resolved
+    through ``symbols`` instead.
+    """
+
+    kinds: bytes
+    values: Sequence[Number]
+    names: Tuple[str, ...]
+    symbols: Tuple[str, ...]
+    codes: Tuple[int, ...] = field(default=(), compare=False, repr=False)
+    table: Optional[OperatorTable] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[Token]) -> "TokenStream":
+        """Pack individual token objects into a :class:`TokenStream`."""
+
+        kinds = bytearray()
+        values: List[Number] = []
+        names: List[str] = []
+        symbols: List[str] = []
+        for token in tokens:
+            if isinstance(token, NumberToken):
+                kinds.append(KIND_NUMBER)
+                values.append(token.value)
+            elif isinstance(token, NameToken):
+                kinds.append(KIND_NAME)
+                names.append(token.name)
+            elif isinstance(token, OperatorToken):
+                kinds.append(KIND_OPERATOR)
+                symbols.append(token.symbol)
+            elif isinstance(token, NegateToken):
+                kinds.append(KIND_NEGATE)
+            elif isinstance(token, LeftParenToken):
+                kinds.append(KIND_LEFT_PAREN)
+            elif isinstance(token, RightParenToken):
+                kinds.append(KIND_RIGHT_PAREN)
+            else:
+                raise ValueError("Invalid token")
+        return cls(bytes(kinds), values, tuple(names), tuple(symbols))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __iter__(self) -> Iterator[Token]:
+        """Yield token objects, using the interned instances where possible."""
+
+        values = iter(self.values)
+        names = iter(self.names)
+        symbols = iter(self.symbols)
+        for kind in self.kinds:
+            if kind == KIND_NUMBER:
+                yield NumberToken(next(values))
+            elif kind == KIND_NAME:
+                yield NameToken(next(names))
+            elif kind == KIND_OPERATOR:
+                yield operator_token(next(symbols))
+            elif kind == KIND_NEGATE:
+                yield NEGATE
+            elif kind == KIND_LEFT_PAREN:
+                yield LEFT_PAREN
+            else:
+                yield RIGHT_PAREN
+
+
+def as_stream(tokens: Union[TokenStream, Iterable[Token]]) -> TokenStream:
+    """Return ``tokens`` as a :class:`TokenStream`, packing it if needed."""
+
+    return tokens if isinstance(tokens, TokenStream) else TokenStream.from_tokens(tokens)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+"""Column-wise evaluation of compiled expressions.
+
+:func:`evaluate_columns` evaluates a
+:class:`calculator.program.CompiledExpression` over whole columns of
+variable values. When NumPy is installed and every operator used by the
+program has a ufunc equivalent, the RPN program runs once over entire
+arrays. Otherwise evaluation falls back to the scalar program, one row
+at a time, so user-registered operators keep working unchanged.
+Programs compiled with a non-float numeric backend (see
+:mod:`calculator.numeric`) always take the row-by-row path, so their
+results stay exact.
+
+NumPy is optional; install it with ``pip install pycalc[numpy]``.
+"""
+
+import operator
+from array import array
+from dataclasses import replace
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .operations import Number, OperationEngine
+
+try:  # pragma: no cover - depends on the environment
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .program import CompiledExpression
+
+
+def _safe_divide_arrays(a, b):  # type: ignore[no-untyped-def]
+    """Array counterpart of :meth:`OperationEngine._safe_divide`."""
+
+    if np.any(np.equal(b, 0)):
+        raise ZeroDivisionError("division by zero")
+    return np.true_divide(a, b)
+
+
+def _ufunc_table() -> Dict[Callable[[Number, Number], Number], Callable]:
+    if np is None:
+        return {}
+    return {
+        operator.add: np.add,
+        operator.sub: np.subtract,
+        operator.mul: np.multiply,
+        operator.pow: np.power,
+        operator.neg: np.negative,
+        operator.truediv: _safe_divide_arrays,
+        OperationEngine._safe_divide: _safe_divide_arrays,
+    }
+
+
+#: Scalar operator functions with an array equivalent. Operators whose
+#: function is not listed here make :func:`evaluate_columns` use the
+#: row-by-row fallback.
+UFUNCS = _ufunc_table()
+
+
+def vector_functions(program: "CompiledExpression") -> Optional[Tuple[Callable, ...]]:
+    """Return array equivalents of ``program``'s operators, if all exist."""
+
+    try:
+        return tuple(UFUNCS[func] for func in program.functions)
+    except KeyError:
+        return None
+
+
+def evaluate_columns(program: "CompiledExpression", columns: Mapping[str, Sequence[Number]]) -> Sequence[Number]:
+    """Evaluate ``program`` for every row of ``columns``.
+
+    Parameters
+    ----------
+    program:
+        Compiled expression to evaluate.
+    columns:
+        One equally sized sequence per variable: NumPy arrays,
+        ``array.array`` buffers or any other sequence of numbers.
+
+    Returns
+    -------
+    A NumPy ``float64`` array when NumPy is available, otherwise an
+    ``array('d')``, holding one result per row. If a row has a complex
+    result, a ``complex128`` array or, without NumPy, a list. With a non-float numeric
+    backend the results keep their type, in a NumPy ``object`` array or,
+    without NumPy, a list.
+    """
+
+    data = _select_columns(program, columns)
+    length = len(data[0]) if data else 1
+
+    if program.numeric.name != "float":
+        with program.numeric.scope():
+            exact = _evaluate_rows(program, data, length)
+        if np is not None:
+            result = np.empty(length, dtype=object)
+            result[:] = exact
+            return result
+        return exact
+
+    functions = vector_functions(program)
+    if np is not None and functions is not None:
+        arrays = tuple(np.asarray(column, dtype=np.float64) for column in data)
+        vector_program = replace(program, functions=functions, backend="rpn")
+        try:
+            # Overflow and invalid operations (e.g. a negative number to
+            # a fractional power) raise or return complex numbers in the
+            # scalar program; rerun such columns row by row to match it.
+            with np.errstate(over="raise", invalid="raise"):
+                result = np.asarray(vector_program.execute(program.constants + arrays), dtype=np.float64)
+        except FloatingPointError:
+            pass
+        else:
+            if result.shape != (length,):
+                result = np.broadcast_to(result, (length,)).copy()
+            return result
+
+    values = _evaluate_rows(program, data, length)
+    if np is not None:
+        try:
+            return np.asarray(values, dtype=np.float64)
+        except TypeError:
+            return np.asarray(values)  # complex results
+    try:
+        return array("d", values)
+    except TypeError:
+        return values  # complex results
+
+
+def _select_columns(program: "CompiledExpression", columns: Mapping[str, Sequence[Number]]) -> List[Sequence[Number]]:
+    data: List[Sequence[Number]] = []
+    for name in program.names:
+        if name not in columns:
+            raise NameError(f"Unbound variable '{name}'")
+        data.append(columns[name])
+
+    if any(len(column) != len(data[0]) for column in data):
+        raise ValueError("All columns must have the same length")
+    return data
+
+
+def _evaluate_rows(program: "CompiledExpression", data: List[Sequence[Number]], length: int) -> List[Number]:
+    """Scalar fallback: run the RPN program once per row."""
+
+    execute = program.execute
+    constants = program.constants
+    if not data:
+        return [execute(constants)] * length
+    return [execute(constants + row) for row in zip(*data)]
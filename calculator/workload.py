@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+"""Synthetic expression workloads for load testing.
+
+:class:`WorkloadGenerator` produces an endless, reproducible stream of
+random expressions shaped by a :class:`WorkloadSpec`: nesting depth,
+number of terms, operator mix, parenthesis and unary minus frequency,
+variables and the share of deliberately malformed expressions. Operators
+are drawn from a live :class:`calculator.operations.OperationEngine`, so
+custom operations registered on it appear in the workload too.
+
+Expressions are generated lazily; :meth:`WorkloadGenerator.write`
+streams them to a file, one per line, without holding the corpus in
+memory::
+
+    python -m calculator.workload --count 1000000 --seed 7 --output exprs.txt
+
+The same seed, spec and operator set always yield the same expressions.
+Unless made malformed on purpose, expressions using the default
+operators evaluate without errors: divisors are non-zero literals and
+powers raise a small positive literal to a small integer exponent, so
+they neither overflow nor produce complex numbers.
+"""
+
+import argparse
+import random
+import sys
+from dataclasses import dataclass
+from itertools import accumulate, islice
+from typing import IO, Iterator, List, Mapping, Optional, Tuple, Union
+
+from .io import BUFFER_SIZE
+from .operations import OperationEngine
+
+#: Characters used to make expressions malformed, if not registered.
+_INVALID_CHARACTERS = "$#@?!~"
+
+
+@dataclass(frozen=True)
+class WorkloadSpec:
+    """Shape of the expressions produced by :class:`WorkloadGenerator`.
+
+    Rates are probabilities between 0 and 1.
+
+    Attributes
+    ----------
+    max_depth:
+        Maximum parenthesis nesting depth.
+    terms:
+        Minimum and maximum number of operands per (sub-)expression.
+    nesting_rate:
+        Chance that an operand is a parenthesised sub-expression, while
+        ``max_depth`` allows it.
+    unary_minus_rate:
+        Chance that an operand is negated.
+    error_rate:
+        Chance that an expression is made malformed (unbalanced
+        parentheses, a dangling operator or an unknown character).
+    operators:
+        Relative weight per operator symbol, or ``None`` to use every
+        operator registered on the engine with equal weight.
+    variables:
+        Variable names operands may refer to.
+    variable_rate:
+        Chance that an operand is a variable, if ``variables`` is set.
+    decimal_rate:
+        Chance that a number literal has a fractional part.
+    """
+
+    max_depth: int = 3
+    terms: Tuple[int, int] = (2, 5)
+    nesting_rate: float = 0.25
+    unary_minus_rate: float = 0.1
+    error_rate: float = 0.0
+    operators: Optional[Mapping[str, float]] = None
+    variables: Tuple[str, ...] = ()
+    variable_rate: float = 0.2
+    decimal_rate: float = 0.5
+
+    def __post_init__(self) -> None:
+        if self.max_depth < 0:
+            raise ValueError("max_depth must not be negative.")
+        if not 1 <= self.terms[0] <= self.terms[1]:
+            raise ValueError("terms must be a (minimum, maximum) pair with 1 <= minimum <= maximum.")
+        for name in ("nesting_rate", "unary_minus_rate", "error_rate", "variable_rate", "decimal_rate"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1.")
+
+
+class WorkloadGenerator:
+    """Reproducible generator of random expressions.
+
+    Parameters
+    ----------
+    engine:
+        Engine whose registered operators the expressions use.
+    spec:
+        Shape of the expressions; the defaults of :class:`WorkloadSpec`
+        if omitted.
+    seed:
+        Seed of the random number generator.
+
+    Raises
+    ------
+    ValueError
+        If ``spec.operators`` names an operator that is not registered,
+        or gives no operator a positive weight.
+    """
+
+    def __init__(self, engine: Optional[OperationEngine] = None, spec: Optional[WorkloadSpec] = None,
+                 seed: int = 0) -> None:
+        self.engine = engine or OperationEngine()
+        self.spec = spec or WorkloadSpec()
+        self.seed = seed
+        self._random = random.Random(seed)
+
+        weights = self.spec.operators
+        if weights is None:
+            weights = dict.fromkeys(sorted(self.engine.table().symbols), 1.0)
+        unknown = [symbol for symbol in weights if not self.engine.has(symbol)]
+        if unknown:
+            raise ValueError(f"Unknown operator(s) in workload mix: {', '.join(unknown)}")
+        self._symbols = [symbol for symbol, weight in weights.items() if weight > 0]
+        if not self._symbols:
+            raise ValueError("The workload operator mix is empty.")
+        self._cumulative = list(accumulate(weights[symbol] for symbol in self._symbols))
+        # Drawn instead of a "^" directly following another: chained
+        # powers grow too fast even with small operands (see _expression
+        # for mixes without another operator).
+        self._non_power = [symbol for symbol in self._symbols if symbol != "^"]
+        self._non_power_cumulative = list(accumulate(weights[symbol] for symbol in self._non_power))
+        self._invalid = [ch for ch in _INVALID_CHARACTERS if not self.engine.has(ch)]
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            yield self.expression()
+
+    def generate(self, count: int) -> Iterator[str]:
+        """Yield the next ``count`` expressions."""
+
+        return islice(self, count)
+
+    def expression(self) -> str:
+        """Return the next expression."""
+
+        text = self._expression(0)
+        if self.spec.error_rate and self._random.random() < self.spec.error_rate:
+            text = self._corrupt(text)
+        return text
+
+    def write(self, output: Union[str, IO[str]], count: Optional[int] = None,
+              size: Optional[int] = None) -> int:
+        """Stream expressions to ``output``, one per line.
+
+        Writing stops after ``count`` expressions or once about ``size``
+        characters have been written, whichever comes first.
+
+        Parameters
+        ----------
+        output:
+            Path of the file to (over)write, or an open text stream.
+
+        Returns
+        -------
+        int
+            The number of expressions written.
+        """
+
+        if count is None and size is None:
+            raise ValueError("Either count or size must be given.")
+        if isinstance(output, str):
+            with open(output, "w", encoding="utf-8", buffering=BUFFER_SIZE) as handle:
+                return self.write(handle, count, size)
+
+        written = 0
+        remaining = size
+        chunk: List[str] = []
+        for line in self if count is None else self.generate(count):
+            chunk.append(line)
+            written += 1
+            if remaining is not None:
+                remaining -= len(line) + 1
+                if remaining <= 0:
+                    break
+            if len(chunk) == 4096:
+                output.write("\n".join(chunk) + "\n")
+                chunk = []
+        if chunk:
+            output.write("\n".join(chunk) + "\n")
+        return written
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+    def _expression(self, depth: int) -> str:
+        rng = self._random
+        parts = [self._operand(depth)]
+        symbols = rng.choices(self._symbols, cum_weights=self._cumulative,
+                              k=rng.randint(*self.spec.terms) - 1)
+        previous = None
+        for symbol in symbols:
+            if symbol == "^" and previous == "^" and self._non_power:
+                symbol = rng.choices(self._non_power, cum_weights=self._non_power_cumulative)[0]
+            if symbol == "/":
+                parts += ["/", str(rng.randint(1, 99))]
+            elif symbol == "^":
+                if previous != "^":
+                    parts[-1] = str(rng.randint(1, 9))
+                    parts += ["^", str(rng.randint(1, 3))]
+                else:
+                    # Only "^" in the mix: an exponent of 1 keeps the
+                    # chain's value at its first power's
+                    parts += ["^", "1"]
+            else:
+                parts += [symbol, self._operand(depth)]
+            previous = symbol
+        return " ".join(parts)
+
+    def _operand(self, depth: int) -> str:
+        rng = self._random
+        spec = self.spec
+        if depth < spec.max_depth and rng.random() < spec.nesting_rate:
+            text = f"({self._expression(depth + 1)})"
+        elif spec.variables and rng.random() < spec.variable_rate:
+            text = rng.choice(spec.variables)
+        elif rng.random() < spec.decimal_rate:
+            text = f"{rng.uniform(0.01, 99.99):.2f}"
+        else:
+            text = str(rng.randint(1, 99))
+        if spec.unary_minus_rate and rng.random() < spec.unary_minus_rate:
+            return f"-{text}"
+        return text
+
+    def _corrupt(self, text: str) -> str:
+        rng = self._random
+        kind = rng.randrange(3 if self._invalid else 2)
+        if kind == 0:
+            return f"({text}" if rng.random() < 0.5 else f"{text})"
+        if kind == 1:
+            return f"{text} {rng.choice(self._symbols)}"
+        position = rng.randint(0, len(text))
+        return text[:position] + rng.choice(self._invalid) + text[position:]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m calculator.workload",
+                                     description="Generate a reproducible file of random expressions.")
+    parser.add_argument("--count", type=int, help="number of expressions to write")
+    parser.add_argument("--size", type=int, help="approximate number of characters to write")
+    parser.add_argument("--output", "-o", help="file to write (default: standard output)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--max-depth", type=int, default=WorkloadSpec.max_depth, help="maximum nesting depth")
+    parser.add_argument("--terms", type=int, nargs=2, default=WorkloadSpec.terms, metavar=("MIN", "MAX"),
+                        help="operands per sub-expression")
+    parser.add_argument("--nesting-rate", type=float, default=WorkloadSpec.nesting_rate)
+    parser.add_argument("--unary-minus-rate", type=float, default=WorkloadSpec.unary_minus_rate)
+    parser.add_argument("--error-rate", type=float, default=WorkloadSpec.error_rate)
+    parser.add_argument("--operators", help="operator weights, e.g. '+=3,*=2,/=1'")
+    parser.add_argument("--variables", default="", help="comma-separated variable names")
+    args = parser.parse_args(argv)
+    if args.count is None and args.size is None:
+        parser.error("one of --count or --size is required")
+
+    operators = None
+    if args.operators:
+        operators = {}
+        for item in args.operators.split(","):
+            symbol, _, weight = item.partition("=")
+            operators[symbol] = float(weight or 1)
+    try:
+        spec = WorkloadSpec(
+            max_depth=args.max_depth,
+            terms=tuple(args.terms),  # type: ignore[arg-type]
+            nesting_rate=args.nesting_rate,
+            unary_minus_rate=args.unary_minus_rate,
+            error_rate=args.error_rate,
+            operators=operators,
+            variables=tuple(name for name in args.variables.split(",") if name),
+        )
+        generator = WorkloadGenerator(spec=spec, seed=args.seed)
+    except ValueError as exc:
+        parser.error(str(exc))
+    generator.write(args.output or sys.stdout, args.count, args.size)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual invocation only
+    sys.exit(main())
@@ -3,33 +3,72 @@ from __future__ import annotations
 """Entry point for the PyCalc CLI application.
 
 This module wires together the calculator components and exposes
-an interactive command-line interface.
+an interactive command-line interface, plus a non-interactive batch
+mode for streaming expressions from files or standard input::
+
+    python main.py --batch < exprs.txt
+    pycalc --batch --workers 4 exprs.txt
 """
 
-from calculator.io import ConsoleIO
+import argparse
+import pstats
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from calculator.batch import iter_evaluate
+from calculator.history import DEFAULT_CAPACITY, HistoryManager
+from calculator.history_log import PersistentHistory
+from calculator.instrumentation import InstrumentationSnapshot
+from calculator.io import ConsoleIO, StreamIO
+from calculator.numeric import NUMERIC_BACKENDS
+from calculator.operations import Number, OperationEngine
 from calculator.parser import ExpressionParser
-from calculator.operations import OperationEngine
-from calculator.history import HistoryManager
+from calculator.profiling import dump, format_hot_functions, profile
+
+#: Number of functions listed by the profiling commands.
+PROFILE_LIMIT = 15
+
+#: The REPL ``profile`` command repeats the evaluation for up to this
+#: many seconds (and at most 1000 times) to collect meaningful timings.
+PROFILE_BUDGET = 0.2
 
 
-def run() -> None:
+def run(history_path: Optional[str] = None, numeric: str = "float") -> None:
     """Run the interactive PyCalc REPL.
 
     Commands:
     - arithmetic expressions, e.g. `1 + 2 * 3`
     - `history` to show previous calculations
     - `clear` to clear calculation history
+    - `stats` to show parser timings and operator counts
+    - `profile <expr>` to show where evaluating an expression spends time
     - `quit` / `exit` to terminate the program
+
+    If ``history_path`` is given, history is kept in that persistent
+    log file instead of in memory. ``numeric`` selects the numeric
+    backend (see :mod:`calculator.numeric`).
     """
 
+    if history_path is None:
+        _repl(HistoryManager(capacity=DEFAULT_CAPACITY), numeric)
+        return
+    with PersistentHistory(history_path) as history:
+        _repl(history, numeric)
+
+
+def _repl(history: "HistoryManager | PersistentHistory", numeric: str = "float") -> None:
     io = ConsoleIO()
     engine = OperationEngine()
-    history = HistoryManager()
-    parser = ExpressionParser(engine)
+    # Users tend to resubmit long expressions with small edits
+    parser = ExpressionParser(engine, incremental=True, numeric=numeric, instrument=True)
+    # Profiled evaluations must not show up in `stats`
+    profile_parser = ExpressionParser(engine, numeric=numeric)
 
     io.write_line("PyCalc - simple command-line calculator")
     io.write_line("Type expressions to evaluate them.")
-    io.write_line("Type 'history' to show past results, 'clear' to erase history, 'quit' to exit.\n")
+    io.write_line("Type 'history' to show past results, 'clear' to erase history, "
+                  "'stats' to show timings, 'quit' to exit.\n")
 
     while True:
         try:
@@ -52,17 +91,35 @@ def run() -> None:
             io.write_line("Goodbye.")
             break
         if lower == "history":
-            records = history.get_all()
-            if not records:
+            if not history:
                 io.write_line("(no history)")
             else:
-                for idx, record in enumerate(records, start=1):
+                for idx, record in enumerate(history.view(), start=1):
                     io.write_line(f"{idx}: {record.expression} = {record.result}")
             continue
         if lower == "clear":
             history.clear()
             io.write_line("History cleared.")
             continue
+        if lower == "stats":
+            stats = parser.stats()
+            assert stats is not None
+            for text in _format_stats(stats):
+                io.write_line(text)
+            continue
+        if lower == "profile":
+            io.write_line("Usage: profile <expression>")
+            continue
+        if lower.startswith("profile "):
+            try:
+                result, count, profile_stats = _profile_expression(profile_parser, stripped[len("profile "):].strip())
+            except Exception as exc:  # noqa: BLE001 - user-facing REPL
+                io.write_line(f"Error: {exc}")
+                continue
+            io.write_line(f"{result} ({count} evaluations profiled)")
+            for text in format_hot_functions(profile_stats, PROFILE_LIMIT):
+                io.write_line(text)
+            continue
 
         # Expression evaluation
         try:
@@ -73,5 +130,109 @@ def run() -> None:
             io.write_line(f"Error: {exc}")
 
 
+def _profile_expression(parser: ExpressionParser, expression: str) -> Tuple[Number, int, pstats.Stats]:
+    """Evaluate ``expression`` repeatedly under the profiler.
+
+    Returns the result, the number of evaluations and the statistics.
+    """
+
+    def repeat() -> Tuple[Number, int]:
+        deadline = time.perf_counter() + PROFILE_BUDGET
+        count = 0
+        while True:
+            result = parser.evaluate(expression)
+            count += 1
+            if count >= 1000 or time.perf_counter() >= deadline:
+                return result, count
+
+    (result, count), stats = profile(repeat)
+    return result, count, stats
+
+
+def _format_stats(stats: InstrumentationSnapshot) -> List[str]:
+    """Render an instrumentation snapshot for the REPL."""
+
+    lines = [f"evaluations: {stats.evaluations}, errors: {stats.errors}, compilations: {stats.compilations}"]
+    for phase, summary in stats.phases.items():
+        if summary.count:
+            lines.append(f"  {phase:<9} n={summary.count:<6} mean={summary.mean / 1000:.1f}us "
+                         f"p50={summary.p50 / 1000:.1f}us p90={summary.p90 / 1000:.1f}us "
+                         f"p99={summary.p99 / 1000:.1f}us max={summary.maximum / 1000:.1f}us")
+    if stats.tokens.count:
+        lines.append(f"  tokens    mean={stats.tokens.mean:.1f} p50={stats.tokens.p50:.0f} "
+                     f"max={stats.tokens.maximum}")
+    if stats.operators:
+        lines.append("  operators " + ", ".join(f"{symbol} x{count}" for symbol, count in stats.operators.items()))
+    return lines
+
+
+def run_batch(io: StreamIO, parser: Optional[ExpressionParser] = None, workers: int = 1,
+              chunk_size: int = 1000) -> int:
+    """Evaluate every non-blank input line and write one result per line.
+
+    Failing expressions produce an ``Error: ...`` line. Input is
+    processed as a stream, so memory use does not grow with input size.
+
+    Returns
+    -------
+    Process exit status: ``0`` if every expression evaluated, ``1``
+    otherwise.
+    """
+
+    parser = parser or ExpressionParser(OperationEngine())
+    expressions = (line.strip() for line in io.read_lines())
+    expressions = (expr for expr in expressions if expr)
+
+    status = 0
+    for result in iter_evaluate(parser, expressions, workers=workers, chunk_size=chunk_size):
+        if result.ok:
+            io.write_line(str(result.value))
+        else:
+            io.write_line(f"Error: {result.error}")
+            status = 1
+    io.flush()
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point used by ``python main.py`` and ``pycalc``."""
+
+    parser = argparse.ArgumentParser(prog="pycalc", description="A small command-line calculator.")
+    parser.add_argument("files", nargs="*", help="files of expressions to evaluate (implies --batch)")
+    parser.add_argument("--batch", action="store_true",
+                        help="evaluate one expression per input line without prompts")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for batch mode")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="expressions per worker task in batch mode")
+    parser.add_argument("--history-file", metavar="PATH",
+                        help="keep REPL history in a persistent log file")
+    parser.add_argument("--numeric", choices=NUMERIC_BACKENDS, default="float",
+                        help="number representation (default: float)")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile batch evaluation and print the hottest functions to stderr")
+    parser.add_argument("--profile-output", metavar="PATH",
+                        help="also save the profile (implies --profile): collapsed stacks for "
+                             "*.folded / *.collapsed, pstats otherwise")
+    args = parser.parse_args(argv)
+
+    if not (args.batch or args.files):
+        if args.profile or args.profile_output:
+            parser.error("--profile only applies to batch mode; use the REPL 'profile' command instead")
+        run(args.history_file, args.numeric)
+        return 0
+    batch_args = (StreamIO(args.files), ExpressionParser(numeric=args.numeric), args.workers, args.chunk_size)
+    if not (args.profile or args.profile_output):
+        return run_batch(*batch_args)
+
+    if args.workers != 1:
+        parser.error("--profile only covers in-process evaluation; use --workers 1")
+    status, stats = profile(run_batch, *batch_args)
+    for line in format_hot_functions(stats, PROFILE_LIMIT):
+        print(line, file=sys.stderr)
+    if args.profile_output:
+        dump(stats, args.profile_output)
+    return status
+
+
 if __name__ == "__main__":  # pragma: no cover - manual invocation only
-    run()
+    sys.exit(main())
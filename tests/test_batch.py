@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.batch`."""
+
+import operator
+
+from calculator.batch import iter_evaluate
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+
+
+def modulo_engine() -> OperationEngine:
+    engine = OperationEngine()
+    engine.register("%", operator.mod, precedence=2)
+    return engine
+
+
+def test_results_preserve_order_and_report_errors() -> None:
+    results = ExpressionParser().evaluate_many(["1 + 1", "1 / 0", "2 * 3", "(1"])
+    assert [r.expression for r in results] == ["1 + 1", "1 / 0", "2 * 3", "(1"]
+    assert [r.value for r in results] == [2, None, 6, None]
+    assert results[1].error == "division by zero"
+    assert not results[3].ok
+
+
+def test_worker_pool_matches_serial_evaluation() -> None:
+    expressions = [f"{i} * 2 - 1" for i in range(50)] + ["1 +"]
+    parser = ExpressionParser()
+    serial = parser.evaluate_many(expressions)
+    parallel = parser.evaluate_many(expressions, workers=2, chunk_size=7)
+    assert parallel == serial
+
+
+def test_engine_factory_recreates_custom_operators() -> None:
+    parser = ExpressionParser(modulo_engine())
+    results = parser.evaluate_many(["7 % 4", "9 % 5"], workers=2, engine_factory=modulo_engine)
+    assert [r.value for r in results] == [3, 4]
+
+
+def test_unpicklable_engine_is_rejected() -> None:
+    engine = OperationEngine()
+    engine.register("%", lambda a, b: a % b, precedence=2)
+    try:
+        ExpressionParser(engine).evaluate_many(["1 % 1"], workers=2)
+    except TypeError as exc:
+        assert "engine_factory" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected TypeError")
+
+
+def test_iter_evaluate_consumes_input_lazily() -> None:
+    def expressions():
+        yield "1 + 1"
+        raise AssertionError("input consumed eagerly")
+
+    results = iter_evaluate(ExpressionParser(), expressions())
+    assert next(results).value == 2
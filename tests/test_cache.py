@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.cache` and the parser compile cache."""
+
+from calculator.cache import LRUCache
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+
+
+def test_lru_hit_and_miss_counters() -> None:
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    assert cache.get("a") is None
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    info = cache.info()
+    assert (info.hits, info.misses, info.size) == (1, 1, 1)
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.info().evictions == 1
+
+
+def test_zero_size_cache_stores_nothing() -> None:
+    cache: LRUCache[str, int] = LRUCache(maxsize=0)
+    cache.put("a", 1)
+    assert len(cache) == 0
+
+
+def test_parser_reuses_compiled_expression() -> None:
+    parser = ExpressionParser()
+    assert parser.evaluate("1 + 2") == 3
+    assert parser.evaluate("1 + 2") == 3
+    info = parser.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+
+def test_register_invalidates_parser_cache() -> None:
+    engine = OperationEngine()
+    parser = ExpressionParser(engine)
+    parser.evaluate("7 - 2")
+    engine.register("-", lambda a, b: a + b, precedence=1)
+    assert parser.evaluate("7 - 2") == 9
+    assert parser.cache_info().hits == 0
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.codegen`."""
+
+import pickle
+
+from calculator.codegen import generate_source
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+
+
+def test_python_backend_matches_rpn_backend() -> None:
+    expr = "-(a - 2) * b ^ 2 / (1 + a)"
+    env = {"a": 3, "b": 1.5}
+    expected = ExpressionParser().evaluate(expr, env)
+    assert ExpressionParser(backend="python").evaluate(expr, env) == expected
+
+
+def test_builtin_operators_are_inlined() -> None:
+    program = ExpressionParser().compile("x * 2 + 1")
+    source, bindings = generate_source(program)
+    assert "(_v0 * (2.0))" in source
+    assert bindings == {}
+
+
+def test_custom_operator_bound_as_closure() -> None:
+    engine = OperationEngine()
+    engine.register("%", lambda a, b: a % b, precedence=2)
+    program = ExpressionParser(engine, backend="python").compile("7 % x")
+    assert program(x=4) == 3
+
+
+def test_long_expression_does_not_exceed_nesting_limit() -> None:
+    parser = ExpressionParser(backend="python")
+    assert parser.evaluate(" + ".join(["1"] * 1000)) == 1000
+
+
+def test_python_backend_division_by_zero_matches_rpn_backend() -> None:
+    calls = []
+
+    def record(a: float, b: float) -> float:
+        calls.append(a)
+        return a + b
+
+    for backend in ("rpn", "python"):
+        engine = OperationEngine()
+        engine.register("#", record, precedence=1)
+        program = ExpressionParser(engine, backend=backend).compile("(a # 1) * 2 - b / (a - 1)")
+        calls.clear()
+        try:
+            program(a=1.0, b=2.0)
+        except ZeroDivisionError as exc:
+            assert str(exc) == "division by zero", backend
+        else:  # pragma: no cover - defensive
+            raise AssertionError("Expected ZeroDivisionError")
+        # Operators before the division still ran, once
+        assert calls == [1.0], backend
+        assert program(a=3.0, b=2.0) == 7.0
+
+
+def test_native_function_is_exposed() -> None:
+    program = ExpressionParser(backend="python").compile("x * y + 1")
+    assert program.native is not None
+    assert program.native(2.0, 3.0) == program(x=2.0, y=3.0) == 7.0
+    assert ExpressionParser().compile("x + 1").native is None
+    try:
+        program.evaluate({"x": 1.0})
+    except NameError as exc:
+        assert "Unbound variable 'y'" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected NameError")
+
+
+def test_python_backend_with_huge_int_constants() -> None:
+    parser = ExpressionParser(numeric="int", backend="python")
+    assert parser.evaluate("2 ^ 2000 + 1") == 2 ** 2000 + 1
+    assert parser.evaluate("x * 10 ^ 400", {"x": 3}) == 3 * 10 ** 400
+
+
+def test_python_backend_program_pickles() -> None:
+    program = ExpressionParser(backend="python").compile("a ^ 2")
+    assert pickle.loads(pickle.dumps(program))(a=3) == 9
+
+
+def test_unknown_backend_rejected() -> None:
+    try:
+        ExpressionParser(backend="llvm")
+    except ValueError as exc:
+        assert "Unknown backend" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ValueError")
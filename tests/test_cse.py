@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.cse`."""
+
+from calculator.cse import HashConsingBuilder
+from calculator.nodes import from_rpn
+from calculator.parser import ExpressionParser
+
+ENV = {"a": 1.5, "b": 2.0, "c": 3.0, "d": 4.0}
+
+
+def test_shared_subexpressions_are_evaluated_once() -> None:
+    parser = ExpressionParser()
+    expressions = ["(a + b) * c", "(a + b) * c - d", "d / ((a + b) * c)", "(a + b) * (a + b)"]
+    program = parser.compile_batch(expressions)
+    # Distinct operations: a + b, (a + b) * c, ... - d, d / ..., (a + b) * (a + b)
+    assert len(program.instructions) == 5
+    assert program.operations == 11
+    assert program.saved == 6
+    results = program.evaluate(ENV)
+    assert [r.value for r in results] == [parser.evaluate(expr, ENV) for expr in expressions]
+
+
+def test_structurally_equal_trees_are_shared() -> None:
+    parser = ExpressionParser(optimise=False)
+    builder = HashConsingBuilder(parser.engine)
+    first = from_rpn(parser._to_rpn(parser._tokenise("x * 2 + 1")), builder)
+    second = from_rpn(parser._to_rpn(parser._tokenise("(x * 2) + 1")), builder)
+    assert first is second
+    third = from_rpn(parser._to_rpn(parser._tokenise("x * 2.5 + 1")), builder)
+    assert third is not first
+
+
+def test_impure_operations_are_not_shared() -> None:
+    calls = []
+
+    def record(a: float, b: float) -> float:
+        calls.append((a, b))
+        return a + b
+
+    parser = ExpressionParser()
+    parser.engine.register("#", record, precedence=1)
+    program = parser.compile_batch(["a # b", "a # b", "(a + b) * 2", "(a + b) * 3"])
+    results = program.evaluate(ENV)
+    assert len(calls) == 2
+    assert [r.value for r in results] == [3.5, 3.5, 7.0, 10.5]
+
+
+def test_failures_only_affect_dependent_expressions() -> None:
+    program = ExpressionParser().compile_batch(["a / (b - 2)", "a + b", "(1", "e * 2", "a / (b - 2) + 1"])
+    results = program.evaluate(ENV)
+    assert [r.ok for r in results] == [False, True, False, False, False]
+    assert results[0].error == results[4].error == "division by zero"
+    assert results[1].value == 3.5
+    assert results[2].error == "Mismatched parentheses"
+    assert results[3].error == "Unbound variable 'e'"
+
+
+def test_operations_before_a_failure_run_once() -> None:
+    calls = []
+
+    def record(a: float, b: float) -> float:
+        calls.append((a, b))
+        return a + b
+
+    parser = ExpressionParser()
+    parser.engine.register("#", record, precedence=1)
+    program = parser.compile_batch(["a # b", "a / (b - 2)", "c # d"])
+    results = program.evaluate(ENV)
+    assert calls == [(1.5, 2.0), (3.0, 4.0)]
+    assert [r.value for r in results] == [3.5, None, 7.0]
+    assert results[1].error == "division by zero"
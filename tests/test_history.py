@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.history`."""
+
+import copy
+import pickle
+
+from calculator.history import HistoryManager, HistoryRecord
+
+
+def test_unbounded_history_keeps_everything() -> None:
+    history = HistoryManager()
+    for i in range(5):
+        history.add(f"{i} + 0", float(i))
+    assert len(history) == 5
+    assert history.get_all()[0] == HistoryRecord("0 + 0", 0.0)
+
+
+def test_bounded_history_evicts_oldest() -> None:
+    history = HistoryManager(capacity=3)
+    for i in range(5):
+        history.add(f"{i} + 0", float(i))
+    assert [r.result for r in history] == [2.0, 3.0, 4.0]
+    assert history.evicted == 2
+
+
+def test_view_is_live_and_indexable() -> None:
+    history = HistoryManager(capacity=2)
+    view = history.view()
+    history.add("1", 1.0)
+    history.add("2", 2.0)
+    history.add("3", 3.0)
+    assert len(view) == 2
+    assert view[0].expression == "2"
+    assert view[-1].result == 3.0
+    assert [r.expression for r in view[0:2]] == ["2", "3"]
+
+
+def test_non_float_results_are_preserved() -> None:
+    history = HistoryManager(capacity=2)
+    history.add("(-8) ^ 0.5", complex(0, 2))
+    history.add("1 + 1", 2.0)
+    history.add("2 + 2", 4.0)
+    assert [r.result for r in history] == [2.0, 4.0]
+    history.add("3", 3)
+    assert history.get_all()[-1].result == 3
+
+
+def test_records_have_no_instance_dict() -> None:
+    assert not hasattr(HistoryRecord("1", 1.0), "__dict__")
+
+
+def test_clear_removes_records() -> None:
+    history = HistoryManager(capacity=2)
+    history.add("1", 1.0)
+    history.clear()
+    assert len(history) == 0
+    assert history.get_all() == []
+
+
+def test_records_pickle_and_deepcopy() -> None:
+    record = HistoryRecord("1 + 2", 3.0)
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert copy.deepcopy(record) == record
+    assert copy.copy(record) == record
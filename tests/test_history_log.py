@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.history_log`."""
+
+from fractions import Fraction
+from pathlib import Path
+
+from calculator.history_log import PersistentHistory
+
+
+def test_records_survive_reopening(tmp_path: Path) -> None:
+    path = tmp_path / "history.log"
+    with PersistentHistory(path) as history:
+        history.add("1 + 1", 2.0)
+        history.add("1 / 3", Fraction(1, 3))
+        history.add("(-1) ^ 0.5", complex(0, 1))
+    with PersistentHistory(path) as history:
+        assert [(r.expression, r.result) for r in history] == [
+            ("1 + 1", 2.0),
+            ("1 / 3", Fraction(1, 3)),
+            ("(-1) ^ 0.5", complex(0, 1)),
+        ]
+
+
+def test_writes_are_batched(tmp_path: Path) -> None:
+    path = tmp_path / "history.log"
+    history = PersistentHistory(path, flush_every=3)
+    size = path.stat().st_size
+    history.add("1", 1.0)
+    history.add("2", 2.0)
+    assert path.stat().st_size == size
+    assert len(history) == 2
+    history.add("3", 3.0)
+    assert path.stat().st_size > size
+    history.close()
+
+
+def test_missing_index_is_rebuilt(tmp_path: Path) -> None:
+    path = tmp_path / "history.log"
+    with PersistentHistory(path) as history:
+        for i in range(10):
+            history.add(f"{i}", float(i))
+    Path(str(path) + ".idx").unlink()
+    with PersistentHistory(path) as history:
+        assert len(history) == 10
+        assert history.view()[7].result == 7.0
+
+
+def test_sessions_see_each_others_records(tmp_path: Path) -> None:
+    path = tmp_path / "history.log"
+    first = PersistentHistory(path, flush_every=1)
+    second = PersistentHistory(path, flush_every=1)
+    first.add("1", 1.0)
+    second.add("2", 2.0)
+    first.refresh()
+    assert [r.expression for r in first] == ["1", "2"]
+    second.refresh()
+    second.add("3", 3.0)
+    first.refresh()
+    assert [r.expression for r in first] == ["1", "2", "3"]
+    first.close()
+    second.close()
+    with PersistentHistory(path) as history:
+        assert [r.expression for r in history] == ["1", "2", "3"]
+
+
+def test_clear_by_another_session_is_picked_up(tmp_path: Path) -> None:
+    path = tmp_path / "history.log"
+    first = PersistentHistory(path, flush_every=1)
+    second = PersistentHistory(path, flush_every=1)
+    for i in range(5):
+        first.add(f"{i}", float(i))
+    second.refresh()
+    assert second.record(4).expression == "4"
+    first.clear()
+    first.add("a", 1.0)
+    assert second.record(0).expression == "a"
+    second.refresh()
+    assert [r.expression for r in second] == ["a"]
+    second.add("b", 2.0)
+    first.refresh()
+    assert [r.expression for r in first] == ["a", "b"]
+    first.close()
+    second.close()
+    with PersistentHistory(path) as history:
+        assert [r.expression for r in history] == ["a", "b"]
+
+
+def test_truncated_tail_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "history.log"
+    with PersistentHistory(path) as history:
+        history.add("1", 1.0)
+    with open(path, "ab") as handle:
+        handle.write(b"\x05\x00")
+    with PersistentHistory(path) as history:
+        history.add("2", 2.0)
+        history.flush()
+        assert [r.expression for r in history] == ["1", "2"]
+
+
+def test_clear_empties_the_log(tmp_path: Path) -> None:
+    path = tmp_path / "history.log"
+    with PersistentHistory(path) as history:
+        history.add("1", 1.0)
+        history.clear()
+    with PersistentHistory(path) as history:
+        assert len(history) == 0
+
+
+def test_foreign_file_is_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "notes.txt"
+    path.write_text("hello world")
+    try:
+        PersistentHistory(path)
+    except ValueError as exc:
+        assert "not a PyCalc history log" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ValueError")
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.incremental`."""
+
+import operator
+
+from calculator.incremental import _changed_range
+from calculator.parser import ExpressionParser
+
+BASE = "(a + 2 * (b - 3) / 4) * (c ^ 2 - (a + 1) * 5) + -(b / 2 - c * 3)"
+
+
+def test_changed_range() -> None:
+    assert _changed_range("1 + 2 * 3", "1 + 5 * 3") == (4, 5)
+    assert _changed_range("1 + 2", "1 + 2 + 3") == (5, 9)
+    assert _changed_range("", "1") == (0, 1)
+    assert _changed_range("aaa", "aa") == (2, 2)
+
+
+def test_incremental_matches_full_parse() -> None:
+    full = ExpressionParser(cache_size=0)
+    incremental = ExpressionParser(cache_size=0, incremental=True)
+    env = {"a": 1.5, "b": 2.5, "c": 3.0}
+    revisions = [
+        BASE,
+        BASE.replace("* 5", "* 6"),
+        BASE.replace("* 5", "* 6").replace("b / 2", "b / 7"),
+        BASE + " - 1",
+        "-" + BASE,
+        "(2 + 3) * (4 - 1 + 2 * 2)",
+    ]
+    for revision in revisions:
+        expected = full.compile(revision)
+        program = incremental.compile(revision)
+        assert program.code == expected.code, revision
+        assert program.constants == expected.constants, revision
+        assert program.evaluate(env) == expected.evaluate(env), revision
+
+
+def test_unchanged_groups_are_reused() -> None:
+    parser = ExpressionParser(cache_size=0, incremental=True)
+    incremental = parser._incremental  # type: ignore[attr-defined]
+    parser.compile(BASE)
+    assert incremental.cache_info().hits == 0
+
+    parser.compile(BASE.replace("b / 2", "b / 7"))
+    # The first two top-level groups lie before the edit
+    assert incremental.cache_info().hits == 2
+
+
+def test_incremental_reports_errors_like_full_parse() -> None:
+    parser = ExpressionParser(incremental=True)
+    parser.compile(BASE)
+    for expr, message in (("(a + 1) * (b $ 2) + (c - 3 * 4)", "position 13"),
+                          (BASE + ")", "Mismatched parentheses")):
+        try:
+            parser.compile(expr)
+        except ValueError as exc:
+            assert message in str(exc), expr
+        else:  # pragma: no cover - defensive
+            raise AssertionError(f"Expected ValueError for {expr!r}")
+    assert parser.evaluate("(a + 1) * (b - 2)", {"a": 1, "b": 3}) == 2
+
+
+def test_register_invalidates_cached_groups() -> None:
+    parser = ExpressionParser(incremental=True)
+    expr = "(1 + 2 + 3 + 4 + 5 + 6) * 2"
+    assert parser.evaluate(expr) == 42
+    parser.engine.register("+", operator.sub, precedence=1, pure=True)
+    assert parser.evaluate(expr) == -38
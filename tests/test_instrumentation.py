@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.instrumentation`."""
+
+import threading
+
+from calculator.instrumentation import Histogram
+from calculator.parser import ExpressionParser
+
+
+def test_histogram_quantiles_are_within_bucket_precision() -> None:
+    histogram = Histogram()
+    for value in range(1, 10_001):
+        histogram.record(value)
+    snapshot = histogram.snapshot()
+    assert (snapshot.count, snapshot.minimum, snapshot.maximum) == (10_000, 1, 10_000)
+    assert snapshot.mean == 5000.5
+    for q, exact in ((0.5, snapshot.p50), (0.9, snapshot.p90), (0.99, snapshot.p99)):
+        assert abs(exact - q * 10_000) <= 0.125 * q * 10_000
+
+    small = Histogram()
+    for value in (3, 3, 7):
+        small.record(value)
+    assert (small.quantile(0.5), small.quantile(1.0)) == (3, 7)
+    assert Histogram().snapshot().p99 == 0.0
+
+
+def test_parser_records_phases_tokens_and_operators() -> None:
+    parser = ExpressionParser(instrument=True)
+    assert parser.evaluate("1 + x * x", {"x": 2}) == 5
+    assert parser.evaluate("1 + x * x", {"x": 3}) == 10
+    assert parser.evaluate("-(x - 1)", {"x": 3}) == -2
+    try:
+        parser.evaluate("1 / x", {"x": 0})
+    except ZeroDivisionError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("expected ZeroDivisionError")
+
+    stats = parser.stats()
+    assert stats is not None
+    assert (stats.compilations, stats.evaluations, stats.errors) == (3, 3, 1)
+    assert {phase: summary.count for phase, summary in stats.phases.items()} == {
+        "tokenise": 3, "to_rpn": 3, "assemble": 3, "eval": 3,
+    }
+    assert stats.tokens.maximum == 6
+    assert stats.operators == {"*": 2, "+": 2, "-": 1, "neg": 1}
+
+    parser.reset_stats()
+    stats = parser.stats()
+    assert stats is not None and stats.evaluations == 0 and stats.operators == {}
+
+
+def test_instrumentation_is_disabled_by_default() -> None:
+    parser = ExpressionParser()
+    assert parser.evaluate("1 + 2") == 3
+    assert parser.stats() is None
+    parser.reset_stats()
+
+
+def test_incremental_parsing_times_tokenising() -> None:
+    parser = ExpressionParser(incremental=True, instrument=True)
+    env = {"x": 1.0}
+    parser.evaluate("(x + 2 * 3 - 4 / 5) * 7", env)
+    parser.evaluate("(x + 2 * 3 - 4 / 5) * 8", env)
+    stats = parser.stats()
+    assert stats is not None
+    assert (stats.phases["tokenise"].count, stats.phases["to_rpn"].count, stats.tokens.count) == (2, 2, 2)
+    # The unchanged group is reused, so only " * 8" is scanned again
+    assert stats.tokens.minimum == 2
+    assert stats.tokens.maximum > 2
+
+
+def test_evaluation_counts_are_exact_across_threads() -> None:
+    parser = ExpressionParser(instrument=True)
+
+    def work() -> None:
+        for _ in range(2000):
+            parser.evaluate("x + 1", {"x": 1.0})
+            try:
+                parser.evaluate("1 / 0")
+            except ZeroDivisionError:
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = parser.stats()
+    assert stats is not None
+    assert (stats.evaluations, stats.errors) == (8000, 8000)
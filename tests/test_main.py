@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+"""Unit tests for the batch mode and REPL in :mod:`main`."""
+
+import io
+from pathlib import Path
+
+from calculator.io import StreamIO
+from main import main, run, run_batch
+
+
+def test_run_batch_writes_one_line_per_expression(tmp_path: Path) -> None:
+    source = tmp_path / "exprs.txt"
+    source.write_text("1 + 2\n\n  2 ^ 3\n1 / 0\n")
+    output = io.StringIO()
+    status = run_batch(StreamIO([str(source)], output=output))
+    assert output.getvalue() == "3.0\n8.0\nError: division by zero\n"
+    assert status == 1
+
+
+def test_stream_io_buffers_until_flush() -> None:
+    output = io.StringIO()
+    stream = StreamIO(output=output, flush_every=3)
+    stream.write_line("a")
+    stream.write_line("b")
+    assert output.getvalue() == ""
+    stream.write_line("c")
+    assert output.getvalue() == "a\nb\nc\n"
+
+
+def test_main_reads_files_in_order(tmp_path: Path, capsys) -> None:  # type: ignore[no-untyped-def]
+    first = tmp_path / "a.txt"
+    second = tmp_path / "b.txt"
+    first.write_text("1 + 1\n")
+    second.write_text("2 * 2\n")
+    assert main([str(first), str(second)]) == 0
+    assert capsys.readouterr().out == "2.0\n4.0\n"
+
+
+def test_main_numeric_backend(tmp_path: Path, capsys) -> None:  # type: ignore[no-untyped-def]
+    source = tmp_path / "money.txt"
+    source.write_text("0.1 + 0.2\n")
+    assert main(["--numeric", "decimal", str(source)]) == 0
+    assert capsys.readouterr().out == "0.3\n"
+
+
+def test_repl_stats_command(monkeypatch, capsys) -> None:  # type: ignore[no-untyped-def]
+    lines = iter(["1 + 2 * 3", "profile 2 * 3", "stats", "quit"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(lines))
+    run()
+    out = capsys.readouterr().out
+    assert "evaluations: 1, errors: 0, compilations: 1" in out
+    assert "  tokenise  n=1 " in out
+    assert "  eval      n=1 " in out
+    assert "  tokens    mean=5.0 " in out
+
+
+def test_repl_profile_command(monkeypatch, capsys) -> None:  # type: ignore[no-untyped-def]
+    lines = iter(["profile 2 ^ 10", "profile 1 +", "profile", "quit"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(lines))
+    run()
+    out = capsys.readouterr().out
+    assert "1024.0 (1000 evaluations profiled)" in out
+    assert "evaluate (parser.py:" in out
+    assert "Error: Insufficient values in expression" in out
+    assert "Usage: profile <expression>" in out
+    assert "Unbound variable" not in out
+
+
+def test_main_rejects_profile_without_batch_input(capsys) -> None:  # type: ignore[no-untyped-def]
+    for argv in (["--profile"], ["--profile-output", "out.folded"]):
+        try:
+            main(argv)
+        except SystemExit as exc:
+            assert exc.code == 2
+        else:  # pragma: no cover - defensive
+            raise AssertionError("Expected SystemExit")
+        assert "--profile only applies to batch mode" in capsys.readouterr().err
+
+
+def test_main_profile_writes_report(tmp_path: Path, capsys) -> None:  # type: ignore[no-untyped-def]
+    source = tmp_path / "exprs.txt"
+    source.write_text("1 + 1\n")
+    stacks = tmp_path / "batch.folded"
+    assert main(["--profile-output", str(stacks), str(source)]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == "2.0\n"
+    assert "run_batch (main.py:" in captured.err
+    assert "run_batch (main.py:" in stacks.read_text(encoding="utf-8")
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.memo` and TTL expiry in the cache."""
+
+import operator
+
+from calculator.cache import LRUCache
+from calculator.memo import ResultMemo
+from calculator.parser import ExpressionParser
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache: LRUCache[str, int] = LRUCache(maxsize=4, ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.5
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    info = cache.info()
+    assert (info.hits, info.misses, info.expirations, info.size) == (1, 1, 1, 0)
+
+
+def test_repeated_evaluation_hits_memo() -> None:
+    parser = ExpressionParser(result_cache_size=8)
+    assert parser.evaluate("a * b + 1", {"a": 2, "b": 3}) == 7
+    assert parser.evaluate("a * b + 1", {"a": 2, "b": 3}) == 7
+    assert parser.evaluate("a * b + 1", {"a": 2, "b": 4}) == 9
+    info = parser.result_cache_info()
+    assert info is not None
+    assert (info.hits, info.misses) == (1, 2)
+    assert ExpressionParser().result_cache_info() is None
+
+
+def test_impure_programs_are_never_memoised() -> None:
+    calls = []
+
+    def tick(a: float, b: float) -> float:
+        calls.append(1)
+        return a + b + len(calls)
+
+    parser = ExpressionParser(result_cache_size=8)
+    parser.engine.register("#", tick, precedence=1)
+    assert not parser.compile("x # 1").pure
+    assert parser.evaluate("x # 1", {"x": 0}) == 2
+    assert parser.evaluate("x # 1", {"x": 0}) == 3
+    assert parser.compile("x + 1").pure
+
+
+def test_memo_expires_and_evicts() -> None:
+    clock = FakeClock()
+    memo = ResultMemo(maxsize=2, ttl=5, clock=clock)
+    program = ExpressionParser().compile("x ^ 2")
+    for x in (1, 2, 3):
+        memo.evaluate(program, {"x": x})
+    assert memo.info().evictions == 1
+    clock.now = 6
+    assert memo.evaluate(program, {"x": 3}) == 9
+    assert memo.info().expirations == 1
+
+
+def test_memo_distinguishes_programs_with_same_source() -> None:
+    memo = ResultMemo()
+    modulo = ExpressionParser()
+    modulo.engine.register("%", operator.mod, precedence=2, pure=True)
+    floor_div = ExpressionParser()
+    floor_div.engine.register("%", operator.floordiv, precedence=2, pure=True)
+    env = {"a": 7, "b": 2}
+    assert memo.evaluate(modulo.compile("a % b"), env) == 1
+    assert memo.evaluate(floor_div.compile("a % b"), env) == 3
+    info = memo.info()
+    assert (info.hits, info.misses) == (0, 2)
+    assert memo.evaluate(modulo.compile("a % b"), env) == 1
+    assert memo.info().hits == 0
+    assert memo.evaluate(modulo.compile("a % b"), env) == 1
+    assert memo.info().hits == 1
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.metrics`."""
+
+import threading
+import urllib.error
+import urllib.request
+
+from calculator.history import HistoryManager
+from calculator.metrics import (
+    CONTENT_TYPE,
+    MetricFamily,
+    MetricsRegistry,
+    Sample,
+    start_http_server,
+    track_engine,
+    track_history,
+    track_parser,
+)
+from calculator.parser import ExpressionParser
+
+
+def _values(registry: MetricsRegistry) -> dict:
+    """Map each exposition line's series to its value."""
+
+    values = {}
+    for line in registry.exposition().splitlines():
+        if not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            values[series] = float(value)
+    return values
+
+
+def test_counter_increments_are_not_lost_across_threads() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run.", {"queue": "a"})
+
+    def work() -> None:
+        for _ in range(10_000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value == 40_000
+    assert registry.exposition() == (
+        "# HELP jobs_total Jobs run.\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{queue="a"} 40000\n'
+    )
+
+
+def test_instrumented_parser_exports_throughput_errors_and_latency() -> None:
+    registry = MetricsRegistry()
+    parser = ExpressionParser(instrument=True, result_cache_size=8)
+    track_parser(registry, parser, {"parser": "main"})
+    for value in (1, 2, 2):
+        parser.evaluate("x * 2 + 1", {"x": value})
+    for _ in range(2):
+        try:
+            parser.evaluate("1 +")
+        except ValueError:
+            pass
+
+    values = _values(registry)
+    assert values['pycalc_evaluations_total{parser="main"}'] == 3
+    assert values['pycalc_evaluation_errors_total{parser="main"}'] == 2
+    assert values['pycalc_cache_hits_total{parser="main",cache="compile"}'] == 2
+    assert values['pycalc_cache_misses_total{parser="main",cache="compile"}'] == 3
+    assert values['pycalc_cache_hit_ratio{parser="main",cache="result"}'] == 1 / 3
+    assert values['pycalc_phase_seconds_count{parser="main",phase="eval"}'] == 3
+    assert 0 < values['pycalc_phase_seconds{parser="main",phase="eval",quantile="0.99"}'] < 1
+    assert values['pycalc_operator_applications_total{parser="main",operator="*"}'] == 3
+    assert "# TYPE pycalc_phase_seconds summary" in registry.exposition()
+
+
+def test_uninstrumented_parser_exports_cache_statistics_only() -> None:
+    registry = MetricsRegistry()
+    parser = ExpressionParser()
+    track_parser(registry, parser)
+    parser.evaluate("1 + 2")
+    values = _values(registry)
+    assert values['pycalc_cache_misses_total{cache="compile"}'] == 1
+    assert not any(series.startswith("pycalc_evaluations_total") for series in values)
+
+
+def test_engine_and_history_metrics() -> None:
+    registry = MetricsRegistry()
+    parser = ExpressionParser()
+    history = HistoryManager(capacity=2)
+    track_engine(registry, parser.engine)
+    track_history(registry, history)
+    for expression in ("1", "2", "3"):
+        history.add(expression, parser.evaluate(expression))
+    values = _values(registry)
+    assert values["pycalc_engine_operators"] == 5
+    assert values["pycalc_history_records"] == 2
+    assert values["pycalc_history_capacity"] == 2
+    assert values["pycalc_history_evicted_total"] == 1
+
+    track_history(registry, HistoryManager(), {"history": "unbounded"})
+    assert _values(registry)['pycalc_history_records{history="unbounded"}'] == 0
+
+
+def test_families_merge_and_escape_labels() -> None:
+    registry = MetricsRegistry()
+    registry.register(lambda: [MetricFamily("m", "gauge", "A\nB", (Sample("m", (("k", 'a"b\\'),), 1.5),))])
+    registry.register(lambda: [MetricFamily("m", "gauge", "ignored", (Sample("m", (("k", "c"),), float("inf")),))])
+    assert registry.exposition() == (
+        "# HELP m A\\nB\n"
+        "# TYPE m gauge\n"
+        'm{k="a\\"b\\\\"} 1.5\n'
+        'm{k="c"} +Inf\n'
+    )
+
+    registry.register(lambda: [MetricFamily("m", "counter", "", ())])
+    try:
+        registry.collect()
+    except ValueError as exc:
+        assert "both gauge and counter" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("expected ValueError")
+
+    try:
+        registry.counter("bad-name", "")
+    except ValueError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("expected ValueError")
+
+
+def test_http_endpoint_serves_exposition() -> None:
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.").inc()
+    server = start_http_server(registry)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert response.read().decode("utf-8").endswith("requests_total 1\n")
+        try:
+            urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+        except urllib.error.HTTPError as exc:
+            assert exc.code == 404
+        else:  # pragma: no cover - defensive
+            raise AssertionError("expected 404")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.numeric`."""
+
+import decimal
+import pickle
+from decimal import Decimal
+from fractions import Fraction
+
+from calculator.numeric import decimal_backend
+from calculator.parser import ExpressionParser
+
+
+def test_int_backend_keeps_integers_exact() -> None:
+    parser = ExpressionParser(numeric="int")
+    result = parser.evaluate("2 ^ 70 + 1")
+    assert result == 2 ** 70 + 1 and type(result) is int
+    assert parser.evaluate("7 / 2") == 3.5
+    assert type(parser.evaluate("1.5 * 2")) is float
+
+
+def test_fraction_backend_is_exact() -> None:
+    parser = ExpressionParser(numeric="fraction")
+    assert parser.evaluate("0.1 + 0.2") == Fraction(3, 10)
+    assert parser.evaluate("1 / 3 * 3") == 1
+    assert parser.evaluate("x * 2", {"x": Fraction(1, 4)}) == Fraction(1, 2)
+
+
+def test_decimal_backend_uses_context() -> None:
+    assert ExpressionParser(numeric="decimal").evaluate("0.1 + 0.2") == Decimal("0.3")
+    parser = ExpressionParser(numeric=decimal_backend(decimal.Context(prec=4)))
+    assert parser.evaluate("1 / 3") == Decimal("0.3333")
+    # Folded at compile time under the same context
+    assert parser.compile("2 / 3").constants == (Decimal("0.6667"),)
+
+
+def test_decimal_context_applies_to_every_entry_point() -> None:
+    parser = ExpressionParser(numeric=decimal_backend(decimal.Context(prec=4)))
+    env = {"x": Decimal(1)}
+    expected = Decimal("0.3333")
+    program = parser.compile("x / 3")
+    assert program.evaluate(env) == expected
+    assert program(x=Decimal(1)) == expected
+    assert program.incremental().evaluate(env) == expected
+    assert pickle.loads(pickle.dumps(program)).evaluate(env) == expected
+    assert ExpressionParser(backend="python", numeric=parser.numeric).compile("x / 3").evaluate(env) == expected
+    assert [r.value for r in parser.compile_batch(["1 / 3", "x / 3"]).evaluate(env)] == [expected, expected]
+    assert list(parser.evaluate_columns("x / 3", {"x": [Decimal(1), Decimal(2)]})) == [expected, Decimal("0.6667")]
+
+
+def test_columns_stay_exact_with_exact_backends() -> None:
+    result = ExpressionParser(numeric="int").evaluate_columns("2 ^ 70 + x", {"x": [1, 2]})
+    assert list(result) == [2 ** 70 + 1, 2 ** 70 + 2]
+    assert all(type(value) is int for value in result)
+    result = ExpressionParser(numeric="fraction").evaluate_columns("x / 3", {"x": [Fraction(1), 2]})
+    assert list(result) == [Fraction(1, 3), Fraction(2, 3)]
+
+
+def test_identities_keep_backend_semantics() -> None:
+    parser = ExpressionParser(numeric="int")
+    assert type(parser.evaluate("x / 1", {"x": 7})) is float
+    assert type(parser.evaluate("7 / 1")) is float
+    parser = ExpressionParser(numeric=decimal_backend(decimal.Context(prec=3)))
+    x = Decimal("1.23456")
+    assert parser.evaluate("x * 1", {"x": x}) == parser.evaluate("x * y", {"x": x, "y": Decimal(1)}) == Decimal("1.23")
+    assert parser.compile_batch(["x * 1"]).evaluate({"x": x})[0].value == Decimal("1.23")
+    # Float programs still drop identities
+    assert ExpressionParser().compile("x * 1 + 0").code == (0,)
+
+
+def test_numeric_backends_work_with_workers() -> None:
+    parser = ExpressionParser(numeric="fraction")
+    pickle.dumps(parser.numeric)
+    results = parser.evaluate_many(["1 / 3", "0.5 + 0.25"], workers=2)
+    assert [r.value for r in results] == [Fraction(1, 3), Fraction(3, 4)]
+
+
+def test_unknown_numeric_backend_rejected() -> None:
+    try:
+        ExpressionParser(numeric="bcd")
+    except ValueError as exc:
+        assert "bcd" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ValueError")
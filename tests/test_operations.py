@@ -65,3 +65,41 @@ def test_power_non_integer_exponent() -> None:
     engine = OperationEngine()
     result = engine.apply("^", 9, 0.5)
     assert math.isclose(result, 3.0)
+
+
+def test_table_is_cached_until_register() -> None:
+    engine = OperationEngine()
+    table = engine.table()
+    assert engine.table() is table
+    assert table.functions[table.codes["*"]](4, 3) == 12
+
+    engine.register("%", lambda a, b: a % b, precedence=2, associative=False)
+    refreshed = engine.table()
+    assert refreshed is not table
+    assert refreshed.right_associative[refreshed.codes["%"]]
+    assert refreshed.precedence[refreshed.codes["%"]] == 2
+
+
+def test_dispatch_table_is_live_and_read_only() -> None:
+    engine = OperationEngine()
+    dispatch = engine.dispatch
+    assert dispatch["*"](4, 3) == 12
+    engine.register("%", lambda a, b: a % b, precedence=2)
+    assert dispatch["%"](10, 3) == 1
+    try:
+        dispatch["+"] = lambda a, b: 0  # type: ignore[index]
+    except TypeError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected TypeError")
+
+
+def test_native_divide() -> None:
+    engine = OperationEngine(native_divide=True)
+    assert engine.apply("/", 8, 2) == 4
+    try:
+        engine.apply("/", 1.0, 0.0)
+    except ZeroDivisionError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ZeroDivisionError")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.optimiser`."""
+
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+
+
+def test_constant_subexpressions_are_folded() -> None:
+    program = ExpressionParser().compile("(2 ^ 10) * x + (3 - 3)")
+    assert program.constants == (1024.0,)
+    assert program.symbols == ("*",)
+    assert program(x=2) == 2048
+
+
+def test_identity_operations_are_removed() -> None:
+    program = ExpressionParser().compile("1 * (x + 0) / 1 ^ 1")
+    assert program.code == (0,)
+    assert program(x=5) == 5
+
+
+def test_left_identity_requires_commutative_operation() -> None:
+    program = ExpressionParser().compile("0 - x")
+    assert program.symbols == ("-",)
+    assert program(x=2) == -2
+
+
+def test_unary_minus_compiles_to_native_negate() -> None:
+    program = ExpressionParser().compile("-x")
+    assert program.symbols == ("neg",)
+    assert program(x=4) == -4
+    assert ExpressionParser().compile("--x").code == (0,)
+
+
+def test_impure_operations_are_not_folded() -> None:
+    engine = OperationEngine()
+    calls = []
+    engine.register("@", lambda a, b: calls.append((a, b)) or a + b, precedence=2)
+    program = ExpressionParser(engine).compile("1 @ 2")
+    assert calls == []
+    assert program() == 3
+    assert calls == [(1.0, 2.0)]
+
+
+def test_failing_fold_is_deferred_to_evaluation() -> None:
+    program = ExpressionParser().compile("x + 1 / 0")
+    try:
+        program(x=1)
+    except ZeroDivisionError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ZeroDivisionError")
+
+
+def test_optimisation_can_be_disabled() -> None:
+    program = ExpressionParser(optimise=False).compile("2 * 3")
+    assert program.constants == (2.0, 3.0)
+
+
+def test_folding_to_non_float_constant() -> None:
+    result = ExpressionParser().evaluate("(0 - 4) ^ 0.5")
+    assert abs(result - 2j) < 1e-12
@@ -43,6 +43,15 @@ def test_multiple_unary_minus() -> None:
     assert eval_expr("-(-1)") == 1
 
 
+def test_unary_minus_after_binary_operator() -> None:
+    assert eval_expr("4 * -3") == -12
+    assert eval_expr("2 ^ -1") == 0.5
+
+
+def test_unary_minus_binds_looser_than_power() -> None:
+    assert eval_expr("-2 ^ 2") == -4
+
+
 def test_decimal_numbers() -> None:
     assert math.isclose(eval_expr("1.5 + 2.25"), 3.75)
 
@@ -57,13 +66,27 @@ def test_power_operator_precedence() -> None:
 
 def test_invalid_character_raises() -> None:
     try:
-        eval_expr("1 + a")
+        eval_expr("1 + $")
     except ValueError as exc:
         assert "Unexpected character" in str(exc)
     else:  # pragma: no cover - defensive
         raise AssertionError("Expected ValueError")
 
 
+def test_variables_bound_from_env() -> None:
+    parser = ExpressionParser()
+    assert parser.evaluate("price * qty - discount", {"price": 2.5, "qty": 4, "discount": 1}) == 9
+
+
+def test_unbound_variable_raises() -> None:
+    try:
+        eval_expr("1 + a")
+    except NameError as exc:
+        assert "Unbound variable 'a'" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected NameError")
+
+
 def test_mismatched_parentheses_raises() -> None:
     try:
         eval_expr("(1 + 2")
@@ -81,3 +104,24 @@ def test_insufficient_values_raises() -> None:
         assert "Invalid expression" in str(exc) or "Insufficient values" in str(exc)
     else:  # pragma: no cover - defensive
         raise AssertionError("Expected ValueError")
+
+
+def test_rpn_streams_carry_operator_codes() -> None:
+    parser = ExpressionParser()
+    rpn = parser._to_rpn(parser._tokenise("1 - 2 * 3"))  # type: ignore[attr-defined]
+    table = parser.engine.table()
+    assert rpn.table is table
+    assert rpn.codes == tuple(table.codes[symbol] for symbol in rpn.symbols)
+    assert parser._eval_rpn(rpn) == -5  # type: ignore[attr-defined]
+    # Registering an operator rebuilds the table; stale codes are ignored
+    parser.engine.register("@", lambda a, b: a - b, precedence=1)
+    assert parser.engine.table() is not table
+    assert parser._eval_rpn(rpn) == -5  # type: ignore[attr-defined]
+
+
+def test_right_associative_operator() -> None:
+    parser = ExpressionParser()
+    parser.engine.register("@", lambda a, b: a - b, precedence=1, associative=False)
+    # 10 @ (4 @ 1) rather than (10 @ 4) @ 1
+    assert parser.evaluate("10 @ 4 @ 1") == 7
+    assert parser.evaluate("10 - 4 - 1") == 5
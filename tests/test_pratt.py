@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.pratt`."""
+
+import random
+
+from calculator.nodes import BinaryOp, Constant, Negate, Variable
+from calculator.parser import ExpressionParser
+
+EXPRESSIONS = [
+    "1 + 2 * 3",
+    "(1 + 2) * 3",
+    "10 - 4 - 1",
+    "2 ^ 3 ^ 2",
+    "-2 ^ 2",
+    "2 ^ -1",
+    "2 * -3",
+    "--4",
+    "-(1 + 2) * -x",
+    "a / b / c * d",
+    "((x))",
+]
+
+
+def test_power_is_right_associative() -> None:
+    for algorithm in ("shunting-yard", "pratt"):
+        assert ExpressionParser(algorithm=algorithm).evaluate("2 ^ 3 ^ 2") == 512
+
+
+def test_pratt_matches_shunting_yard() -> None:
+    env = {"x": 3.0, "a": 8.0, "b": 2.0, "c": 4.0, "d": 5.0}
+    classic = ExpressionParser(optimise=False)
+    pratt = ExpressionParser(optimise=False, algorithm="pratt")
+    for expr in EXPRESSIONS:
+        assert pratt.compile(expr).code == classic.compile(expr).code, expr
+        assert pratt.evaluate(expr, env) == classic.evaluate(expr, env), expr
+
+
+def test_pratt_matches_shunting_yard_on_random_expressions() -> None:
+    rng = random.Random(0)
+    classic = ExpressionParser(cache_size=0)
+    pratt = ExpressionParser(cache_size=0, algorithm="pratt")
+    for _ in range(200):
+        parts = []
+        for _ in range(rng.randint(1, 8)):
+            parts.append("-" * rng.randint(0, 2) + "(" * rng.randint(0, 1) + rng.choice(["x", "2", "0.5"]))
+            parts.append(rng.choice("+-*/^"))
+        expr = " ".join(parts[:-1])
+        expr += ")" * (expr.count("(") - expr.count(")"))
+        expected = classic.compile(expr)
+        assert pratt.compile(expr).code == expected.code, expr
+        assert pratt.compile(expr).constants == expected.constants, expr
+
+
+def test_parse_builds_tree() -> None:
+    tree = ExpressionParser(algorithm="pratt").parse("-x + 2 ^ 3 ^ 2")
+    assert isinstance(tree, BinaryOp) and tree.symbol == "+"
+    assert isinstance(tree.left, Negate) and isinstance(tree.left.operand, Variable)
+    power = tree.right
+    assert isinstance(power, BinaryOp) and isinstance(power.left, Constant)
+    assert isinstance(power.right, BinaryOp) and power.right.symbol == "^"
+
+
+def test_pratt_reports_malformed_expressions() -> None:
+    parser = ExpressionParser(algorithm="pratt")
+    cases = {
+        "(1 + 2": "Mismatched parentheses",
+        "1 + 2)": "Mismatched parentheses",
+        "1 +": "Insufficient values",
+        "* 2": "Insufficient values",
+        "2 3": "Invalid expression",
+        "()": "Invalid expression",
+        "(" * 5000 + "1" + ")" * 5000: "nested too deeply",
+    }
+    for expr, message in cases.items():
+        try:
+            parser.evaluate(expr)
+        except ValueError as exc:
+            assert message in str(exc), expr
+        else:  # pragma: no cover - defensive
+            raise AssertionError(f"Expected ValueError for {expr!r}")
+
+
+def test_adjacent_operands_are_rejected_by_both_algorithms() -> None:
+    parsers = [ExpressionParser(algorithm=algorithm) for algorithm in ("shunting-yard", "pratt")]
+    parsers.append(ExpressionParser(incremental=True))
+    for parser in parsers:
+        for expr in ("1 2 +", "1 2", "x (2)", "(1) 2", "(1 + 2) (3 + 4) * 5"):
+            try:
+                parser.evaluate(expr, {"x": 1.0})
+            except ValueError as exc:
+                assert "Invalid expression" in str(exc), expr
+            else:  # pragma: no cover - defensive
+                raise AssertionError(f"Expected ValueError for {expr!r} ({parser.algorithm})")
+
+
+def test_unknown_algorithm_rejected() -> None:
+    try:
+        ExpressionParser(algorithm="recursive")
+    except ValueError as exc:
+        assert "recursive" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ValueError")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.profiling`."""
+
+import io
+import pstats
+import time
+from pathlib import Path
+
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+from calculator.profiling import dump, format_hot_functions, hot_functions, profile, write_collapsed
+
+
+def slow_modulo(a: float, b: float) -> float:
+    time.sleep(0.001)
+    return a % b
+
+
+def _profile_slow_operator():  # type: ignore[no-untyped-def]
+    engine = OperationEngine()
+    engine.register("%", slow_modulo, precedence=2)
+    parser = ExpressionParser(engine)
+    return profile(lambda: [parser.evaluate("x % 3 + 1", {"x": i}) for i in range(20)])
+
+
+def test_hot_functions_reveal_slow_operator() -> None:
+    result, stats = _profile_slow_operator()
+    assert result[:4] == [1, 2, 3, 1]
+    rows = hot_functions(stats, limit=1000)
+    assert rows[0].name == "<built-in method time.sleep>"
+    operator_row = next(row for row in rows if row.name.startswith("slow_modulo (test_profiling.py:"))
+    assert operator_row.calls == 20
+    assert operator_row.total_time >= 0.015
+    assert all("_lsprof" not in row.name for row in rows)
+
+    lines = format_hot_functions(stats, limit=5)
+    assert lines[0].split() == ["calls", "own", "ms", "total", "ms", "function"]
+    assert len(lines) == 6
+
+
+def test_collapsed_stacks_run_from_outermost_frame() -> None:
+    _, stats = _profile_slow_operator()
+    output = io.StringIO()
+    write_collapsed(stats, output)
+    stacks = dict(line.rsplit(" ", 1) for line in output.getvalue().splitlines())
+    sleeping = [stack for stack in stacks if stack.endswith("<built-in method time.sleep>")]
+    assert len(sleeping) == 1
+    frames = sleeping[0].split(";")
+    assert frames[0].startswith("<lambda> (test_profiling.py:")
+    assert frames[-3].startswith("execute (program.py:")
+    assert frames[-2].startswith("slow_modulo (")
+    # ~20ms of sleeping, in microseconds
+    assert int(stacks[sleeping[0]]) >= 15_000
+
+
+def test_dump_chooses_format_by_suffix(tmp_path: Path) -> None:
+    _, stats = _profile_slow_operator()
+    dump(stats, str(tmp_path / "run.prof"))
+    assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0  # type: ignore[attr-defined]
+    dump(stats, str(tmp_path / "run.folded"))
+    assert "slow_modulo" in (tmp_path / "run.folded").read_text(encoding="utf-8")
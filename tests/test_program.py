@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.program`."""
+
+import pickle
+
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+
+
+def test_compiled_program_is_reusable() -> None:
+    program = ExpressionParser().compile("(1 + 2) * 3")
+    assert program() == 9
+    assert program() == 9
+
+
+def test_compiled_program_matches_evaluate() -> None:
+    parser = ExpressionParser()
+    expr = "-(4 - 6) ^ 2 / 8"
+    assert parser.compile(expr)() == parser.evaluate(expr)
+
+
+def test_compiled_program_pickles() -> None:
+    program = ExpressionParser().compile("2 ^ 3 - 10 / 4")
+    restored = pickle.loads(pickle.dumps(program))
+    assert restored == program
+    assert restored() == 5.5
+
+
+def test_compile_reports_malformed_expression() -> None:
+    try:
+        ExpressionParser().compile("1 +")
+    except ValueError as exc:
+        assert "Insufficient values" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ValueError")
+
+
+def test_program_keeps_operators_resolved_at_compile_time() -> None:
+    engine = OperationEngine()
+    program = ExpressionParser(engine).compile("5 - 1")
+    engine.register("-", lambda a, b: a + b, precedence=1)
+    assert program() == 4
+
+
+def test_compiled_program_binds_keyword_arguments() -> None:
+    program = ExpressionParser().compile("price * qty - discount")
+    assert program.names == ("price", "qty", "discount")
+    assert program(price=3, qty=2, discount=1) == 5
+    assert program(price=1, qty=1, discount=0) == 1
+
+
+def test_repeated_variable_shares_a_slot() -> None:
+    program = ExpressionParser().compile("x * x + -x")
+    assert program.names == ("x",)
+    assert program.evaluate({"x": 3}) == 6
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.recompute`."""
+
+from calculator.parser import ExpressionParser
+
+EXPR = "(a * b + 1) / (c - 2) + -(a ^ 2)"
+
+
+def test_only_dependent_operations_are_recomputed() -> None:
+    program = ExpressionParser().compile(EXPR)
+    evaluator = program.incremental()
+    env = {"a": 2.0, "b": 3.0, "c": 4.0}
+    assert evaluator.evaluate(env) == program.evaluate(env)
+    assert evaluator.recomputed == 7
+
+    env["c"] = 6.0
+    assert evaluator.evaluate(env) == program.evaluate(env)
+    # c - 2 and the division, then the final addition
+    assert evaluator.recomputed == 3
+
+    env["b"] = 5.0
+    env["c"] = 7.0
+    assert evaluator.evaluate(env) == program.evaluate(env)
+    assert evaluator.recomputed == 5
+
+    assert evaluator(a=2.0, b=5.0, c=7.0) == program.evaluate(env)
+    assert evaluator.recomputed == 0
+
+
+def test_failure_forces_full_recomputation() -> None:
+    evaluator = ExpressionParser().compile(EXPR).incremental()
+    evaluator.evaluate({"a": 1, "b": 1, "c": 3})
+    try:
+        evaluator.evaluate({"a": 1, "b": 1, "c": 2})
+    except ZeroDivisionError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ZeroDivisionError")
+    assert evaluator.evaluate({"a": 1, "b": 1, "c": 3}) == 1
+    assert evaluator.recomputed == 7
+
+
+def test_impure_programs_are_evaluated_in_full() -> None:
+    parser = ExpressionParser()
+    parser.engine.register("#", lambda a, b: a + b, precedence=1)
+    evaluator = parser.compile("(x # 1) * y").incremental()
+    assert evaluator(x=1, y=2) == 4
+    assert evaluator(x=1, y=3) == 6
+    assert evaluator.recomputed == 2
+
+
+def test_constant_program() -> None:
+    evaluator = ExpressionParser().compile("2 * 3").incremental()
+    assert evaluator() == 6
+    assert evaluator() == 6
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.scanner`."""
+
+from calculator.operations import OperationEngine
+from calculator.scanner import Scanner
+from calculator.tokens import (
+    LEFT_PAREN,
+    LeftParenToken,
+    NameToken,
+    NumberToken,
+    OperatorToken,
+    RightParenToken,
+    TokenStream,
+    operator_token,
+)
+
+
+def test_scanner_produces_expected_tokens() -> None:
+    tokens = Scanner(OperationEngine()).tokenise(" (1.5+ .25)*rate_2 ")
+    assert tokens == [
+        LeftParenToken(),
+        NumberToken(1.5),
+        OperatorToken("+"),
+        NumberToken(0.25),
+        RightParenToken(),
+        OperatorToken("*"),
+        NameToken("rate_2"),
+    ]
+
+
+def test_scanner_reports_unexpected_character_position() -> None:
+    try:
+        Scanner(OperationEngine()).tokenise("1 + 2 $ 3")
+    except ValueError as exc:
+        assert str(exc) == "Unexpected character at position 6: '$'"
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ValueError")
+
+
+def test_scanner_picks_up_newly_registered_operators() -> None:
+    engine = OperationEngine()
+    scanner = Scanner(engine)
+    try:
+        scanner.tokenise("7 % 2")
+    except ValueError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ValueError")
+    engine.register("%", lambda a, b: a % b, precedence=2)
+    assert scanner.tokenise("7 % 2")[1] == OperatorToken("%")
+
+
+def test_registered_letter_operator_wins_over_identifier() -> None:
+    engine = OperationEngine()
+    engine.register("m", max, precedence=2)
+    tokens = Scanner(engine).tokenise("a m 2")
+    assert tokens[:2] == [NameToken("a"), OperatorToken("m")]
+
+
+def test_scan_produces_parallel_arrays() -> None:
+    stream = Scanner(OperationEngine()).scan("(x + 2.5) * -3")
+    assert list(stream.values) == [2.5, 3.0]
+    assert stream.names == ("x",)
+    assert stream.symbols == ("+", "*", "-")
+    assert len(stream) == 8
+
+
+def test_stateless_tokens_are_interned() -> None:
+    tokens = Scanner(OperationEngine()).tokenise("(1 + 2) + (3)")
+    assert tokens[0] is tokens[6] is LEFT_PAREN
+    assert tokens[2] is tokens[5] is operator_token("+")
+
+
+def test_token_stream_round_trips_token_objects() -> None:
+    tokens = Scanner(OperationEngine()).tokenise("a * (b - 1)")
+    assert list(TokenStream.from_tokens(tokens)) == tokens
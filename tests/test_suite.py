@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`benchmarks.suite`."""
+
+import json
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.suite import SCHEMA, compare, main
+
+
+def _report(**best_ns: float) -> Dict[str, object]:
+    return {
+        "schema": SCHEMA,
+        "corpus": {"size": 10, "seed": 0},
+        "results": {name: {"best_ns": ns, "median_ns": ns, "operations": 10} for name, ns in best_ns.items()},
+    }
+
+
+def _write(path: Path, report: Dict[str, object]) -> str:
+    path.write_text(json.dumps(report), encoding="utf-8")
+    return str(path)
+
+
+def test_compare_flags_slowdowns_beyond_threshold(tmp_path: Path, capsys) -> None:  # type: ignore[no-untyped-def]
+    baseline = _write(tmp_path / "baseline.json", _report(tokenise=100.0, eval_rpn=200.0))
+    slower = _write(tmp_path / "slower.json", _report(tokenise=125.0, eval_rpn=190.0))
+    assert main(["compare", baseline, slower, "--threshold", "0.2"]) == 1
+    out = capsys.readouterr().out
+    assert "tokenise" in out and "+25.0%  REGRESSION" in out
+    assert compare(_report(a=100.0), _report(a=125.0), threshold=0.2) == ["a"]
+
+
+def test_compare_passes_within_threshold(tmp_path: Path, capsys) -> None:  # type: ignore[no-untyped-def]
+    baseline = _write(tmp_path / "baseline.json", _report(tokenise=100.0, eval_rpn=200.0))
+    current = _write(tmp_path / "current.json", _report(tokenise=115.0, eval_rpn=150.0))
+    assert main(["compare", baseline, current, "--threshold", "0.2"]) == 0
+    assert "REGRESSION" not in capsys.readouterr().out
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.vectorised`."""
+
+from array import array
+
+import pytest
+
+from calculator import vectorised
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+
+
+def test_columns_match_scalar_evaluation() -> None:
+    parser = ExpressionParser()
+    columns = {"price": array("d", [1.5, 2.0, 4.0]), "qty": [2, 3, 4]}
+    result = parser.evaluate_columns("price * qty - 1 / 2", columns)
+    expected = [parser.evaluate("price * qty - 1 / 2", {"price": p, "qty": q}) for p, q in zip(*columns.values())]
+    assert list(result) == expected
+
+
+def test_custom_operator_falls_back_to_rows() -> None:
+    engine = OperationEngine()
+    engine.register("%", lambda a, b: a % b, precedence=2)
+    program = ExpressionParser(engine).compile("a % 3 + 1")
+    assert vectorised.vector_functions(program) is None
+    assert list(program.evaluate_columns({"a": [4, 5, 6]})) == [2, 3, 1]
+
+
+def test_missing_column_raises() -> None:
+    try:
+        ExpressionParser().evaluate_columns("a + b", {"a": [1]})
+    except NameError as exc:
+        assert "Unbound variable 'b'" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected NameError")
+
+
+def test_numpy_division_by_zero_raises() -> None:
+    np = pytest.importorskip("numpy")
+    program = ExpressionParser().compile("1 / x")
+    try:
+        program.evaluate_columns({"x": np.array([1.0, 0.0])})
+    except ZeroDivisionError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected ZeroDivisionError")
+
+
+def test_numpy_path_matches_scalar_overflow_and_powers() -> None:
+    pytest.importorskip("numpy")
+    parser = ExpressionParser()
+    try:
+        parser.evaluate_columns("x ^ 400", {"x": [2.0, 10.0]})
+    except OverflowError:
+        pass
+    else:  # pragma: no cover - defensive
+        raise AssertionError("Expected OverflowError")
+    result = parser.evaluate_columns("x ^ 0.5", {"x": [-4.0, 4.0]})
+    assert result.tolist() == [parser.evaluate("x ^ 0.5", {"x": x}) for x in (-4.0, 4.0)]
+    assert parser.evaluate_columns("x * x", {"x": [1e200]}).tolist() == [float("inf")]
+
+
+def test_numpy_constant_program_broadcasts() -> None:
+    np = pytest.importorskip("numpy")
+    result = ExpressionParser().evaluate_columns("2 ^ 3", {})
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == [8.0]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+"""Unit tests for :mod:`calculator.workload`."""
+
+import io
+import operator
+from pathlib import Path
+
+from calculator.operations import OperationEngine
+from calculator.parser import ExpressionParser
+from calculator.workload import WorkloadGenerator, WorkloadSpec, main
+
+
+def _max_depth(expression: str) -> int:
+    depth = deepest = 0
+    for ch in expression:
+        if ch == "(":
+            depth += 1
+            deepest = max(deepest, depth)
+        elif ch == ")":
+            depth -= 1
+    return deepest
+
+
+def test_same_seed_gives_same_workload() -> None:
+    first = list(WorkloadGenerator(seed=3).generate(50))
+    assert first == list(WorkloadGenerator(seed=3).generate(50))
+    assert first != list(WorkloadGenerator(seed=4).generate(50))
+
+
+def test_expressions_follow_the_spec() -> None:
+    spec = WorkloadSpec(max_depth=2, terms=(2, 3), nesting_rate=0.9, operators={"+": 1, "*": 1},
+                        variables=("x",))
+    parser = ExpressionParser()
+    for expression in WorkloadGenerator(spec=spec, seed=1).generate(200):
+        assert _max_depth(expression) <= 2
+        assert not set(expression) & set("/^")
+        parser.evaluate(expression, {"x": 2.0})
+
+
+def test_default_workload_evaluates_without_errors() -> None:
+    parser = ExpressionParser()
+    spec = WorkloadSpec(variables=("x", "y"))
+    for expression in WorkloadGenerator(spec=spec, seed=6).generate(3000):
+        result = parser.evaluate(expression, {"x": 1.5, "y": -2.25})
+        assert isinstance(result, float), expression
+
+
+def test_power_only_workload_does_not_overflow() -> None:
+    parser = ExpressionParser()
+    spec = WorkloadSpec(operators={"^": 1}, max_depth=4, nesting_rate=0.8, terms=(2, 6))
+    for expression in WorkloadGenerator(spec=spec, seed=3).generate(3000):
+        parser.evaluate(expression)
+
+
+def test_error_rate_controls_malformed_expressions() -> None:
+    parser = ExpressionParser()
+    valid = WorkloadGenerator(spec=WorkloadSpec(operators={"+": 1, "*": 1}), seed=2)
+    for expression in valid.generate(200):
+        parser.parse(expression)
+
+    invalid = WorkloadGenerator(spec=WorkloadSpec(error_rate=1.0), seed=2)
+    for expression in invalid.generate(200):
+        try:
+            parser.parse(expression)
+        except ValueError:
+            pass
+        else:  # pragma: no cover - defensive
+            raise AssertionError(f"expected {expression!r} to be malformed")
+
+
+def test_operator_mix_comes_from_the_engine() -> None:
+    engine = OperationEngine()
+    engine.register("%", operator.mod, precedence=2)
+    expressions = list(WorkloadGenerator(engine, seed=0).generate(100))
+    assert any("%" in expression for expression in expressions)
+    assert not any("%" in expression for expression in WorkloadGenerator(seed=0).generate(100))
+
+    try:
+        WorkloadGenerator(spec=WorkloadSpec(operators={"%": 1}))
+    except ValueError as exc:
+        assert "%" in str(exc)
+    else:  # pragma: no cover - defensive
+        raise AssertionError("expected ValueError")
+
+
+def test_invalid_spec_is_rejected() -> None:
+    for kwargs in ({"terms": (0, 2)}, {"terms": (3, 2)}, {"error_rate": 1.5}, {"max_depth": -1}):
+        try:
+            WorkloadSpec(**kwargs)  # type: ignore[arg-type]
+        except ValueError:
+            pass
+        else:  # pragma: no cover - defensive
+            raise AssertionError(f"expected ValueError for {kwargs}")
+
+
+def test_write_streams_by_count_or_size(tmp_path: Path) -> None:
+    path = tmp_path / "exprs.txt"
+    assert WorkloadGenerator(seed=5).write(str(path), count=1000) == 1000
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines == list(WorkloadGenerator(seed=5).generate(1000))
+
+    buffer = io.StringIO()
+    written = WorkloadGenerator(seed=5).write(buffer, size=2000)
+    text = buffer.getvalue()
+    assert 2000 <= len(text) < 2000 + max(map(len, lines)) + 1
+    assert text.splitlines() == lines[:written]
+
+
+def test_main_writes_file(tmp_path: Path) -> None:
+    path = tmp_path / "exprs.txt"
+    assert main(["--count", "20", "--seed", "9", "--operators", "+=2,-", "--output", str(path)]) == 0
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 20
+    assert not set("".join(lines)) & set("*/^")